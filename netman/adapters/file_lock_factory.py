@@ -0,0 +1,168 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import deque
+import fcntl
+import os
+import re
+import threading
+import time
+
+from netman.core.objects.exceptions import UnableToAcquireLock
+
+
+class FileLockFactory(object):
+    """
+    Locks shared by every netman process of a box, one lock file per switch in directory
+
+    Within a process the waiters of a lock are served in their arrival order, then the lock file is locked
+    with flock to exclude the other processes.  A lock that can't be acquired within timeout seconds raises
+    UnableToAcquireLock, None waits forever.
+    """
+    def __init__(self, directory, timeout=None):
+        self.directory = directory
+        self.timeout = timeout
+        self.locks = []
+        self._lock = threading.Lock()
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def new_lock(self, name, timeout=None):
+        lock = FileLock(os.path.join(self.directory, "{}.lock".format(re.sub(r"[^\w.-]", "_", name))),
+                        timeout=timeout if timeout is not None else self.timeout)
+        with self._lock:
+            self.locks.append(lock)
+        return lock
+
+    def metrics(self):
+        with self._lock:
+            locks = list(self.locks)
+
+        return {
+            "acquired": sum(lock.acquired for lock in locks),
+            "contended": sum(lock.contended for lock in locks),
+            "timed_out": sum(lock.timed_out for lock in locks),
+            "waited_seconds": round(sum(lock.waited_seconds for lock in locks), 3)
+        }
+
+
+class FileLock(object):
+    polling_interval = 0.01
+    max_polling_interval = 0.1
+
+    def __init__(self, path, timeout=None):
+        self.path = path
+        self.timeout = timeout
+        self.acquired = 0
+        self.contended = 0
+        self.timed_out = 0
+        self.waited_seconds = 0.0
+        self._file = None
+        self._held = False
+        self._waiters = deque()
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        started_at = time.time()
+        deadline = started_at + self.timeout if self.timeout is not None else None
+
+        with self._condition:
+            waiter = object()
+            self._waiters.append(waiter)
+            contended = self._held or self._waiters[0] is not waiter
+            try:
+                while self._held or self._waiters[0] is not waiter:
+                    _wait(self._condition.wait, deadline)
+            except UnableToAcquireLock:
+                self._waiters.remove(waiter)
+                self._condition.notify_all()
+                self._record(started_at, timed_out=True)
+                raise
+            self._waiters.popleft()
+            self._held = True
+
+        try:
+            if not self._lock_file(deadline):
+                contended = True
+        except Exception as e:
+            with self._condition:
+                self._held = False
+                self._condition.notify_all()
+                self._record(started_at, timed_out=isinstance(e, UnableToAcquireLock))
+            raise
+
+        with self._condition:
+            self._record(started_at, contended=contended)
+
+    def release(self):
+        with self._condition:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+            self._held = False
+            self._condition.notify_all()
+
+    def _lock_file(self, deadline):
+        """
+        Returns whether the lock file was free
+        """
+        lock_file = open(self.path, "a")
+        try:
+            if _try_flock(lock_file):
+                free = True
+            elif deadline is None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                free = False
+            else:
+                interval = self.polling_interval
+                while True:
+                    _wait(time.sleep, deadline, interval)
+                    if _try_flock(lock_file):
+                        break
+                    interval = min(interval * 2, self.max_polling_interval)
+                free = False
+        except Exception:
+            lock_file.close()
+            raise
+
+        self._file = lock_file
+        return free
+
+    def _record(self, started_at, contended=False, timed_out=False):
+        self.waited_seconds += time.time() - started_at
+        if timed_out:
+            self.timed_out += 1
+        else:
+            self.acquired += 1
+            if contended:
+                self.contended += 1
+
+
+def _try_flock(lock_file):
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except IOError:
+        return False
+
+
+def _wait(wait, deadline, interval=None):
+    if deadline is None:
+        return wait(interval) if interval is not None else wait()
+
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise UnableToAcquireLock()
+    wait(min(remaining, interval) if interval is not None else remaining)
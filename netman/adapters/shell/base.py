@@ -25,3 +25,6 @@ class TerminalClient(object):
 
     def get_current_prompt(self):
         raise NotImplemented()
+
+    def is_alive(self):
+        raise NotImplementedError()
@@ -15,10 +15,12 @@
 from _socket import timeout, gaierror
 import logging
 import time
+import warnings
 
 import paramiko
 from netman.adapters import shell
 
+from netman.adapters.shell import transcript as transcripts
 from netman.adapters.shell.base import TerminalClient
 from netman.core.objects.exceptions import CouldNotConnect, ConnectTimeout, CommandTimeout
 
@@ -26,24 +28,31 @@ from netman.core.objects.exceptions import CouldNotConnect, ConnectTimeout, Comm
 class SshClient(TerminalClient):
 
     def __init__(self, host, username, password, port=22, prompt=('>', '#'), connect_timeout=None, command_timeout=None,
-                 reading_interval=0.01, reading_chunk_size=9999):
+                 reading_interval=None, reading_chunk_size=9999, transcript=None):
         self.logger = logging.getLogger(__name__)
 
+        if reading_interval is not None:
+            warnings.warn("Deprecated, the channel is read as soon as data comes in, reading_interval has no effect",
+                          DeprecationWarning)
+
         self.host = host
         self.port = port
         self.username = username
         self.prompt = prompt
         self.command_timeout = command_timeout or shell.default_command_timeout
         connect_timeout = connect_timeout or shell.default_connect_timeout
-        self.reading_interval = reading_interval
         self.reading_chunk_size = reading_chunk_size
 
         self.current_buffer = ''
         self.client = None
         self.channel = None
-        self.full_log = ""
+        self.transcript = transcripts.from_spec(transcript or shell.default_transcript, "{}-{}".format(host, port))
 
-        self._open_channel(host, port, username, password, connect_timeout)
+        try:
+            self._open_channel(host, port, username, password, connect_timeout)
+        except Exception:
+            self.transcript.close()
+            raise
 
     def do(self, command, wait_for=None, include_last_line=False):
         self.logger.debug("[SSH][{}@{}:{}] Send >> {}".format(self.username, self.host, self.port, command))
@@ -61,10 +70,19 @@ class SshClient(TerminalClient):
         self.logger.debug("[SSH][{}@{}:{}] Quit >> {}".format(self.username, self.host, self.port, command))
 
         self.channel.send(command + '\n')
+        self.transcript.close()
 
     def get_current_prompt(self):
         return self.current_buffer.splitlines()[-1]
 
+    def is_alive(self):
+        transport = self.client.get_transport()
+        return bool(transport and transport.is_active()) and not (self.channel.closed or self.channel.eof_received)
+
+    @property
+    def full_log(self):
+        return self.transcript.read()
+
     def _open_channel(self, host, port, username, password, connect_timeout):
         self.client = paramiko.SSHClient()
         self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
@@ -95,16 +113,34 @@ class SshClient(TerminalClient):
         return filter(None, lines)
 
     def _wait_for(self, wait_for):
-        self.current_buffer = ''
-
-        started_at = time.time()
-        while not self.current_buffer.endswith(wait_for):
-            while not self.channel.recv_ready():
-                if time.time() - started_at > self.command_timeout:
-                    raise CommandTimeout(wait_for, self.current_buffer)
-                time.sleep(self.reading_interval)
-
-            read = self.channel.recv(self.reading_chunk_size)
-            self.logger.debug("[SSH][{}@{}:{}] Recv << {}".format(self.username, self.host, self.port, repr(read)))
-            self.full_log += read
-            self.current_buffer += read
+        expected = (wait_for,) if isinstance(wait_for, basestring) else tuple(wait_for)
+        tail_size = max(len(e) for e in expected)
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+
+        chunks = []
+        tail = ''
+        deadline = time.time() + self.command_timeout
+        while not tail.endswith(expected):
+            read = self._recv(deadline)
+            if read is None:
+                self.current_buffer = ''.join(chunks)
+                raise CommandTimeout(wait_for, self.current_buffer)
+
+            if debug:
+                self.logger.debug("[SSH][{}@{}:{}] Recv << {}".format(self.username, self.host, self.port, repr(read)))
+            chunks.append(read)
+            self.transcript.write(read)
+            tail = (tail + read)[-tail_size:]
+
+        self.current_buffer = ''.join(chunks)
+
+    def _recv(self, deadline):
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return None
+
+        self.channel.settimeout(remaining)
+        try:
+            return self.channel.recv(self.reading_chunk_size) or None
+        except timeout:
+            return None
@@ -17,6 +17,7 @@ import telnetlib
 from telnetlib import IAC, DO, DONT, WILL, WONT
 
 from netman.adapters import shell
+from netman.adapters.shell import transcript as transcripts
 from netman.adapters.shell.base import TerminalClient
 from netman.core.objects.exceptions import CouldNotConnect, CommandTimeout, ConnectTimeout
 
@@ -24,16 +25,21 @@ from netman.core.objects.exceptions import CouldNotConnect, CommandTimeout, Conn
 class TelnetClient(TerminalClient):
 
     def __init__(self, host, username, password, port=23, prompt=('>', '#'),
-                 connect_timeout=None, command_timeout=None, **_):
+                 connect_timeout=None, command_timeout=None, transcript=None, **_):
         self.prompt = prompt
         self.host = host
         self.port = port
         self.command_timeout = command_timeout or shell.default_command_timeout
         self.connect_timeout = connect_timeout or shell.default_connect_timeout
-        self.full_log = ""
+        self.transcript = transcripts.from_spec(transcript or shell.default_transcript, "{}-{}".format(host, port))
+        self.current_buffer = ""
 
-        self.telnet = self._connect()
-        self._login(username, password)
+        try:
+            self.telnet = self._connect()
+            self._login(username, password)
+        except Exception:
+            self.transcript.close()
+            raise
 
     def do(self, command, wait_for=None, include_last_line=False):
         self.telnet.write(str(command) + "\r\n")
@@ -49,9 +55,24 @@ class TelnetClient(TerminalClient):
 
     def quit(self, command):
         self.telnet.write(command + "\r\n")
+        self.transcript.close()
 
     def get_current_prompt(self):
-        return self.full_log.splitlines()[-1]
+        return self.current_buffer.splitlines()[-1]
+
+    def is_alive(self):
+        try:
+            pending = self.telnet.read_very_eager()
+        except (EOFError, IOError):
+            return False
+
+        if pending:
+            self.transcript.write(pending)
+        return True
+
+    @property
+    def full_log(self):
+        return self.transcript.read()
 
     def _login(self, username, password):
         self.telnet.read_until(":", self.command_timeout)
@@ -60,7 +81,7 @@ class TelnetClient(TerminalClient):
         self.telnet.write(str(password) + "\r\n")
 
         result = self._wait_for_successful_login()
-        self.full_log += result[len(password):].lstrip()
+        self._record(result[len(password):].lstrip())
 
     def _read_until(self, wait_for):
         expect = wait_for or self.prompt
@@ -69,10 +90,14 @@ class TelnetClient(TerminalClient):
         expect = ["{}$".format(re.escape(s)) for s in list(expect)]
 
         result = self._wait_for(expect)
-        self.full_log += result
+        self._record(result)
 
         return result
 
+    def _record(self, result):
+        self.current_buffer = result
+        self.transcript.write(result)
+
     def _wait_for(self, expect):
         result = self.telnet.expect(expect, timeout=self.command_timeout)
         if result[0] == -1:
@@ -0,0 +1,140 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+import os
+import time
+from collections import deque
+
+from netman.core.objects.exceptions import InvalidValue
+
+FULL = "full"
+OFF = "off"
+RING = "ring"
+FILE = "file"
+
+_file_numbers = itertools.count()
+
+
+class Transcript(object):
+    """
+    Records what a terminal client received from the switch
+
+    captured_bytes counts what was recorded, dropped_bytes what was thrown away
+    """
+    def __init__(self):
+        self.captured_bytes = 0
+        self.dropped_bytes = 0
+
+    def write(self, data):
+        raise NotImplementedError()
+
+    def read(self):
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+
+class FullTranscript(Transcript):
+    def __init__(self):
+        super(FullTranscript, self).__init__()
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.captured_bytes += len(data)
+
+    def read(self):
+        return "".join(self.chunks)
+
+
+class NoTranscript(Transcript):
+    def write(self, data):
+        self.dropped_bytes += len(data)
+
+    def read(self):
+        return ""
+
+
+class RingBufferTranscript(Transcript):
+    def __init__(self, max_size):
+        super(RingBufferTranscript, self).__init__()
+        self.max_size = max_size
+        self.chunks = deque()
+        self.size = 0
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.size += len(data)
+        self.captured_bytes += len(data)
+
+        while self.size > self.max_size:
+            overflow = self.size - self.max_size
+            oldest = self.chunks.popleft()
+            if len(oldest) > overflow:
+                self.chunks.appendleft(oldest[overflow:])
+                self.size -= overflow
+                self.dropped_bytes += overflow
+            else:
+                self.size -= len(oldest)
+                self.dropped_bytes += len(oldest)
+
+    def read(self):
+        return "".join(self.chunks)
+
+
+class FileTranscript(Transcript):
+    def __init__(self, path):
+        super(FileTranscript, self).__init__()
+        self.path = path
+        self.file = open(path, "ab")
+
+    def write(self, data):
+        self.file.write(data)
+        self.captured_bytes += len(data)
+
+    def read(self):
+        return "Transcript spooled to {}".format(self.path)
+
+    def close(self):
+        self.file.close()
+
+
+def from_spec(spec, name):
+    """
+    Builds the transcript described by spec
+
+    ``full`` keeps everything, ``off`` keeps nothing, ``ring:<KB>`` keeps the last KB
+    and ``file:<directory>`` spools everything to a new file named after `name`, the time and the process in that
+    directory
+    """
+    if isinstance(spec, Transcript):
+        return spec
+
+    kind, _, argument = spec.partition(":")
+    if kind == FULL:
+        return FullTranscript()
+    if kind == OFF:
+        return NoTranscript()
+    if kind == RING:
+        try:
+            return RingBufferTranscript(int(argument) * 1024)
+        except ValueError:
+            raise InvalidValue("Ring transcript size should be a number of KB, got \"{}\"".format(argument))
+    if kind == FILE and argument:
+        filename = "{}-{}-{}-{}.log".format(name, time.strftime("%Y%m%d%H%M%S"), os.getpid(), next(_file_numbers))
+        return FileTranscript(os.path.join(argument, filename))
+
+    raise InvalidValue("Unknown transcript \"{}\", should be full, off, ring:<KB> or file:<directory>".format(spec))
@@ -0,0 +1,119 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import errno
+import json
+import os
+import sqlite3
+
+from netman.core.objects.exceptions import SessionAlreadyExists, UnknownSession
+from netman.core.objects.switch_descriptor import SwitchDescriptor
+from netman.core.session_storage import SessionStorage
+
+
+class SqliteSessionStorage(SessionStorage):
+    """
+    Sessions shared by every netman process of a box through a SQLite file
+
+    Each session is stored along with the url of its owner, the process holding the live switch connection, so
+    the other processes can relay the session calls to it.  The switch credentials are left out of the file, only
+    the owner needs them and it keeps them with the switch of the session.
+
+    The owner can be given as a callable, called with the first session added, so a forking server only starts
+    serving the session calls in the workers actually holding sessions.  The sessions of a process that is gone are
+    removed when the storage is created, when a session is added and when they are looked up.
+    """
+    def __init__(self, path, owner=None, timeout=5):
+        super(SqliteSessionStorage, self).__init__()
+        self.path = path
+        self.owner = owner
+        self.timeout = timeout
+
+        if not os.path.exists(path):
+            os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+
+        with self._connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS sessions "
+                               "(session_id TEXT PRIMARY KEY, switch_descriptor TEXT NOT NULL, owner TEXT, pid INTEGER)")
+            _remove_sessions_of_gone_processes(connection)
+
+    def add(self, session_id, switch_descriptor):
+        owner = self.owner() if callable(self.owner) else self.owner
+        try:
+            with self._connection() as connection:
+                _remove_sessions_of_gone_processes(connection)
+                connection.execute("INSERT INTO sessions (session_id, switch_descriptor, owner, pid) VALUES (?, ?, ?, ?)",
+                                   (session_id, json.dumps(_without_credentials(switch_descriptor)), owner, os.getpid()))
+        except sqlite3.IntegrityError:
+            raise SessionAlreadyExists(session_id)
+
+    def get(self, session_id):
+        row = self._get_row(session_id)
+        if row is not None:
+            return SwitchDescriptor(**json.loads(row[0]))
+
+    def get_owner(self, session_id):
+        row = self._get_row(session_id)
+        if row is not None:
+            return row[1]
+
+    def remove(self, session_id):
+        with self._connection() as connection:
+            deleted = connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount
+        if deleted == 0:
+            raise UnknownSession(session_id)
+
+    def _get_row(self, session_id):
+        with self._connection() as connection:
+            row = connection.execute("SELECT switch_descriptor, owner, pid FROM sessions WHERE session_id = ?",
+                                     (session_id,)).fetchone()
+            if row is not None and not _is_running(row[2]):
+                connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                return None
+            return row
+
+    def _connection(self):
+        return _ClosingConnection(sqlite3.connect(self.path, timeout=self.timeout))
+
+
+def _remove_sessions_of_gone_processes(connection):
+    for pid, in connection.execute("SELECT DISTINCT pid FROM sessions").fetchall():
+        if not _is_running(pid):
+            connection.execute("DELETE FROM sessions WHERE pid = ?", (pid,))
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+    return True
+
+
+def _without_credentials(switch_descriptor):
+    return {k: v for k, v in vars(switch_descriptor).items() if k not in ('username', 'password')}
+
+
+class _ClosingConnection(object):
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self.connection.__enter__()
+
+    def __exit__(self, *args):
+        try:
+            return self.connection.__exit__(*args)
+        finally:
+            self.connection.close()
@@ -50,6 +50,7 @@ class Brocade(SwitchBase):
         super(Brocade, self).__init__(switch_descriptor)
         self.shell_factory = shell_factory
         self.shell = None
+        self.ve_running_config = None
 
     def _connect(self):
         shell_params = dict(
@@ -59,6 +60,8 @@ class Brocade(SwitchBase):
         )
         if self.switch_descriptor.port:
             shell_params["port"] = self.switch_descriptor.port
+        if self.switch_descriptor.transcript:
+            shell_params["transcript"] = self.switch_descriptor.transcript
 
         self.shell = self.shell_factory(**shell_params)
 
@@ -73,10 +76,10 @@ class Brocade(SwitchBase):
         self.logger.info(self.shell.full_log)
 
     def _end_transaction(self):
-        pass
+        self.ve_running_config = None
 
     def _start_transaction(self):
-        pass
+        self.ve_running_config = VeRunningConfig(self.shell)
 
     def commit_transaction(self):
         self.shell.do("write memory")
@@ -337,6 +340,9 @@ class Brocade(SwitchBase):
             self.shell.do("router-interface ve {}".format(vlan.number))
             vlan.vlan_interface_name = str(vlan.number)
 
+        if self.ve_running_config is not None:
+            self.ve_running_config.invalidate(vlan.vlan_interface_name)
+
         return SubShell(self.shell, enter=["interface ve {}".format(vlan.vlan_interface_name), "enable"], exit_cmd='exit')
 
     def add_vrrp_group(self, vlan_number, group_id, ips=None, priority=None, hello_interval=None, dead_interval=None,
@@ -388,13 +394,11 @@ class Brocade(SwitchBase):
                 self.shell.do('ip vrrp-extended auth-type no-auth')
 
     def add_vif_data_to_vlans(self, vlans):
-        vlans_interface_name_dict = {vlan.vlan_interface_name: vlan for vlan in vlans if vlan.vlan_interface_name}
+        ve_running_config = self.ve_running_config if self.ve_running_config is not None else VeRunningConfig(self.shell)
 
-        for int_vlan_data in split_on_bang(self.shell.do("show running-config interface")):
-            if regex.match("^interface ve (\d+)", int_vlan_data[0]):
-                current_vlan = vlans_interface_name_dict.get(regex[0])
-                if current_vlan:
-                    add_interface_vlan_data(current_vlan, int_vlan_data)
+        for vlan in vlans:
+            if vlan.vlan_interface_name:
+                add_interface_vlan_data(vlan, ve_running_config.get(vlan.vlan_interface_name))
 
     def add_dhcp_relay_server(self, vlan_number, ip_address):
         vlan = self._get_vlan(vlan_number, include_vif_data=True)
@@ -440,9 +444,14 @@ class Brocade(SwitchBase):
             elif regex.match(".*Associated Virtual Interface Id: (\d+).*", line):
                 vlan.vlan_interface_name = regex[0]
                 if include_vif_data:
-                    add_interface_vlan_data(vlan, self.shell.do("show running-config interface ve {}".format(regex[0])))
+                    add_interface_vlan_data(vlan, self._get_ve_running_config(regex[0]))
         return vlan
 
+    def _get_ve_running_config(self, ve_number):
+        if self.ve_running_config is not None:
+            return self.ve_running_config.get(ve_number)
+        return self.shell.do("show running-config interface ve {}".format(ve_number))
+
     def _show_vlan(self, vlan_number):
         return self.shell.do("show vlan {}".format(vlan_number))
 
@@ -579,6 +588,35 @@ def parse_interface(if_data):
         return i
 
 
+class VeRunningConfig(object):
+    """
+    Snapshot of the interfaces running-config indexed by ve number, read once on the first lookup
+
+    An invalidated ve is read again alone on its next lookup
+    """
+    def __init__(self, shell):
+        self.shell = shell
+        self.ve_data = None
+        self.stale = set()
+
+    def get(self, ve_number):
+        if self.ve_data is None:
+            self.ve_data = {}
+            for int_vlan_data in split_on_bang(self.shell.do("show running-config interface")):
+                if regex.match("^interface ve (\d+)", int_vlan_data[0]):
+                    self.ve_data[regex[0]] = int_vlan_data
+
+        if ve_number in self.stale:
+            self.ve_data[ve_number] = self.shell.do("show running-config interface ve {}".format(ve_number))
+            self.stale.discard(ve_number)
+
+        return self.ve_data.get(ve_number, [])
+
+    def invalidate(self, ve_number):
+        if self.ve_data is not None:
+            self.stale.add(ve_number)
+
+
 class VlanBrocade(Vlan):
     def __init__(self, *args, **kwargs):
         super(VlanBrocade, self).__init__(*args, **kwargs)
@@ -12,17 +12,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import copy
+import threading
+import time
+import types
 from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
 
 from netman.core.objects.bond import Bond
 from netman.core.objects.interface import Interface
 from netman.core.objects.interface_states import OFF, ON
 from netman.core.objects.port_modes import ACCESS, TRUNK
-from netman.core.objects.switch_base import SwitchBase
+from netman.core.objects.switch_base import SwitchBase, SwitchOperations
 from netman.core.objects.vlan import Vlan
 from netman.core.objects.vrrp_group import VrrpGroup
 
-__all__ = ['CachedSwitch']
+__all__ = ['CachedSwitch', 'SharedCachedSwitch', 'SwitchCache']
 
 
 class Cache(object):
@@ -71,6 +76,26 @@ class Cache(object):
     def values(self):
         return self.dict.values()
 
+    def items(self):
+        return self.dict.items()
+
+    def updated(self, key):
+        """
+        Returns the entry of key to change, a copy taking its place so what the previous reads returned is left as is
+        """
+        if key not in self.dict:
+            return self[key]
+        self.dict[key] = entry = _copy_entry(self.dict[key])
+        return entry
+
+
+def _copy_entry(entry):
+    entry = copy.copy(entry)
+    for name, value in entry.attributes().items():
+        if isinstance(value, (list, dict)):
+            setattr(entry, name, copy.copy(value))
+    return entry
+
 
 class VlanCache(Cache):
     object_type = Vlan
@@ -93,6 +118,12 @@ class BondCache(Cache):
 
 
 class CachedSwitch(SwitchBase):
+    """
+    Keeps what the switch returned and updates it with the changes made through it
+
+    The reads return the cached objects themselves, they must not be changed.  A change made through the switch
+    replaces the objects it touches with updated copies.
+    """
     def __init__(self, real_switch):
         super(CachedSwitch, self).__init__(real_switch.switch_descriptor)
         self.real_switch = real_switch
@@ -124,7 +155,7 @@ class CachedSwitch(SwitchBase):
         if (self.vlans_cache.refresh_items and number not in self.vlans_cache) \
                 or number in self.vlans_cache.refresh_items:
             self.vlans_cache[number] = self.real_switch.get_vlan(number)
-        return copy.deepcopy(self.vlans_cache[number])
+        return self.vlans_cache[number]
 
     def get_vlans(self):
         if None in self.vlans_cache.refresh_items:
@@ -133,38 +164,38 @@ class CachedSwitch(SwitchBase):
         for number in list(self.vlans_cache.refresh_items):
             self.get_vlan(number)
 
-        return copy.deepcopy(self.vlans_cache.values())
+        return self.vlans_cache.values()
 
     def get_vlan_interfaces(self, number):
         if (self.vlan_interfaces_cache.refresh_items and number not in self.vlan_interfaces_cache) \
                 or number in self.vlan_interfaces_cache.refresh_items:
             self.vlan_interfaces_cache[number] = self.real_switch.get_vlan_interfaces(number)
-        return copy.deepcopy(self.vlan_interfaces_cache[number])
+        return self.vlan_interfaces_cache[number]
 
     def get_interface(self, instance_id):
         if (self.interfaces_cache.refresh_items and instance_id not in self.interfaces_cache) \
                 or instance_id in self.interfaces_cache.refresh_items:
             self.interfaces_cache[instance_id] = self.real_switch.get_interface(instance_id)
-        return copy.deepcopy(self.interfaces_cache[instance_id])
+        return self.interfaces_cache[instance_id]
 
     def get_interfaces(self):
         if self.interfaces_cache.refresh_items:
             self.interfaces_cache = InterfaceCache(
                 (interface.name, interface)
                 for interface in self.real_switch.get_interfaces())
-        return copy.deepcopy(self.interfaces_cache.values())
+        return self.interfaces_cache.values()
 
     def get_bond(self, number):
         if (self.bonds_cache.refresh_items and number not in self.bonds_cache)\
                 or number in self.bonds_cache.refresh_items:
             self.bonds_cache[number] = self.real_switch.get_bond(number)
-        return copy.deepcopy(self.bonds_cache[number])
+        return self.bonds_cache[number]
 
     def get_bonds(self):
         if self.bonds_cache.refresh_items:
             self.bonds_cache = BondCache(
                 (bond.number, bond) for bond in self.real_switch.get_bonds())
-        return copy.deepcopy(self.bonds_cache.values())
+        return self.bonds_cache.values()
 
     def add_vlan(self, number, name=None):
         extras = {}
@@ -180,51 +211,51 @@ class CachedSwitch(SwitchBase):
 
     def set_vlan_access_group(self, vlan_number, direction, name):
         self.real_switch.set_vlan_access_group(vlan_number, direction, name)
-        self.vlans_cache[vlan_number].access_groups[direction] = name
+        self.vlans_cache.updated(vlan_number).access_groups[direction] = name
 
     def unset_vlan_access_group(self, vlan_number, direction):
         self.real_switch.unset_vlan_access_group(vlan_number, direction)
-        self.vlans_cache[vlan_number].access_groups[direction] = None
+        self.vlans_cache.updated(vlan_number).access_groups[direction] = None
 
     def add_ip_to_vlan(self, vlan_number, ip_network):
         self.real_switch.add_ip_to_vlan(vlan_number, ip_network)
-        self.vlans_cache[vlan_number].ips.append(ip_network)
+        self.vlans_cache.updated(vlan_number).ips.append(ip_network)
 
     def remove_ip_from_vlan(self, vlan_number, ip_network):
         self.real_switch.remove_ip_from_vlan(vlan_number, ip_network)
-        self.vlans_cache[vlan_number].ips = [
-            net for net in self.vlans_cache[vlan_number].ips
-            if str(net) != str(ip_network)]
+        vlan = self.vlans_cache.updated(vlan_number)
+        vlan.ips = [net for net in vlan.ips if str(net) != str(ip_network)]
 
     def set_vlan_vrf(self, vlan_number, vrf_name):
         self.real_switch.set_vlan_vrf(vlan_number, vrf_name)
-        self.vlans_cache[vlan_number].vrf_forwarding = vrf_name
+        self.vlans_cache.updated(vlan_number).vrf_forwarding = vrf_name
 
     def unset_vlan_vrf(self, vlan_number):
         self.real_switch.unset_vlan_vrf(vlan_number)
-        self.vlans_cache[vlan_number].vrf_forwarding = None
+        self.vlans_cache.updated(vlan_number).vrf_forwarding = None
 
     def set_access_mode(self, interface_id):
         self.real_switch.set_access_mode(interface_id)
-        self.interfaces_cache[interface_id].port_mode = ACCESS
-        self.interfaces_cache[interface_id].trunk_native_vlan = None
-        self.interfaces_cache[interface_id].trunk_vlans = []
+        interface = self.interfaces_cache.updated(interface_id)
+        interface.port_mode = ACCESS
+        interface.trunk_native_vlan = None
+        interface.trunk_vlans = []
 
     def set_trunk_mode(self, interface_id):
         self.real_switch.set_trunk_mode(interface_id)
-        self.interfaces_cache[interface_id].port_mode = TRUNK
+        self.interfaces_cache.updated(interface_id).port_mode = TRUNK
 
     def set_bond_access_mode(self, bond_number):
         self.real_switch.set_bond_access_mode(bond_number)
-        self.bonds_cache[bond_number].port_mode = ACCESS
+        self.bonds_cache.updated(bond_number).port_mode = ACCESS
 
     def set_bond_trunk_mode(self, bond_number):
         self.real_switch.set_bond_trunk_mode(bond_number)
-        self.bonds_cache[bond_number].port_mode = TRUNK
+        self.bonds_cache.updated(bond_number).port_mode = TRUNK
 
     def set_access_vlan(self, interface_id, vlan):
         self.real_switch.set_access_vlan(interface_id, vlan)
-        self.interfaces_cache[interface_id].access_vlan = vlan
+        self.interfaces_cache.updated(interface_id).access_vlan = vlan
 
     def reset_interface(self, interface_id):
         self.real_switch.reset_interface(interface_id)
@@ -232,43 +263,43 @@ class CachedSwitch(SwitchBase):
 
     def unset_interface_access_vlan(self, interface_id):
         self.real_switch.unset_interface_access_vlan(interface_id)
-        self.interfaces_cache[interface_id].access_vlan = None
+        self.interfaces_cache.updated(interface_id).access_vlan = None
 
     def set_interface_native_vlan(self, interface_id, vlan):
         self.real_switch.set_interface_native_vlan(interface_id, vlan)
-        self.interfaces_cache[interface_id].trunk_native_vlan = vlan
+        self.interfaces_cache.updated(interface_id).trunk_native_vlan = vlan
 
     def unset_interface_native_vlan(self, interface_id):
         self.real_switch.unset_interface_native_vlan(interface_id)
-        self.interfaces_cache[interface_id].trunk_native_vlan = None
+        self.interfaces_cache.updated(interface_id).trunk_native_vlan = None
 
     def set_bond_native_vlan(self, bond_number, vlan):
         self.real_switch.set_bond_native_vlan(bond_number, vlan)
-        self.bonds_cache[bond_number].trunk_native_vlan = vlan
+        self.bonds_cache.updated(bond_number).trunk_native_vlan = vlan
 
     def unset_bond_native_vlan(self, bond_number):
         self.real_switch.unset_bond_native_vlan(bond_number)
-        self.bonds_cache[bond_number].trunk_native_vlan = None
+        self.bonds_cache.updated(bond_number).trunk_native_vlan = None
 
     def add_trunk_vlan(self, interface_id, vlan):
         self.real_switch.add_trunk_vlan(interface_id, vlan)
-        self.interfaces_cache[interface_id].trunk_vlans.append(vlan)
+        self.interfaces_cache.updated(interface_id).trunk_vlans.append(vlan)
 
     def remove_trunk_vlan(self, interface_id, vlan):
         self.real_switch.remove_trunk_vlan(interface_id, vlan)
         try:
-            self.interfaces_cache[interface_id].trunk_vlans.remove(vlan)
+            self.interfaces_cache.updated(interface_id).trunk_vlans.remove(vlan)
         except ValueError:
             pass
 
     def add_bond_trunk_vlan(self, bond_number, vlan):
         self.real_switch.add_bond_trunk_vlan(bond_number, vlan)
-        self.bonds_cache[bond_number].trunk_vlans.append(vlan)
+        self.bonds_cache.updated(bond_number).trunk_vlans.append(vlan)
 
     def remove_bond_trunk_vlan(self, bond_number, vlan):
         self.real_switch.remove_bond_trunk_vlan(bond_number, vlan)
         try:
-            self.bonds_cache[bond_number].trunk_vlans.remove(vlan)
+            self.bonds_cache.updated(bond_number).trunk_vlans.remove(vlan)
         except ValueError:
             pass
 
@@ -294,7 +325,7 @@ class CachedSwitch(SwitchBase):
 
     def set_interface_state(self, interface_id, state):
         self.real_switch.set_interface_state(interface_id, state)
-        self.interfaces_cache[interface_id].shutdown = (state == OFF)
+        self.interfaces_cache.updated(interface_id).shutdown = (state == OFF)
 
     def unset_interface_state(self, interface_id):
         self.real_switch.unset_interface_state(interface_id)
@@ -302,11 +333,11 @@ class CachedSwitch(SwitchBase):
 
     def set_interface_auto_negotiation_state(self, interface_id, state):
         self.real_switch.set_interface_auto_negotiation_state(interface_id, state)
-        self.interfaces_cache[interface_id].auto_negotiation = (state == ON)
+        self.interfaces_cache.updated(interface_id).auto_negotiation = (state == ON)
 
     def unset_interface_auto_negotiation_state(self, interface_id):
         self.real_switch.unset_interface_auto_negotiation_state(interface_id)
-        self.interfaces_cache[interface_id].auto_negotiation = None
+        self.interfaces_cache.updated(interface_id).auto_negotiation = None
 
     def add_bond(self, number):
         self.real_switch.add_bond(number)
@@ -318,22 +349,20 @@ class CachedSwitch(SwitchBase):
 
     def add_interface_to_bond(self, interface, bond_number):
         self.real_switch.add_interface_to_bond(interface, bond_number)
-        self.bonds_cache[bond_number].members.append(interface)
+        self.bonds_cache.updated(bond_number).members.append(interface)
         self.interfaces_cache.refresh_items.add(interface)
 
     def remove_interface_from_bond(self, interface):
         self.real_switch.remove_interface_from_bond(interface)
-        self.interfaces_cache[interface].bond_master = None
+        self.interfaces_cache.updated(interface).bond_master = None
         self.interfaces_cache.refresh_items.add(interface)
-        for bond in self.bonds_cache.values():
-            try:
-                bond.members.remove(interface)
-            except ValueError:
-                pass
+        for number, bond in self.bonds_cache.items():
+            if interface in bond.members:
+                self.bonds_cache.updated(number).members.remove(interface)
 
     def set_bond_link_speed(self, number, speed):
         self.real_switch.set_bond_link_speed(number, speed)
-        self.bonds_cache[number].link_speed = speed
+        self.bonds_cache.updated(number).link_speed = speed
 
     def edit_bond_spanning_tree(self, number, edge=None):
         self.real_switch.edit_bond_spanning_tree(number, edge=edge)
@@ -347,7 +376,7 @@ class CachedSwitch(SwitchBase):
                                         dead_interval=dead_interval,
                                         track_id=track_id,
                                         track_decrement=track_decrement)
-        self.vlans_cache[vlan_number].vrrp_groups.append(VrrpGroup(
+        self.vlans_cache.updated(vlan_number).vrrp_groups.append(VrrpGroup(
             id=group_id, ips=ips, priority=priority,
             hello_interval=hello_interval, dead_interval=dead_interval,
             track_id=track_id, track_decrement=track_decrement
@@ -355,26 +384,25 @@ class CachedSwitch(SwitchBase):
 
     def remove_vrrp_group(self, vlan_number, group_id):
         self.real_switch.remove_vrrp_group(vlan_number, group_id)
-        for group in self.vlans_cache[vlan_number].vrrp_groups:
-            if group.id == group_id:
-                self.vlans_cache[vlan_number].vrrp_groups.remove(group)
+        vlan = self.vlans_cache.updated(vlan_number)
+        vlan.vrrp_groups = [group for group in vlan.vrrp_groups if group.id != group_id]
 
     def add_vlan_varp_ip(self, vlan_number, ip_network):
         self.real_switch.add_vlan_varp_ip(vlan_number, ip_network)
-        self.vlans_cache[vlan_number].varp_ips.append(ip_network)
+        self.vlans_cache.updated(vlan_number).varp_ips.append(ip_network)
 
     def remove_vlan_varp_ip(self, vlan_number, ip_network):
         self.real_switch.remove_vlan_varp_ip(vlan_number, ip_network)
-        self.vlans_cache[vlan_number].varp_ips.remove(ip_network)
+        self.vlans_cache.updated(vlan_number).varp_ips.remove(ip_network)
 
     def add_dhcp_relay_server(self, vlan_number, ip_address):
         self.real_switch.add_dhcp_relay_server(vlan_number, ip_address)
-        self.vlans_cache[vlan_number].dhcp_relay_servers.append(ip_address)
+        self.vlans_cache.updated(vlan_number).dhcp_relay_servers.append(ip_address)
 
     def remove_dhcp_relay_server(self, vlan_number, ip_address):
         self.real_switch.remove_dhcp_relay_server(vlan_number, ip_address)
         try:
-            self.vlans_cache[vlan_number].dhcp_relay_servers.remove(ip_address)
+            self.vlans_cache.updated(vlan_number).dhcp_relay_servers.remove(ip_address)
         except ValueError:
             pass
 
@@ -383,53 +411,240 @@ class CachedSwitch(SwitchBase):
 
     def set_vlan_icmp_redirects_state(self, vlan_number, state):
         self.real_switch.set_vlan_icmp_redirects_state(vlan_number, state)
-        self.vlans_cache[vlan_number].icmp_redirects = state
+        self.vlans_cache.updated(vlan_number).icmp_redirects = state
 
     def set_vlan_ntp_state(self, vlan_number, state):
         self.real_switch.set_vlan_ntp_state(vlan_number, state)
-        self.vlans_cache[vlan_number].ntp = state
+        self.vlans_cache.updated(vlan_number).ntp = state
 
     def set_vlan_unicast_rpf_mode(self, vlan_number, mode):
         self.real_switch.set_vlan_unicast_rpf_mode(vlan_number, mode)
-        self.vlans_cache[vlan_number].unicast_rpf_mode = mode
+        self.vlans_cache.updated(vlan_number).unicast_rpf_mode = mode
 
     def unset_vlan_unicast_rpf_mode(self, vlan_number):
         self.real_switch.unset_vlan_unicast_rpf_mode(vlan_number)
-        self.vlans_cache[vlan_number].unicast_rpf_mode = None
+        self.vlans_cache.updated(vlan_number).unicast_rpf_mode = None
 
     def get_versions(self):
         if self.versions_cache.refresh_items:
             self.versions_cache = Cache([(0, self.real_switch.get_versions())])
-        return copy.deepcopy(self.versions_cache[0])
+        return self.versions_cache[0]
 
     def set_interface_mtu(self, interface_id, size):
         self.real_switch.set_interface_mtu(interface_id, size)
-        self.interfaces_cache[interface_id].mtu = size
+        self.interfaces_cache.updated(interface_id).mtu = size
 
     def unset_interface_mtu(self, interface_id):
         self.real_switch.unset_interface_mtu(interface_id)
-        self.interfaces_cache[interface_id].mtu = None
+        self.interfaces_cache.updated(interface_id).mtu = None
 
     def set_bond_mtu(self, bond_number, size):
         self.real_switch.set_bond_mtu(bond_number, size)
-        self.bonds_cache[bond_number].mtu = size
+        self.bonds_cache.updated(bond_number).mtu = size
 
     def unset_bond_mtu(self, bond_number):
         self.real_switch.unset_bond_mtu(bond_number)
-        self.bonds_cache[bond_number].mtu = None
+        self.bonds_cache.updated(bond_number).mtu = None
 
     def set_vlan_arp_routing_state(self, vlan_number, state):
         self.real_switch.set_vlan_arp_routing_state(vlan_number, state)
-        self.vlans_cache[vlan_number].arp_routing = (state == ON)
+        self.vlans_cache.updated(vlan_number).arp_routing = (state == ON)
 
     def set_vlan_load_interval(self, vlan_number, time_interval):
         self.real_switch.set_vlan_load_interval(vlan_number, time_interval)
-        self.vlans_cache[vlan_number].load_interval = time_interval
+        self.vlans_cache.updated(vlan_number).load_interval = time_interval
 
     def unset_vlan_load_interval(self, vlan_number):
         self.real_switch.unset_vlan_load_interval(vlan_number)
-        self.vlans_cache[vlan_number].load_interval = None
+        self.vlans_cache.updated(vlan_number).load_interval = None
 
     def set_vlan_mpls_ip_state(self, vlan_number, state):
         self.real_switch.set_vlan_mpls_ip_state(vlan_number, state)
-        self.vlans_cache[vlan_number].mpls_ip = state
+        self.vlans_cache.updated(vlan_number).mpls_ip = state
+
+
+class SwitchCache(object):
+    """
+    Process wide cache of the vlans, interfaces, bonds and versions read on the switches, what is read on a
+    resource being kept ttls[resource] seconds.  A resource without a ttl is never cached.
+
+    switch_cache = SwitchCache(ttls={"vlans": 30, "interfaces": 30, "bonds": 30, "versions": 300})
+    """
+    resources = {
+        "get_vlan": "vlans",
+        "get_vlans": "vlans",
+        "get_vlan_interfaces": "vlans",
+        "get_interface": "interfaces",
+        "get_interfaces": "interfaces",
+        "get_bond": "bonds",
+        "get_bonds": "bonds",
+        "get_versions": "versions"
+    }
+
+    def __init__(self, ttls):
+        self.ttls = dict(ttls)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._generations = {}
+
+    def read(self, switch_descriptor, method_name, args, kwargs, max_age, read):
+        """
+        Returns what read() returned for the same call less than max_age seconds ago, or calls it and keeps its
+        result.  None as max_age always calls read().  The cached results are shared by every caller and must be
+        treated as read only, the writes drop them through invalidate() instead of changing them.
+        """
+        ttl = self.ttls.get(self.resources.get(method_name))
+        if not ttl:
+            return read()
+
+        hostname = switch_descriptor.hostname
+        key = _entry_key(switch_descriptor, method_name, args, kwargs)
+        with self._lock:
+            if max_age is not None:
+                entry = self._entries.get(hostname, {}).get(key)
+                if entry is not None and time.time() - entry[0] <= min(max_age, ttl):
+                    self.hits += 1
+                    return entry[1]
+                self.misses += 1
+            generation = self._generations.get(hostname, 0)
+
+        read_at = time.time()
+        result = read()
+
+        with self._lock:
+            if self._generations.get(hostname, 0) == generation:
+                self._entries.setdefault(hostname, {})[key] = (read_at, result)
+        return result
+
+    def invalidate(self, hostname):
+        """
+        Drops what is cached for a switch, a read started before is not kept either
+        """
+        with self._lock:
+            self._entries.pop(hostname, None)
+            self._generations[hostname] = self._generations.get(hostname, 0) + 1
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "switches": len(self._entries)
+            }
+
+
+class SharedCachedSwitch(SwitchOperations):
+    """
+    Wrap your switch with this to share what it reads with the other switches of a SwitchCache
+
+    The reads are answered from the cache only when max_age is set, with results at most max_age seconds old,
+    and connect() is then deferred to the first call needing the switch.  Otherwise they go to the switch and
+    refresh the cache.  Any other call drops what is cached for the switch, as does the end of a transaction.
+    """
+    def __init__(self, wrapped_switch, switch_cache, max_age=None):
+        self.wrapped_switch = wrapped_switch
+        self.switch_cache = switch_cache
+        self.max_age = max_age
+        self._connect_on_first_use = False
+        self._in_transaction = False
+
+    def __new__(cls, *args, **kwargs):
+        obj = super(SharedCachedSwitch, cls).__new__(cls, *args, **kwargs)
+
+        for member in dir(cls):
+            if not member.startswith("_") and member not in cls.__dict__:
+                _wrap_method_with_cache(cls, obj, member)
+
+        return obj
+
+    def connect(self):
+        if self.max_age is not None:
+            self._connect_on_first_use = True
+        else:
+            self.wrapped_switch.connect()
+
+    def disconnect(self):
+        if self._connect_on_first_use:
+            self._connect_on_first_use = False
+        else:
+            self.wrapped_switch.disconnect()
+
+    @contextmanager
+    def transaction(self):
+        self.start_transaction()
+        try:
+            yield self
+            self.commit_transaction()
+        except Exception:
+            self.rollback_transaction()
+            raise
+        finally:
+            self.end_transaction()
+
+    def start_transaction(self):
+        self._use_connection()
+        self.wrapped_switch.start_transaction()
+        self._in_transaction = True
+
+    def commit_transaction(self):
+        self.wrapped_switch.commit_transaction()
+
+    def rollback_transaction(self):
+        self.wrapped_switch.rollback_transaction()
+
+    def end_transaction(self):
+        self._in_transaction = False
+        try:
+            self.wrapped_switch.end_transaction()
+        finally:
+            self.switch_cache.invalidate(self.switch_descriptor.hostname)
+
+    @property
+    def switch_descriptor(self):
+        return self.wrapped_switch.switch_descriptor
+
+    def _read(self, method_name, *args, **kwargs):
+        def read():
+            self._use_connection()
+            return getattr(self.wrapped_switch, method_name)(*args, **kwargs)
+
+        if self._in_transaction:
+            return read()
+
+        return self.switch_cache.read(self.switch_descriptor, method_name, args, kwargs, self.max_age, read)
+
+    def _write(self, method_name, *args, **kwargs):
+        self._use_connection()
+        try:
+            return getattr(self.wrapped_switch, method_name)(*args, **kwargs)
+        finally:
+            self.switch_cache.invalidate(self.switch_descriptor.hostname)
+
+    def _use_connection(self):
+        if self._connect_on_first_use:
+            self._connect_on_first_use = False
+            self.wrapped_switch.connect()
+
+
+def _wrap_method_with_cache(cls, obj, method_name):
+    original = getattr(cls, method_name)
+    if not callable(original) or isinstance(original, property):
+        return
+
+    if method_name.startswith("get_"):
+        @wraps(original)
+        def wrapped(self, *args, **kwargs):
+            return self._read(method_name, *args, **kwargs)
+    else:
+        @wraps(original)
+        def wrapped(self, *args, **kwargs):
+            return self._write(method_name, *args, **kwargs)
+
+    setattr(obj, method_name, types.MethodType(wrapped, obj))
+
+
+def _entry_key(switch_descriptor, method_name, args, kwargs):
+    return repr((switch_descriptor.model, switch_descriptor.port, switch_descriptor.username,
+                 switch_descriptor.password, method_name, args, sorted(kwargs.items())))
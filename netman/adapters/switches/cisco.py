@@ -18,7 +18,7 @@ from netaddr.ip import IPNetwork, IPAddress
 
 from netman import regex
 from netman.adapters.shell.ssh import SshClient
-from netman.adapters.switches.util import SubShell, split_on_dedent, split_on_bang, no_output
+from netman.adapters.switches.util import SubShell, split_on_bang, no_output
 from netman.core.objects.access_groups import IN, OUT
 from netman.core.objects.exceptions import IPNotAvailable, UnknownVlan, UnknownIP, UnknownAccessGroup, BadVlanNumber, \
     BadVlanName, UnknownInterface, UnknownVrf, VlanVrfNotSet, IPAlreadySet, VrrpAlreadyExistsForVlan, BadVrrpGroupNumber, \
@@ -58,6 +58,8 @@ class Cisco(SwitchBase):
         )
         if self.switch_descriptor.port:
             params["port"] = self.switch_descriptor.port
+        if self.switch_descriptor.transcript:
+            params["transcript"] = self.switch_descriptor.transcript
 
         self.ssh = SshClient(**params)
 
@@ -106,14 +108,11 @@ class Cisco(SwitchBase):
 
                 vlans[number] = Vlan(int(number), name, icmp_redirects=True, arp_routing=True, ntp=True)
 
-        for ip_interface_data in split_on_dedent(self.ssh.do("show ip interface")):
-            if regex.match("^Vlan(\d+)\s.*", ip_interface_data[0]):
+        for interface_data in split_on_bang(self.ssh.do("show running-config | begin interface")):
+            if regex.match("^interface Vlan(\d+)$", interface_data[0]):
                 current_vlan = vlans.get(regex[0])
                 if current_vlan:
-                    apply_interface_running_config_data(
-                        current_vlan,
-                        self.ssh.do("show running-config interface vlan {}".format(current_vlan.number))
-                    )
+                    apply_interface_running_config_data(current_vlan, interface_data)
         return vlans.values()
 
     def add_vlan(self, number, name=None):
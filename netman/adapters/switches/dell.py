@@ -71,6 +71,8 @@ class Dell(SwitchBase):
 
         if self.switch_descriptor.port:
             params["port"] = self.switch_descriptor.port
+        if self.switch_descriptor.transcript:
+            params["transcript"] = self.switch_descriptor.transcript
 
         self.shell = self.shell_factory(**params)
 
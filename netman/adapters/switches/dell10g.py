@@ -76,7 +76,8 @@ class Dell10G(Dell):
 
     def get_interfaces(self):
         result = self.shell.do('show interfaces status')
-        return [self.read_interface(name) for name in parse_interface_names(result)]
+        interfaces_data = self.get_interfaces_data()
+        return [parse_interface(name, interfaces_data.get(name, [])) for name in parse_interface_names(result)]
 
     def add_vlan(self, number, name=None):
         result = self.shell.do("show vlan id {}".format(number))
@@ -173,23 +174,24 @@ class Dell10G(Dell):
                 raise UnknownInterface(interface_id)
         return interface_data
 
+    def get_interfaces_data(self):
+        interfaces_data = {}
+        current_data = []
+        for line in self.shell.do("show running-config"):
+            if regex.match(r"^interface (\S+)$", line):
+                current_data = [interfaces_data.setdefault(name, [])
+                                for name in self.parse_interface_port_list(regex[0])]
+            elif regex.match(r"^interface (port-channel|tengigabitethernet|fortygigabitethernet) (\S+)$", line):
+                current_data = [interfaces_data.setdefault("{} {}".format(*regex), [])]
+            elif regex.match("^(interface .*|exit)$", line):
+                current_data = []
+            else:
+                for data in current_data:
+                    data.append(line)
+        return interfaces_data
+
     def read_interface(self, interface_name):
-        data = self.get_interface_data(interface_name)
-
-        interface = Interface(name=interface_name, port_mode=ACCESS, shutdown=False)
-        for line in data:
-            if regex.match("switchport mode \S+", line):
-                interface.port_mode = TRUNK
-            if regex.match("shutdown", line):
-                interface.shutdown = True
-            if regex.match("switchport access vlan (\d+)", line):
-                interface.access_vlan = int(regex[0])
-            if regex.match("switchport general pvid (\d+)", line):
-                interface.trunk_native_vlan = int(regex[0])
-            if regex.match("switchport \S* allowed vlan (add )?(\S+)", line):
-                interface.trunk_vlans = parse_vlan_ranges(regex[1])
-
-        return interface
+        return parse_interface(interface_name, self.get_interface_data(interface_name))
 
     def parse_interface_port_list(self, ports):
         port_list = filter(None, ports.split(','))
@@ -252,6 +254,23 @@ def parse_interface_names(status_list):
     return interfaces
 
 
+def parse_interface(interface_name, data):
+    interface = Interface(name=interface_name, port_mode=ACCESS, shutdown=False)
+    for line in data:
+        if regex.match("switchport mode \S+", line):
+            interface.port_mode = TRUNK
+        if regex.match("shutdown", line):
+            interface.shutdown = True
+        if regex.match("switchport access vlan (\d+)", line):
+            interface.access_vlan = int(regex[0])
+        if regex.match("switchport general pvid (\d+)", line):
+            interface.trunk_native_vlan = int(regex[0])
+        if regex.match("switchport \S* allowed vlan (add )?(\S+)", line):
+            interface.trunk_vlans = parse_vlan_ranges(regex[1])
+
+    return interface
+
+
 def parse_vlan_list(result):
     vlans = []
     for line in result:
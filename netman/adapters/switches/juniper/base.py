@@ -18,6 +18,7 @@ from ncclient.xml_ import new_ele, sub_ele, to_ele, to_xml
 from netaddr import IPNetwork
 
 from netman import regex
+from netman.adapters.switches.juniper.config_snapshot import ConfigSnapshot
 from netman.core.objects.access_groups import IN, OUT
 from netman.core.objects.bond import Bond
 from netman.core.objects.exceptions import LockedSwitch, VlanAlreadyExist, UnknownVlan, \
@@ -38,6 +39,7 @@ class Juniper(SwitchBase):
         self.timeout = timeout
         self.custom_strategies = custom_strategies
         self.netconf = None
+        self.config_snapshot = None
 
         self.in_transaction = False
 
@@ -74,13 +76,17 @@ class Juniper(SwitchBase):
             else:
                 raise
         self.in_transaction = True
+        self.config_snapshot = ConfigSnapshot(self.netconf)
 
     def end_transaction(self):
         self.in_transaction = False
+        self.config_snapshot = None
         self.netconf.unlock(target="candidate")
 
     def rollback_transaction(self):
         self.netconf.discard_changes()
+        if self.config_snapshot is not None:
+            self.config_snapshot = ConfigSnapshot(self.netconf)
 
     def commit_transaction(self):
         try:
@@ -118,8 +124,7 @@ class Juniper(SwitchBase):
 
             l3_if_type, l3_if_name = self.custom_strategies.get_l3_interface(vlan_node)
             if l3_if_name is not None:
-                interface_vlan_node = first(config.xpath("data/configuration/interfaces/interface/name[text()=\"{}\"]/.."
-                                                         "/unit/name[text()=\"{}\"]/..".format(l3_if_type, l3_if_name)))
+                interface_vlan_node = config.index.units.get((l3_if_type, l3_if_name))
                 if interface_vlan_node is not None:
                     vlan.ips = parse_ips(interface_vlan_node)
                     vlan.access_groups[IN] = parse_inet_filter(interface_vlan_node, "input")
@@ -135,8 +140,7 @@ class Juniper(SwitchBase):
         interface_list = []
         for phys_int in physical_interfaces:
             if not phys_int.name.startswith("ae"):
-                interface_node = first(config.xpath("data/configuration/interfaces/interface/name[text()=\"{}\"]/.."
-                                                    .format(phys_int.name)))
+                interface_node = config.index.interfaces.get(phys_int.name)
                 if interface_node is not None:
                     interface_list.append(self.node_to_interface(interface_node, config))
                 else:
@@ -674,14 +678,23 @@ class Juniper(SwitchBase):
             self.netconf.edit_config(target="candidate", config=config)
         except RPCError as e:
             self.logger.info("An RPCError was raised : {}".format(e))
+            if self.config_snapshot is not None:
+                self.config_snapshot = ConfigSnapshot(self.netconf)
             raise
 
+        if self.config_snapshot is not None:
+            self.config_snapshot.apply(configuration.root)
+
     def query(self, *args):
         filter_node = new_ele("filter")
         conf = sub_ele(filter_node, "configuration")
         for arg in args:
             conf.append(arg())
-        return self.netconf.get_config(source="candidate" if self.in_transaction else "running", filter=filter_node)
+
+        if self.config_snapshot is not None:
+            return IndexedConfig(self.config_snapshot.query(conf))
+        return IndexedConfig(self.netconf.get_config(source="candidate" if self.in_transaction else "running",
+                                                     filter=filter_node))
 
     def get_interface(self, interface_id):
         config = self.query(one_interface(interface_id), self.custom_strategies.all_vlans)
@@ -693,12 +706,10 @@ class Juniper(SwitchBase):
 
     def get_interface_config(self, interface_id, config=None):
         config = config or self.query(one_interface(interface_id))
-        interface_node = first(config.xpath(
-            "data/configuration/interfaces/interface/name[text()=\"{0:s}\"]/..".format(interface_id)))
-        return interface_node
+        return config.index.interfaces.get(interface_id)
 
     def get_bond_config(self, number, config):
-        interface_node = first(config.xpath("data/configuration/interfaces/interface/name[text()=\"{}\"]/..".format(bond_name(number))))
+        interface_node = config.index.interfaces.get(bond_name(number))
         if interface_node is None:
             raise UnknownBond(number)
         return interface_node
@@ -706,10 +717,7 @@ class Juniper(SwitchBase):
     def get_bond_slaves_config(self, bond_id, config=None):
         config = config or self.query(all_interfaces)
 
-        return config.xpath(
-            'data/configuration/interfaces/interface/ether-options/'
-            'ieee-802.3ad/bundle[text()=\"{0}\"]/../../..'.format(
-                bond_name(bond_id)))
+        return config.index.bundle_members.get(bond_name(bond_id), [])
 
     def get_port_mode(self, interface_node):
         if interface_node is None:
@@ -872,6 +880,58 @@ class Update(object):
         self.sub_protocol_roots[protocol].append(interface)
 
 
+class IndexedConfig(object):
+    def __init__(self, reply):
+        self.reply = reply
+        self._index = None
+
+    def xpath(self, expression):
+        return self.reply.xpath(expression)
+
+    def __getattr__(self, item):
+        return getattr(self.reply, item)
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = ConfigIndex(self)
+        return self._index
+
+
+class ConfigIndex(object):
+    """
+    Lookup tables over a get-config reply, built in a single pass, the first node wins like first(config.xpath(...))
+    """
+    def __init__(self, config):
+        self.interfaces = {}
+        self.units = {}
+        self.bundle_members = {}
+        self.vlans_by_id = {}
+        self.vlan_ids_by_name = {}
+        self.bridge_domains_by_id = {}
+
+        for interface_node in config.xpath("data/configuration/interfaces/interface"):
+            name = first_text(interface_node.xpath("name"))
+            self.interfaces.setdefault(name, interface_node)
+
+            for unit_node in interface_node.xpath("unit"):
+                self.units.setdefault((name, first_text(unit_node.xpath("name"))), unit_node)
+
+            for bundle in set(node.text for node in interface_node.xpath("ether-options/ieee-802.3ad/bundle")):
+                self.bundle_members.setdefault(bundle, []).append(interface_node)
+
+        for vlan_node in config.xpath("data/configuration/vlans/vlan"):
+            vlan_id = first_text(vlan_node.xpath("vlan-id"))
+            if vlan_id is not None:
+                self.vlans_by_id.setdefault(vlan_id, vlan_node)
+                self.vlan_ids_by_name.setdefault(first_text(vlan_node.xpath("name")), int(vlan_id))
+
+        for domain_node in config.xpath("data/configuration/bridge-domains/domain"):
+            vlan_id = first_text(domain_node.xpath("vlan-id"))
+            if vlan_id is not None:
+                self.bridge_domains_by_id.setdefault(vlan_id, domain_node)
+
+
 def bond_update(number, *aggregated_ether_options):
     content = to_ele("""
         <interface>
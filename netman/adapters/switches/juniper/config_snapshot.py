@@ -0,0 +1,176 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from copy import deepcopy
+
+from ncclient.xml_ import new_ele, sub_ele, to_ele, to_xml
+
+LEAF_LISTS = ("members", "vlan-id-list")
+
+
+class ConfigSnapshot(object):
+    """
+    Local copy of the candidate configuration, kept for the duration of a transaction
+
+    Each top level section (interfaces, vlans, protocols...) is fetched from the switch the first time a query
+    needs it, the edits pushed afterward are merged in the local copy so the next queries are answered locally.
+    """
+
+    def __init__(self, netconf):
+        self.netconf = netconf
+        self.configuration = to_ele("<configuration/>")
+        self.sections = set()
+
+    def query(self, configuration_filter):
+        self._fetch_missing_sections(configuration_filter)
+
+        reply = to_ele("<rpc-reply><data/></rpc-reply>")
+        configuration = apply_filter(configuration_filter, self.configuration)
+        first(reply.xpath("data")).append(configuration if configuration is not None else to_ele("<configuration/>"))
+        return SnapshotReply(reply)
+
+    def apply(self, configuration):
+        for edit in _elements(configuration):
+            if _tag(edit) in self.sections:
+                merge(self.configuration, edit)
+
+    def _fetch_missing_sections(self, configuration_filter):
+        missing = []
+        for node in _elements(configuration_filter):
+            if _tag(node) not in self.sections and _tag(node) not in missing:
+                missing.append(_tag(node))
+
+        if missing:
+            filter_node = new_ele("filter")
+            conf = sub_ele(filter_node, "configuration")
+            for section in missing:
+                conf.append(to_ele("<{}/>".format(section)))
+
+            reply = self.netconf.get_config(source="candidate", filter=filter_node)
+            fetched = first(reply.xpath("data/configuration"))
+            for section in missing:
+                for node in _children(fetched, section) if fetched is not None else []:
+                    self.configuration.append(_copy(node))
+                self.sections.add(section)
+
+
+class SnapshotReply(object):
+    def __init__(self, root):
+        self.root = root
+
+    def xpath(self, expression):
+        return self.root.xpath(expression)
+
+    @property
+    def data_xml(self):
+        return to_xml(first(self.root.xpath("data")))
+
+
+def apply_filter(filter_node, data_node):
+    """
+    Subtree filtering (RFC 6241 section 6) of data_node, returns None when nothing matches
+    """
+    children = list(_elements(filter_node))
+    content_matches = [c for c in children if len(c) == 0 and _text(c)]
+    others = [c for c in children if not (len(c) == 0 and _text(c))]
+
+    for match in content_matches:
+        if not any(_text(node) == _text(match) for node in _children(data_node, _tag(match))):
+            return None
+
+    if not others:
+        return _copy(data_node)
+
+    result = to_ele("<{}/>".format(_tag(data_node)))
+    for match in content_matches:
+        for node in _children(data_node, _tag(match)):
+            if _text(node) == _text(match):
+                result.append(_copy(node))
+
+    found = False
+    for sub_filter in others:
+        for node in _children(data_node, _tag(sub_filter)):
+            selected = _copy(node) if len(sub_filter) == 0 else apply_filter(sub_filter, node)
+            if selected is not None:
+                result.append(selected)
+                found = True
+
+    return result if found else None
+
+
+def merge(target, edit):
+    """
+    Applies the edit-config of edit, a child of target, on target
+    """
+    matches = _matching_children(target, edit)
+    operation = edit.get("operation")
+
+    if operation == "delete":
+        for node in matches:
+            target.remove(node)
+    elif operation == "replace" or not matches:
+        for node in matches:
+            target.remove(node)
+        target.append(_copy(edit))
+    elif len(_elements(edit)) == 0:
+        matches[0].text = edit.text
+    else:
+        for child in _elements(edit):
+            merge(matches[0], child)
+
+
+def first(node):
+    return node[0] if node else None
+
+
+def _matching_children(target, edit):
+    candidates = _children(target, _tag(edit))
+
+    key = first([c for c in _elements(edit) if _tag(c) == "name"])
+    if key is not None:
+        return [c for c in candidates if _text(first(_children(c, "name"))) == _text(key)]
+
+    if _tag(edit) in LEAF_LISTS and _text(edit):
+        return [c for c in candidates if _text(c) == _text(edit)]
+
+    return candidates if _tag(edit) in LEAF_LISTS else candidates[:1]
+
+
+def _copy(node):
+    copied = deepcopy(node)
+    for element in list(copied.iter()):
+        if not isinstance(element.tag, basestring):
+            continue
+        if element is not copied and element.get("operation") == "delete":
+            element.getparent().remove(element)
+            continue
+        element.tag = _tag(element)
+        element.attrib.pop("operation", None)
+    return copied
+
+
+def _elements(node):
+    return [c for c in node if isinstance(c.tag, basestring)]
+
+
+def _children(node, tag):
+    return [c for c in _elements(node) if _tag(c) == tag]
+
+
+def _tag(node):
+    return node.tag.split("}")[-1]
+
+
+def _text(node):
+    return node.text.strip() if node is not None and node.text else None
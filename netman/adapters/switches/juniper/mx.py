@@ -352,8 +352,7 @@ class JuniperMXCustomStrategies(JuniperQfxCopperCustomStrategies):
         return config.xpath("data/configuration/bridge-domains/domain")
 
     def vlan_node(self, config, number):
-        vlan_node = first(config.xpath("data/configuration/bridge-domains/domain/vlan-id[text()=\"{}\"]/.."
-                                       .format(number)))
+        vlan_node = config.index.bridge_domains_by_id.get(str(number))
 
         if vlan_node is None:
             raise UnknownVlan(number)
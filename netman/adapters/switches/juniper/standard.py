@@ -14,7 +14,7 @@
 from ncclient.xml_ import to_ele, new_ele
 
 from netman.adapters.switches.juniper.base import interface_speed, interface_replace, interface_speed_update, \
-    first_text, bond_name, Juniper, first, value_of, parse_range, to_range
+    first_text, bond_name, Juniper, first, parse_range, to_range
 from netman.core.objects.exceptions import BadVlanName, BadVlanNumber, VlanAlreadyExist, UnknownVlan
 
 
@@ -101,7 +101,7 @@ class JuniperCustomStrategies(object):
         return config.xpath("data/configuration/vlans/vlan")
 
     def vlan_node(self, config, number):
-        vlan_node = first(config.xpath("data/configuration/vlans/vlan/vlan-id[text()=\"{}\"]/..".format(number)))
+        vlan_node = config.index.vlans_by_id.get(str(number))
 
         if vlan_node is None:
             raise UnknownVlan(number)
@@ -152,7 +152,7 @@ class JuniperCustomStrategies(object):
     def list_vlan_members(self, interface_node, config):
         vlans = set()
         for members in interface_node.xpath("unit/family/ethernet-switching/vlan/members"):
-            vlan_id = value_of(config.xpath('data/configuration/vlans/vlan/name[text()="{}"]/../vlan-id'.format(members.text)), transformer=int)
+            vlan_id = config.index.vlan_ids_by_name.get(members.text)
             if vlan_id:
                 vlans = vlans.union([vlan_id])
             else:
@@ -13,12 +13,15 @@
 # limitations under the License.
 
 import __builtin__
+from contextlib import contextmanager
 import importlib
 import json
+import threading
 import uuid
 import warnings
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from netman import raw_or_json
 from netman.api import NETMAN_API_VERSION
@@ -26,11 +29,15 @@ from netman.api.objects import bond
 from netman.api.objects import interface
 from netman.api.objects import vlan
 from netman.core.objects.access_groups import IN, OUT
-from netman.core.objects.exceptions import NetmanException, UnknownSession
+from netman.core.objects.exceptions import NetmanException, UnknownSession, BatchOperationFailed
 from netman.core.objects.interface_states import OFF, ON
 from netman.core.objects.switch_base import SwitchBase
 
 
+default_pool_size = 10
+default_keep_alive = True
+
+
 def factory(switch_descriptor):
     warnings.warn("Use SwitchFactory.get_switch_by_descriptor directly to instanciate a switch", DeprecationWarning)
     return RemoteSwitch(switch_descriptor)
@@ -41,8 +48,8 @@ class RemoteSwitch(SwitchBase):
 
     def __init__(self, switch_descriptor):
         super(RemoteSwitch, self).__init__(switch_descriptor)
-        self.requests = requests
         self.session_id = None
+        self.pending_operations = None
 
         if isinstance(self.switch_descriptor.netman_server, list):
             self._proxy = self.switch_descriptor.netman_server[0]
@@ -51,6 +58,8 @@ class RemoteSwitch(SwitchBase):
             self._proxy = self.switch_descriptor.netman_server
             self._next_proxies = []
 
+        self.requests = http_sessions.get(self._proxy)
+
     def _connect(self):
         self.session_id = str(uuid.uuid4())
         self.logger.info("Requesting session {}".format(self.session_id))
@@ -83,6 +92,7 @@ class RemoteSwitch(SwitchBase):
         self.logger.info("Started Transaction for session_id: {}".format(self.session_id))
 
     def commit_transaction(self):
+        self._send_pending_operations()
         self.logger.info("Commiting {}".format(self.session_id))
         url = "{netman}/switches-sessions/{session_id}/actions".format(netman=self._proxy, session_id=self.session_id)
         self.validated(self.requests.post(url=url, headers={'Netman-Verbose-Errors': "yes",
@@ -91,6 +101,8 @@ class RemoteSwitch(SwitchBase):
         self.logger.info("Commited {}".format(self.session_id))
 
     def rollback_transaction(self):
+        if self.pending_operations:
+            self.pending_operations = []
         self.logger.info("Rollbacking {}".format(self.session_id))
         url = "{netman}/switches-sessions/{session_id}/actions".format(netman=self._proxy, session_id=self.session_id)
         self.validated(self.requests.post(url=url, headers={'Netman-Verbose-Errors': "yes",
@@ -348,11 +360,14 @@ class RemoteSwitch(SwitchBase):
         return self.get("/versions").json()
 
     def get(self, relative_url):
+        self._send_pending_operations()
         return self._retry_on_unknown_session(
             lambda: self.validated(
                 self.requests.get(**self.request(relative_url))))
 
     def post(self, relative_url, data=None, raw_data=None):
+        if self._queue_operation("POST", relative_url, raw_or_json(raw_data, data)):
+            return None
         return self._retry_on_unknown_session(
             lambda: self.validated(
                 self.requests.post(
@@ -360,6 +375,8 @@ class RemoteSwitch(SwitchBase):
                     **self.request(relative_url))))
 
     def put(self, relative_url, data=None, raw_data=None):
+        if self._queue_operation("PUT", relative_url, raw_or_json(raw_data, data)):
+            return None
         return self._retry_on_unknown_session(
             lambda: self.validated(
                 self.requests.put(
@@ -367,10 +384,77 @@ class RemoteSwitch(SwitchBase):
                     **self.request(relative_url))))
 
     def delete(self, relative_url):
+        if self._queue_operation("DELETE", relative_url, None):
+            return None
         return self._retry_on_unknown_session(
             lambda: self.validated(
                 self.requests.delete(**self.request(relative_url))))
 
+    @contextmanager
+    def batched(self):
+        """
+        Queues the changes made within the block and sends them in a single request when leaving it, or before a
+        read or a commit made within it.  Unlike the changes made outside a batch, their errors do not come out of the
+        calls making them : a failed change raises BatchOperationFailed naming it along with the changes that were
+        then not applied.
+        """
+        if self.pending_operations is not None:
+            yield self
+            return
+
+        self.pending_operations = []
+        try:
+            yield self
+            self._send_pending_operations()
+        finally:
+            self.pending_operations = None
+
+    def _queue_operation(self, method, relative_url, body):
+        if self.pending_operations is None:
+            return False
+
+        self.pending_operations.append({"method": method, "resource": relative_url, "body": body})
+        return True
+
+    def _send_pending_operations(self):
+        if not self.pending_operations:
+            return
+
+        operations, self.pending_operations = self.pending_operations, []
+        self.logger.info("Sending {} batched operations".format(len(operations)))
+        response = self._retry_on_unknown_session(lambda: self._send_batch(operations))
+
+        if response is None:
+            self.logger.info("The proxy does not support batches, sending the operations one by one")
+            for i, operation in enumerate(operations):
+                try:
+                    self._retry_on_unknown_session(
+                        lambda: self.validated(getattr(self.requests, operation["method"].lower())(
+                            data=operation["body"], **self.request(operation["resource"]))))
+                except Exception as e:
+                    raise BatchOperationFailed(_describe(operation), e, [_describe(o) for o in operations[i + 1:]])
+
+    def _send_batch(self, operations):
+        response = self.requests.post(data=json.dumps(operations), **self.request("/batch"))
+
+        if response.status_code in (404, 405) and not _is_json(response):
+            return None
+
+        results = _json_or_none(response)
+        if response.status_code >= 400 and isinstance(results, list):
+            failed = results[-1]
+            if "action" in failed:
+                not_applied = operations
+            elif self.session_id:
+                not_applied = operations[len(results):]
+            else:
+                not_applied = operations[:len(results) - 1] + operations[len(results):]
+            try:
+                self.validated(BatchedReply(failed))
+            except Exception as e:
+                raise BatchOperationFailed(_describe(failed), e, [_describe(o) for o in not_applied])
+        return self.validated(response)
+
     def request(self, relative_url=''):
         headers = {
             'Netman-Model': self.switch_descriptor.model,
@@ -437,5 +521,69 @@ class RemoteSwitch(SwitchBase):
             return operation()
 
 
+class HttpSessions(object):
+    """
+    One keep-alive requests.Session per netman proxy, shared by every RemoteSwitch talking to it so the
+    calls of a switch session reuse the same few connections instead of opening one per call
+    """
+
+    def __init__(self):
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def get(self, proxy_url):
+        if not default_keep_alive:
+            return requests
+
+        with self.lock:
+            if proxy_url not in self.sessions:
+                self.sessions[proxy_url] = _pooled_session(default_pool_size)
+            return self.sessions[proxy_url]
+
+    def close(self):
+        with self.lock:
+            sessions, self.sessions = self.sessions, {}
+
+        for session in sessions.values():
+            session.close()
+
+
+def _pooled_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+http_sessions = HttpSessions()
+
+
+class BatchedReply(object):
+    def __init__(self, result):
+        self.status_code = result["status_code"]
+        self.content = json.dumps(result["result"])
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def _describe(operation):
+    if "action" in operation:
+        return operation["action"]
+    return "{} {}".format(operation["method"], operation["resource"])
+
+
+def _json_or_none(response):
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def _is_json(response):
+    return _json_or_none(response) is not None
+
+
 def _get_json_boolean(state):
     return {True: "true", False: "false"}[state]
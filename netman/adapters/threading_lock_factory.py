@@ -16,5 +16,49 @@ import threading
 
 
 class ThreadingLockFactory(object):
+    def __init__(self, read_write=False):
+        self.read_write = read_write
+
     def new_lock(self, *_):
-        return threading.Lock()
+        return ReadWriteLock() if self.read_write else threading.Lock()
+
+
+class ReadWriteLock(object):
+    """
+    acquire/release for the writers, acquire_read/release_read for the readers
+
+    Readers share the lock, a writer has it for itself.  A waiting writer holds back the readers arriving after
+    it so a steady flow of reads can't starve the writes.
+    """
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    def acquire(self):
+        with self._condition:
+            self._waiting_writers += 1
+            try:
+                while self._writing or self._readers > 0:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writing = True
+
+    def release(self):
+        with self._condition:
+            self._writing = False
+            self._condition.notify_all()
+
+    def acquire_read(self):
+        with self._condition:
+            while self._writing or self._waiting_writers > 0:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
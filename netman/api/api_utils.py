@@ -16,6 +16,11 @@ from functools import wraps
 import json
 import logging
 
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
 from flask import make_response, request, Response, current_app
 from werkzeug.routing import BaseConverter
 from netman.api import NETMAN_API_VERSION
@@ -36,19 +41,14 @@ def to_response(fn):
                     response = json_response(data, code)
                 else:
                     response = make_response("", code)
-        except InvalidValue as e:
-            response = exception_to_response(e, 400)
-        except UnknownResource as e:
-            response = exception_to_response(e, 404)
-        except Conflict as e:
-            response = exception_to_response(e, 409)
-        except NotImplementedError as e:
-            response = exception_to_response(e, 501)
         except Exception as e:
-            logging.exception(e)
-            response = exception_to_response(e, 500)
+            code = error_status_code(e)
+            if code == 500:
+                logging.exception(e)
+            response = exception_to_response(e, code)
 
-        self.logger.info("Responding {} : {}".format(response.status_code, response.data))
+        self.logger.info("Responding %s : %s", response.status_code,
+                         "<streamed>" if response.is_streamed else response.data)
         if 'Netman-Max-Version' in request.headers:
             response.headers['Netman-Version'] = min(
                 float(request.headers['Netman-Max-Version']),
@@ -58,6 +58,14 @@ def to_response(fn):
     return wrapper
 
 
+def error_status_code(exception):
+    for exception_class, code in [(InvalidValue, 400), (UnknownResource, 404), (Conflict, 409),
+                                  (NotImplementedError, 501)]:
+        if isinstance(exception, exception_class):
+            return code
+    return 500
+
+
 def exception_to_response(exception, code):
     data = {'error': str(exception)}
 
@@ -78,15 +86,54 @@ def exception_to_response(exception, code):
     return response
 
 
-def json_response(data, code):
+streamed_list_size = 1000
+
 
-    json_data = json.dumps(data, indent=None)
+def json_response(data, code):
+    """
+    Lists of more than streamed_list_size items are encoded and sent streamed_list_size items at a time
+    """
+    if isinstance(data, list) and len(data) > streamed_list_size:
+        json_data = _json_chunks(data, streamed_list_size)
+    else:
+        json_data = json_dumps(data)
     response = current_app.response_class(json_data, mimetype='application/json; charset=UTF-8')
     response.status_code = code
 
     return response
 
 
+NDJSON = 'application/x-ndjson'
+
+
+def wants_json_lines():
+    return request.args.get('stream') == '1' or \
+        request.accept_mimetypes.best_match(['application/json', NDJSON]) == NDJSON
+
+
+def json_lines_response(items, code):
+    """
+    Sends each item of the iterable as a json object on its own line, encoding it only once the previous ones are sent
+    """
+    response = current_app.response_class((json_dumps(item) + "\n" for item in items), mimetype=NDJSON)
+    response.status_code = code
+
+    return response
+
+
+def json_dumps(data):
+    if ujson is not None:
+        return ujson.dumps(data, escape_forward_slashes=False)
+    return json.dumps(data, indent=None)
+
+
+def _json_chunks(items, size):
+    yield "["
+    for start in range(0, len(items), size):
+        yield ("," if start else "") + json_dumps(items[start:start + size])[1:-1]
+    yield "]"
+
+
 class RegexConverter(BaseConverter):
     def __init__(self, url_map, *items):
         super(RegexConverter, self).__init__(url_map)
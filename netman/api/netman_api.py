@@ -23,8 +23,9 @@ from netman.api.objects import info
 
 
 class NetmanApi(object):
-    def __init__(self, switch_factory=None, get_distribution_callback=get_distribution):
+    def __init__(self, switch_factory=None, get_distribution_callback=get_distribution, sessions_manager=None):
         self.switch_factory = switch_factory
+        self.sessions_manager = sessions_manager
         self.app = None
         self.get_distribution = get_distribution_callback
 
@@ -41,7 +42,9 @@ class NetmanApi(object):
     @to_response
     def get_info(self):
         """
-        Informations about the current deployment and state and generates a log entry on the netman.api logger \
+        Informations about the current deployment and state, the active and expired switch sessions and the switch \
+        cache hits and misses included, and \
+        generates a log entry on the netman.api logger \
         that says : ``/info requested this is a logging test``
 
         :code 200 OK:
@@ -57,7 +60,10 @@ class NetmanApi(object):
         return 200, info.to_api(
             status='running',
             version=self.get_distribution('netman').version,
-            lock_provider=_class_fqdn(self.switch_factory.lock_factory)
+            lock_provider=_class_fqdn(self.switch_factory.lock_factory),
+            locks=_metrics(self.switch_factory.lock_factory),
+            sessions=self.sessions_manager.metrics() if self.sessions_manager else None,
+            cache=_metrics(self.switch_factory.switch_cache)
         )
 
     def api_docs(self, filename=None):
@@ -68,5 +74,9 @@ class NetmanApi(object):
         return send_from_directory(os.path.dirname(__file__) + "/doc/html/", filename or "index.html")
 
 
+def _metrics(obj):
+    return obj.metrics() if hasattr(obj, "metrics") else None
+
+
 def _class_fqdn(obj):
     return "{}.{}".format(obj.__module__, obj.__class__.__name__)
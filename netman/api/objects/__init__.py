@@ -12,6 +12,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from netaddr import IPAddress
+
+formatted_ips_kept = 100000
+_formatted_ips = {}
+
+
+def format_ip(ip):
+    """
+    Formats an IPAddress, or the address of an IPNetwork, the big switches giving the same addresses over and over
+    the formatted ones are kept up to formatted_ips_kept of them
+    """
+    key = (ip.version, ip.value)
+    try:
+        return _formatted_ips[key]
+    except KeyError:
+        if len(_formatted_ips) >= formatted_ips_kept:
+            _formatted_ips.clear()
+        formatted = _formatted_ips[key] = str(ip if isinstance(ip, IPAddress) else ip.ip)
+        return formatted
+
 
 def sub_dict(d, *keys):
     return {k: d[k] for k in keys}
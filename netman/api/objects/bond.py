@@ -34,7 +34,7 @@ class V2(Serializer):
         )
 
     def to_core(self, api_bond):
-        params = dict(vars(base_interface.to_core(api_bond)))
+        params = base_interface.to_core(api_bond).attributes()
         params.update(sub_dict(api_bond, 'number', 'link_speed', 'members'))
         return Bond(**params)
 
@@ -58,7 +58,7 @@ class V1(Serializer):
         )
 
     def to_core(self, api_bond):
-        params = dict(vars(base_interface.to_core(api_bond['interface'])))
+        params = base_interface.to_core(api_bond['interface']).attributes()
         params.update(sub_dict(api_bond, 'number', 'link_speed', 'members'))
         return Bond(**params)
 
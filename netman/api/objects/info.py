@@ -13,9 +13,12 @@
 # limitations under the License.
 
 
-def to_api(status=None, version=None, lock_provider=None):
+def to_api(status=None, version=None, lock_provider=None, locks=None, sessions=None, cache=None):
     return dict(
         status=status,
         version=version,
-        lock_provider=lock_provider
+        lock_provider=lock_provider,
+        locks=locks,
+        sessions=sessions,
+        cache=cache
     )
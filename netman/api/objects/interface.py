@@ -32,7 +32,7 @@ class V1(Serializer):
         )
 
     def to_core(self, serialized):
-        params = dict(vars(base_interface.to_core(serialized)))
+        params = base_interface.to_core(serialized).attributes()
         params.update(sub_dict(serialized, 'name', 'bond_master', 'auto_negotiation'))
         return Interface(**params)
 
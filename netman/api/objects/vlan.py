@@ -12,9 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from operator import attrgetter, itemgetter
+
 from netaddr import IPNetwork, IPAddress
 
-from netman.api.objects import vrrp_group
+from netman.api.objects import vrrp_group, format_ip
 from netman.core.objects.access_groups import IN, OUT
 from netman.core.objects.vlan import Vlan
 
@@ -24,13 +26,13 @@ def to_api(vlan):
         number=vlan.number,
         name=vlan.name,
         ips=serialize_ip_network(vlan.ips),
-        vrrp_groups=sorted([vrrp_group.to_api(group) for group in vlan.vrrp_groups], key=lambda i: i['id']),
+        vrrp_groups=[vrrp_group.to_api(group) for group in _sorted(vlan.vrrp_groups, key=attrgetter('id'))],
         vrf_forwarding=vlan.vrf_forwarding,
         access_groups={
             "in": vlan.access_groups[IN],
             "out": vlan.access_groups[OUT]
         },
-        dhcp_relay_servers=[str(server) for server in vlan.dhcp_relay_servers],
+        dhcp_relay_servers=[format_ip(server) for server in vlan.dhcp_relay_servers],
         arp_routing=vlan.arp_routing,
         icmp_redirects=vlan.icmp_redirects,
         unicast_rpf_mode=vlan.unicast_rpf_mode,
@@ -63,4 +65,12 @@ def deserialize_ip_network(ips):
 
 
 def serialize_ip_network(ips):
-    return sorted([{'address': ipn.ip.format(), 'mask': ipn.prefixlen} for ipn in ips], key=lambda i: i['address'])
+    return _sorted([_serialize_ip_network(ipn) for ipn in ips], key=itemgetter('address'))
+
+
+def _serialize_ip_network(ipn):
+    return {'address': format_ip(ipn), 'mask': ipn.prefixlen}
+
+
+def _sorted(items, key):
+    return sorted(items, key=key) if len(items) > 1 else list(items)
@@ -14,13 +14,14 @@
 
 from netaddr import IPAddress
 
+from netman.api.objects import format_ip
 from netman.core.objects.vrrp_group import VrrpGroup
 
 
 def to_api(vrrp):
     return dict(
         id=vrrp.id,
-        ips=sorted([str(i) for i in vrrp.ips]),
+        ips=sorted([format_ip(i) for i in vrrp.ips]),
         priority=vrrp.priority,
         track_id=vrrp.track_id,
         track_decrement=vrrp.track_decrement,
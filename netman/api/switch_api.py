@@ -12,19 +12,35 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+import uuid
+
 from flask import request
+from werkzeug.test import EnvironBuilder
 
-from netman.api.api_utils import BadRequest, to_response
+from netman.api.api_utils import BadRequest, to_response, wants_json_lines, json_lines_response, error_status_code, \
+    exception_to_response
 from netman.api.objects import bond, interface, vlan
 from netman.api.switch_api_base import SwitchApiBase
+from netman.api.switch_session_api import relay_to_session_owner
 from netman.api.validators import Switch, is_boolean, is_vlan_number, Interface, Vlan, resource, content, is_ip_network, \
     IPNetworkResource, is_access_group_name, Direction, is_vlan, is_bond, Bond, \
     is_bond_link_speed, is_bond_number, is_description, is_vrf_name, \
-    is_vrrp_group, VrrpGroup, is_dict_with, optional, is_type, is_int, is_unincast_rpf_mode, is_valid_mpls_state
+    is_vrrp_group, VrrpGroup, is_dict_with, optional, is_type, is_int, is_unincast_rpf_mode, is_valid_mpls_state, \
+    is_batch
+from netman.core.objects.exceptions import UnknownResource
 from netman.core.objects.interface_states import OFF, ON
 
 
+# Only the headers telling which version of the results to send and how detailed the errors are reach the operations
+# of a batch, the others like Accept would change the format of the results
+batched_headers = ('Netman-Max-Version', 'Netman-Verbose-Errors')
+
+
 class SwitchApi(SwitchApiBase):
+    def __init__(self, switch_factory, sessions_manager):
+        super(SwitchApi, self).__init__(switch_factory, sessions_manager)
+        self.server = None
 
     def hook_to(self, server):
         server.add_url_rule('/switches/<hostname>/versions', view_func=self.get_versions, methods=['GET'])
@@ -92,6 +108,8 @@ class SwitchApi(SwitchApiBase):
         server.add_url_rule('/switches/<hostname>/bonds/<bond_number>/spanning-tree', view_func=self.edit_bond_spanning_tree, methods=['PUT'])
         server.add_url_rule('/switches/<hostname>/bonds/<bond_number>/mtu', view_func=self.set_bond_mtu, methods=['PUT'])
         server.add_url_rule('/switches/<hostname>/bonds/<bond_number>/mtu', view_func=self.unset_bond_mtu, methods=['DELETE'])
+        server.add_url_rule('/switches/<hostname>/batch', view_func=self.batch, methods=['POST'])
+        self.server = server
         return self
 
     @to_response
@@ -118,6 +136,8 @@ class SwitchApi(SwitchApiBase):
         """
         Displays informations about all VLANs
 
+        Sent as one json object per line with ``?stream=1`` or ``Accept: application/x-ndjson``
+
         :arg str hostname: Hostname or IP of the switch
         :code 200 OK:
 
@@ -129,6 +149,8 @@ class SwitchApi(SwitchApiBase):
         """
         vlans = sorted(switch.get_vlans(), key=lambda x: x.number)
 
+        if wants_json_lines():
+            return json_lines_response((vlan.to_api(v) for v in vlans), 200)
         return 200, [vlan.to_api(v) for v in vlans]
 
     @to_response
@@ -422,6 +444,8 @@ class SwitchApi(SwitchApiBase):
         """
         Displays informations about all physical interfaces
 
+        Sent as one json object per line with ``?stream=1`` or ``Accept: application/x-ndjson``
+
         :arg str hostname: Hostname or IP of the switch
         :code 200 OK:
 
@@ -433,6 +457,8 @@ class SwitchApi(SwitchApiBase):
         """
         interfaces = sorted(switch.get_interfaces(), key=lambda x: x.name.lower())
 
+        if wants_json_lines():
+            return json_lines_response((interface.to_api(i) for i in interfaces), 200)
         return 200, [interface.to_api(i) for i in interfaces]
 
     @to_response
@@ -1169,3 +1195,101 @@ class SwitchApi(SwitchApiBase):
 
         switch.unset_vlan_unicast_rpf_mode(vlan_number)
         return 204, None
+
+    @to_response
+    @content(is_batch)
+    def batch(self, hostname, operations):
+        """
+        Runs a list of operations, in order, under a single lock, connection and transaction committed once at the end
+
+        :arg str hostname: Hostname or IP of the switch
+        :body:
+            A list of operations, each one being the method, the resource under ``/switches/<hostname>/`` and the
+            body of the corresponding call
+
+        .. literalinclude:: ../doc_config/api_samples/post_switch_hostname_batch.json
+            :language: json
+
+        :code 200 OK: Every operation succeeded and the transaction was committed
+
+        Example output:
+
+        .. literalinclude:: ../doc_config/api_samples/post_switch_hostname_batch_result.json
+            :language: json
+
+        When an operation fails, the transaction is rolled back, the following operations are not run and the
+        response carries the status code of the failed operation along with the results up to it.  Some switches
+        only report the errors of the operations when committing, a failed commit rolls back the transaction and is
+        added to the results as ``{"action": "commit", "status_code": ..., "result": {"error": ...}}``.
+
+        A batch sent to a session runs in that session, relayed to the process holding it, and leaves the
+        transaction to the owner of the session.
+        """
+
+        relayed = relay_to_session_owner(self, hostname)
+        if relayed is not None:
+            return relayed
+
+        try:
+            self.resolve_session(hostname)
+            return self._run_operations(hostname, operations)
+        except UnknownResource:
+            pass
+
+        session_id = "batch-{}".format(uuid.uuid4())
+        self.sessions_manager.open_session(self.resolve_switch(hostname), session_id)
+        try:
+            self.sessions_manager.start_transaction(session_id)
+            try:
+                code, results = self._run_operations(session_id, operations)
+                if code < 400:
+                    code = self._commit(session_id, results)
+                else:
+                    self.sessions_manager.rollback_session(session_id)
+            except Exception:
+                self.sessions_manager.rollback_session(session_id)
+                raise
+            finally:
+                self.sessions_manager.end_transaction(session_id)
+        finally:
+            self.sessions_manager.close_session(session_id)
+
+        return code, results
+
+    def _commit(self, session_id, results):
+        """
+        The switches may only report the errors of the operations when committing, the failed commit is added to the
+        results of the operations
+        """
+        try:
+            self.sessions_manager.commit_session(session_id)
+            return 200
+        except Exception as e:
+            self.sessions_manager.rollback_session(session_id)
+            code = error_status_code(e)
+            results.append({
+                "action": "commit",
+                "status_code": code,
+                "result": json.loads(exception_to_response(e, code).data)
+            })
+            return code
+
+    def _run_operations(self, session_id, operations):
+        headers = {k: v for k, v in request.headers.items() if k in batched_headers}
+        results = []
+        for operation in operations:
+            environ = EnvironBuilder(method=operation["method"], headers=headers, data=operation["body"],
+                                     base_url=request.host_url).get_environ()
+            with self.server.request_context(environ):
+                response = self.dispatch(session_id, operation["resource"])
+
+            results.append({
+                "method": operation["method"],
+                "resource": operation["resource"],
+                "status_code": response.status_code,
+                "result": json.loads(response.data) if response.data else None
+            })
+            if response.status_code >= 400:
+                return response.status_code, results
+
+        return 200, results
@@ -14,7 +14,8 @@
 
 import logging
 
-from flask import request
+from flask import request, current_app
+from werkzeug.exceptions import HTTPException
 
 from netman.api.api_utils import BadRequest
 from netman.core.objects.switch_descriptor import SwitchDescriptor
@@ -66,8 +67,27 @@ class SwitchApiBase(object):
         switch_descriptor = self._get_switch_descriptor_from_request_headers(hostname)
 
         if switch_descriptor:
-            return self.switch_factory.get_switch_by_descriptor(switch_descriptor)
-        return self.switch_factory.get_switch(hostname)
+            switch = self.switch_factory.get_switch_by_descriptor(switch_descriptor)
+        else:
+            switch = self.switch_factory.get_switch(hostname)
+
+        if request.method == "GET" and request.cache_control.max_age is not None and hasattr(switch, "max_age"):
+            switch.max_age = request.cache_control.max_age
+        return switch
 
     def resolve_session(self, session_id):
         return self.sessions_manager.get_switch_for_session(session_id)
+
+    def dispatch(self, hostname, resource):
+        """
+        Runs the view function of /switches/<hostname>/<resource> within the current request instead of sending
+        it again through the whole WSGI stack
+        """
+        adapter = current_app.url_map.bind_to_environ(request.environ)
+        try:
+            endpoint, values = adapter.match(u"/switches/{}/{}".format(hostname, resource.lstrip("/")),
+                                             method=request.method)
+        except HTTPException as e:
+            return current_app.make_response(e.get_response(request.environ))
+
+        return current_app.view_functions[endpoint](**values)
@@ -12,12 +12,51 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from flask import request
+from functools import wraps
+
+from flask import request, Response
+import requests
 
 from netman.api.api_utils import BadRequest, to_response
 from netman.api.switch_api_base import SwitchApiBase
 from netman.api.validators import resource, content, Session, \
     Resource, is_session
+from netman.core.objects.exceptions import UnknownSession
+
+
+def relayed_to_session_owner(fn):
+    """
+    Sends the call as is to the process holding the session when it isn't this one
+    """
+    @wraps(fn)
+    def wrapper(self, session_id, **kwargs):
+        response = relay_to_session_owner(self, session_id)
+        if response is None:
+            return fn(self, session_id=session_id, **kwargs)
+        return response
+
+    return wrapper
+
+
+def relay_to_session_owner(api, session_id):
+    """
+    Response of the process holding the session to the current call, None when the session isn't held by another one
+    """
+    owner = api.sessions_manager.get_session_owner(session_id)
+    if owner is None:
+        return None
+
+    try:
+        response = requests.request(
+            request.method, owner + request.path, params=request.query_string, data=request.data,
+            headers={k: v for k, v in request.headers.items() if k not in ('Host', 'Content-Length')})
+    except requests.ConnectionError:
+        api.logger.warning("Owner {} of session {} is gone, forgetting the session".format(owner, session_id))
+        api.sessions_manager.forget_session(session_id)
+        raise UnknownSession(session_id)
+
+    return Response(response.content, status=response.status_code,
+                    content_type=response.headers.get('Content-Type'))
 
 
 class SwitchSessionApi(SwitchApiBase):
@@ -61,6 +100,7 @@ class SwitchSessionApi(SwitchApiBase):
         return 201, {'session_id': session_id}
 
     @to_response
+    @relayed_to_session_owner
     @resource(Session)
     def close_session(self, session_id):
         """
@@ -75,18 +115,14 @@ class SwitchSessionApi(SwitchApiBase):
         return 204, None
 
     @to_response
+    @relayed_to_session_owner
     @resource(Session, Resource)
     def on_session(self, session_id, resource_name):
         self.sessions_manager.keep_alive(session_id)
-        with self.server.test_client() as http_client:
-            response = http_client.open(
-                '/switches/{}/{}'.format(session_id, resource_name),
-                method=request.method,
-                headers={k: v for k, v in request.headers.items()},
-                data=request.data)
-            return response
+        return self.dispatch(session_id, resource_name)
 
     @to_response
+    @relayed_to_session_owner
     @resource(Session)
     def act_on_session(self, session_id):
         """
@@ -226,6 +226,31 @@ def is_session(data, **_):
     }
 
 
+def is_batch(data, **_):
+    try:
+        operations = json.loads(data)
+    except ValueError:
+        raise BadRequest("Malformed content, should be a JSON list")
+
+    if not isinstance(operations, list):
+        raise BadRequest("Malformed content, should be a JSON list")
+
+    validated = []
+    for operation in operations:
+        if not isinstance(operation, dict) or "resource" not in operation \
+                or str(operation.get("method", "")).upper() not in ["GET", "PUT", "POST", "DELETE"]:
+            raise BadRequest('Malformed operation, should be {"method": "PUT", "resource": "...", "body": ...}')
+
+        body = operation.get("body")
+        validated.append({
+            "method": operation["method"].upper(),
+            "resource": operation["resource"],
+            "body": body if body is None or isinstance(body, basestring) else json.dumps(body)
+        })
+
+    return {'operations': validated}
+
+
 def is_valid_mpls_state(state):
     option = str(state).lower()
     if option not in ['true', 'false']:
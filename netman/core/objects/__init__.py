@@ -12,10 +12,73 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from operator import attrgetter
+
 
 class Model(object):
+    """
+    Compared and hashed field by field, the fields being the __slots__ of the model along with what is set in the
+    __dict__ of the subclasses not declaring theirs
+    """
+    __slots__ = ()
+
+    def attributes(self):
+        fields, _ = _fields(type(self))
+        values = dict(zip(fields, self._values()))
+        values.update(getattr(self, "__dict__", {}))
+        return values
+
+    def _values(self):
+        _, values = _fields(type(self))
+        return values(self)
+
     def __eq__(self, other):
-        return isinstance(other, type(self)) and vars(self) == vars(other)
+        cls = type(self)
+        if type(other) is not cls:
+            return isinstance(other, cls) and self.attributes() == other.attributes()
+        _, values = _model_fields.get(cls) or _fields(cls)
+        return values(self) == values(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        fields, values = _fields(type(self))
+        return hash(_hashable(values(self)[:len(fields)]))
 
     def __repr__(self):
-        return "<{} {}>".format(type(self).__name__, vars(self))
+        return "<{} {}>".format(type(self).__name__, self.attributes())
+
+
+_model_fields = {}
+
+
+def _fields(cls):
+    """
+    Returns the fields of a model class and a function giving the values of a model, its __dict__ coming last when
+    it has one
+    """
+    try:
+        return _model_fields[cls]
+    except KeyError:
+        fields = tuple(name for klass in reversed(cls.__mro__) for name in klass.__dict__.get("__slots__", ()))
+        getters = fields + ("__dict__",) if "__dict__" in dir(cls) else fields
+        _model_fields[cls] = fields, _values_getter(getters)
+        return _model_fields[cls]
+
+
+def _values_getter(names):
+    if len(names) == 1:
+        getter = attrgetter(names[0])
+        return lambda model: (getter(model),)
+    return attrgetter(*names) if names else lambda model: ()
+
+
+def _hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return frozenset((k, _hashable(v)) for k, v in value.items())
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
@@ -17,6 +17,8 @@ from netman.core.objects.interface import BaseInterface, Interface
 
 
 class Bond(BaseInterface):
+    __slots__ = ("number", "link_speed", "members")
+
     def __init__(self, number=None, link_speed=None, members=None, **interface):
         super(Bond, self).__init__(**interface)
         self.number = number
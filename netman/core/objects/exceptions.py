@@ -309,3 +309,12 @@ class InvalidUnicastRPFMode(InvalidValue):
 class UnsupportedOperation(NotImplementedError):
     def __init__(self, operation=None, message=None):
         super(UnsupportedOperation, self).__init__("Operation \"{}\" is not supported on this equipment: {}".format(operation, message))
+
+
+class BatchOperationFailed(NetmanException):
+    def __init__(self, operation=None, error=None, not_applied=None):
+        self.operation = operation
+        self.error = error
+        self.not_applied = not_applied or []
+        super(BatchOperationFailed, self).__init__("Batched operation {} failed: {}, not applied: {}".format(
+            operation, error, ", ".join(self.not_applied) or "none"))
@@ -42,11 +42,19 @@ class FlowControlSwitch(SwitchOperations):
 
     fc_switch.add_vlan(1000) #will auto lock, connect and transaction
 
+    With a read/write lock (see ReadWriteLock), the get_ methods share the read side of the lock.
+
+    With a read_coalescer (see ReadCoalescer), identical reads made at the same time on the switch are sent once
+    and connect() is deferred to the first call needing the switch, a caller served by the read of another never
+    logs in.
+
     """
-    def __init__(self, wrapped_switch, lock):
+    def __init__(self, wrapped_switch, lock, read_coalescer=None):
         self.wrapped_switch = wrapped_switch
         self.lock = lock
+        self.read_coalescer = read_coalescer
         self._has_auto_connected = False
+        self._connect_on_first_use = False
 
     def __new__(cls, *args, **kwargs):
         obj = super(FlowControlSwitch, cls).__new__(cls, *args, **kwargs)
@@ -72,7 +80,7 @@ class FlowControlSwitch(SwitchOperations):
         try:
             if not self.wrapped_switch.connected:
                 self.wrapped_switch.connect()
-                self._has_auto_connected = True
+                self._has_auto_connected = not self._connect_on_first_use
 
             self.wrapped_switch.start_transaction()
         except Exception:
@@ -100,6 +108,9 @@ class FlowControlSwitch(SwitchOperations):
     def _connected_context(self):
         if self.wrapped_switch.connected:
             yield
+        elif self._connect_on_first_use:
+            self.wrapped_switch.connect()
+            yield
         else:
             self.wrapped_switch.connect()
             try:
@@ -122,6 +133,30 @@ class FlowControlSwitch(SwitchOperations):
             finally:
                 self.wrapped_switch.end_transaction()
 
+    @contextmanager
+    def _read_locked_context(self):
+        if self.wrapped_switch.in_transaction or not hasattr(self.lock, "acquire_read"):
+            yield
+        else:
+            self.lock.acquire_read()
+            try:
+                yield
+            finally:
+                self.lock.release_read()
+
+    def _read(self, method_name, *args, **kwargs):
+        def read():
+            with self._read_locked_context(), self._connected_context():
+                return getattr(self.wrapped_switch, method_name)(*args, **kwargs)
+
+        if self.wrapped_switch.in_transaction or not self._coalesces(method_name):
+            return read()
+
+        return self.read_coalescer.read(_read_key(self.switch_descriptor, method_name, args, kwargs), read)
+
+    def _coalesces(self, method_name):
+        return self.read_coalescer is not None and self.read_coalescer.coalesces(method_name)
+
     @contextmanager
     def _locked_context(self):
         if self.wrapped_switch.in_transaction:
@@ -135,11 +170,16 @@ class FlowControlSwitch(SwitchOperations):
 
     @do_not_wrap_with_flow_control
     def connect(self):
-        self.wrapped_switch.connect()
+        if self.read_coalescer is not None:
+            self._connect_on_first_use = True
+        else:
+            self.wrapped_switch.connect()
 
     @do_not_wrap_with_flow_control
     def disconnect(self):
-        self.wrapped_switch.disconnect()
+        self._connect_on_first_use = False
+        if self.wrapped_switch.connected or self.read_coalescer is None:
+            self.wrapped_switch.disconnect()
 
     @do_not_wrap_with_flow_control
     def commit_transaction(self):
@@ -162,8 +202,7 @@ def _wrap_method_with_flow_control(cls, obj, method_name):
     if method_name.startswith("get_"):
         @wraps(original)
         def wrapped(self, *args, **kwargs):
-            with self._connected_context():
-                return getattr(self.wrapped_switch, method_name)(*args, **kwargs)
+            return self._read(method_name, *args, **kwargs)
     else:
         @wraps(original)
         def wrapped(self, *args, **kwargs):
@@ -171,3 +210,8 @@ def _wrap_method_with_flow_control(cls, obj, method_name):
                 return getattr(self.wrapped_switch, method_name)(*args, **kwargs)
 
     setattr(obj, method_name, types.MethodType(wrapped, obj))
+
+
+def _read_key(switch_descriptor, method_name, args, kwargs):
+    return repr((switch_descriptor.model, switch_descriptor.hostname, switch_descriptor.port,
+                 switch_descriptor.username, switch_descriptor.password, method_name, args, sorted(kwargs.items())))
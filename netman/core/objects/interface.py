@@ -16,6 +16,8 @@ from netman.core.objects import Model
 
 
 class BaseInterface(Model):
+    __slots__ = ("shutdown", "port_mode", "access_vlan", "trunk_native_vlan", "trunk_vlans", "mtu")
+
     def __init__(self, shutdown=None, port_mode=None, access_vlan=None,
                  trunk_native_vlan=None, trunk_vlans=None, mtu=None):
         self.shutdown = shutdown
@@ -27,6 +29,8 @@ class BaseInterface(Model):
 
 
 class Interface(BaseInterface):
+    __slots__ = ("name", "bond_master", "auto_negotiation")
+
     def __init__(self, name=None, bond_master=None, auto_negotiation=None, **interface):
         super(Interface, self).__init__(**interface)
         self.name = name
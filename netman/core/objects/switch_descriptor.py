@@ -16,10 +16,11 @@ from netman.core.objects import Model
 
 
 class SwitchDescriptor(Model):
-    def __init__(self, model, hostname, username=None, password=None, port=None, netman_server=None):
+    def __init__(self, model, hostname, username=None, password=None, port=None, netman_server=None, transcript=None):
         self.model = model
         self.hostname = hostname
         self.username = username
         self.password = password
         self.port = port
         self.netman_server = netman_server
+        self.transcript = transcript
@@ -0,0 +1,68 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+
+class ReadCoalescer(object):
+    """
+    Runs identical reads made at the same time only once, the callers arriving while a read is running wait for
+    it and get its result (or its error)
+
+    coalescer = ReadCoalescer(operations=["get_vlans", "get_interfaces"]) # every get_ operation when None
+
+    FlowControlSwitchFactory(switch_source, lock_factory, read_coalescer=coalescer)
+    """
+    def __init__(self, operations=None):
+        self.operations = set(operations) if operations is not None else None
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._reads = {}
+
+    def coalesces(self, operation):
+        return self.operations is None or operation in self.operations
+
+    def read(self, key, read):
+        with self._lock:
+            running = self._reads.get(key)
+            if running is None:
+                running = self._reads[key] = _RunningRead()
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            running.done.wait()
+            if running.error is not None:
+                raise running.error
+            return running.result
+
+        try:
+            running.result = read()
+            return running.result
+        except Exception as e:
+            running.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._reads[key]
+            running.done.set()
+
+
+class _RunningRead(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
@@ -22,3 +22,6 @@ class SessionStorage(object):
 
     def remove(self, session_id):
         raise NotImplementedError
+
+    def get_owner(self, session_id):
+        return None
@@ -12,11 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
+
 from netman.adapters.switches import cisco, juniper, dell, dell10g, brocade, arista
 from netman.adapters.switches.juniper.mx import netconf as mx_netconf
+from netman.adapters.switches.cached import SharedCachedSwitch
 from netman.adapters.switches.remote import RemoteSwitch
 from netman.core.objects.flow_control_switch import FlowControlSwitch
 from netman.core.objects.switch_descriptor import SwitchDescriptor
+from netman.core.switch_pool import PooledSwitch
 
 factories = {
     "arista": arista.eapi,
@@ -40,6 +44,9 @@ factories = {
 
 class RealSwitchFactory(object):
 
+    def __init__(self, switch_cache=None):
+        self.switch_cache = switch_cache
+
     def get_switch(self, hostname):
         raise NotImplemented()
 
@@ -47,27 +54,48 @@ class RealSwitchFactory(object):
         return self.get_switch_by_descriptor(SwitchDescriptor(**kwargs))
 
     def get_switch_by_descriptor(self, switch_descriptor):
+        return self._cached(self._real_switch(switch_descriptor))
+
+    def _real_switch(self, switch_descriptor):
         if switch_descriptor.netman_server:
             return RemoteSwitch(switch_descriptor)
         return factories[switch_descriptor.model](switch_descriptor)
 
+    def _cached(self, switch):
+        if self.switch_cache and not switch.switch_descriptor.netman_server:
+            return SharedCachedSwitch(switch, self.switch_cache)
+        return switch
+
 
 class FlowControlSwitchFactory(RealSwitchFactory):
 
-    def __init__(self, switch_source, lock_factory):
+    def __init__(self, switch_source, lock_factory, connection_pool=None, read_coalescer=None, switch_cache=None):
+        super(FlowControlSwitchFactory, self).__init__(switch_cache=switch_cache)
         self.switch_source = switch_source
         self.lock_factory = lock_factory
+        self.connection_pool = connection_pool
+        self.read_coalescer = read_coalescer
         self.locks = {}
+        self._locks_lock = threading.Lock()
 
     def get_switch_by_descriptor(self, switch_descriptor):
-        real_switch = super(FlowControlSwitchFactory, self).get_switch_by_descriptor(switch_descriptor)
-        return FlowControlSwitch(real_switch, lock=self._get_lock(switch_descriptor))
+        if self.connection_pool and not switch_descriptor.netman_server:
+            real_switch = PooledSwitch(self.connection_pool, switch_descriptor,
+                                       factories[switch_descriptor.model])
+        else:
+            real_switch = self._real_switch(switch_descriptor)
+        return self._cached(FlowControlSwitch(real_switch, lock=self._get_lock(switch_descriptor),
+                                              read_coalescer=self.read_coalescer))
 
     def _get_lock(self, switch_descriptor):
         key = switch_descriptor.hostname
-        if key not in self.locks:
-            self.locks[key] = self.lock_factory.new_lock(key)
-        return self.locks[key]
+        lock = self.locks.get(key)
+        if lock is None:
+            with self._locks_lock:
+                lock = self.locks.get(key)
+                if lock is None:
+                    lock = self.locks[key] = self.lock_factory.new_lock(key)
+        return lock
 
 
 SwitchFactory = FlowControlSwitchFactory
@@ -0,0 +1,236 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+import types
+from functools import wraps
+from logging import getLogger
+
+from netman.core.objects.exceptions import NetmanException
+from netman.core.objects.switch_base import SwitchOperations
+
+
+def is_alive(switch):
+    if not switch.connected:
+        return False
+
+    for session in ("ssh", "shell"):
+        terminal = getattr(switch, session, None)
+        if terminal is not None:
+            return terminal.is_alive()
+
+    netconf = getattr(switch, "netconf", None)
+    if netconf is not None:
+        return netconf.connected
+
+    return True
+
+
+class SwitchConnectionPool(object):
+    """
+    Keeps already connected switches around so they can be reused by the next caller
+
+    pool = SwitchConnectionPool(max_connections_per_host=2, idle_timeout=30)
+
+    switch = pool.acquire(switch_descriptor, cisco.ssh) # connects or reuses an idle connection
+    switch.get_vlans()
+    pool.release(switch) # keeps it connected for the next acquire
+
+    Idle connections older than idle_timeout are disconnected by a reaper thread, started with the first idle
+    connection, and are never reused.  At most max_connections_per_host idle connections are kept for a given switch
+    and each idle connection is checked with the liveness_probe before being handed out.  The default probe looks
+    at the ssh, telnet or netconf session of the switch so a session dropped by the switch is not reused.
+    """
+    def __init__(self, max_connections_per_host=1, idle_timeout=30, liveness_probe=is_alive):
+        self.max_connections_per_host = max_connections_per_host
+        self.idle_timeout = idle_timeout
+        self.liveness_probe = liveness_probe
+        self.idle = {}
+        self._condition = threading.Condition()
+        self._reaper = None
+        self._stopped = False
+
+    @property
+    def logger(self):
+        return getLogger(__name__)
+
+    def acquire(self, switch_descriptor, switch_builder):
+        key = _pool_key(switch_descriptor)
+
+        while True:
+            with self._condition:
+                idle_switches = self.idle.get(key)
+                if not idle_switches:
+                    break
+                switch, released_at = idle_switches.pop()
+
+            if time.time() - released_at > self.idle_timeout:
+                self.logger.info("Idle connection to {} expired".format(switch_descriptor.hostname))
+                self._discard(switch)
+            elif not self._is_alive(switch):
+                self.logger.info("Idle connection to {} is not alive anymore".format(switch_descriptor.hostname))
+                self._discard(switch)
+            else:
+                self.logger.debug("Reusing idle connection to {}".format(switch_descriptor.hostname))
+                return switch
+
+        switch = switch_builder(switch_descriptor)
+        switch.connect()
+        return switch
+
+    def release(self, switch, reusable=True):
+        if not reusable or switch.in_transaction:
+            self._discard(switch)
+            return
+
+        key = _pool_key(switch.switch_descriptor)
+        with self._condition:
+            idle_switches = self.idle.setdefault(key, [])
+            if len(idle_switches) < self.max_connections_per_host:
+                idle_switches.append((switch, time.time()))
+                self._start_reaper()
+                return
+
+        self._discard(switch)
+
+    def evict_idle(self):
+        now = time.time()
+        expired = []
+        with self._condition:
+            for key, idle_switches in self.idle.items():
+                expired.extend(s for s, released_at in idle_switches if now - released_at > self.idle_timeout)
+                idle_switches[:] = [(s, r) for s, r in idle_switches if now - r <= self.idle_timeout]
+
+        for switch in expired:
+            self._discard(switch)
+
+    def close(self):
+        with self._condition:
+            idle_switches = [s for switches in self.idle.values() for s, _ in switches]
+            self.idle = {}
+            self._stopped = True
+            self._condition.notify()
+
+        for switch in idle_switches:
+            self._discard(switch)
+
+    def _start_reaper(self):
+        if self._reaper is None and not self._stopped:
+            self._reaper = threading.Thread(target=self._reap_idle_connections, name="netman-connection-reaper")
+            self._reaper.daemon = True
+            self._reaper.start()
+        self._condition.notify()
+
+    def _reap_idle_connections(self):
+        while self._wait_for_an_expired_connection():
+            try:
+                self.evict_idle()
+            except Exception:
+                self.logger.exception("Idle connections could not be evicted")
+
+    def _wait_for_an_expired_connection(self):
+        with self._condition:
+            while not self._stopped:
+                released = [released_at for switches in self.idle.values() for _, released_at in switches]
+                if not released:
+                    self._condition.wait()
+                    continue
+
+                expires_in = min(released) + self.idle_timeout - time.time()
+                if expires_in >= 0:
+                    self._condition.wait(expires_in + 0.01)
+                    continue
+
+                return True
+        return False
+
+    def _is_alive(self, switch):
+        try:
+            return self.liveness_probe(switch)
+        except Exception as e:
+            self.logger.warning("Liveness probe failed for {}: {}".format(switch.switch_descriptor.hostname, e))
+            return False
+
+    def _discard(self, switch):
+        try:
+            switch.disconnect()
+        except Exception as e:
+            self.logger.warning("Could not cleanly disconnect from {}: {}".format(switch.switch_descriptor.hostname, e))
+
+
+class PooledSwitch(SwitchOperations):
+    """
+    Leases a connected switch from a SwitchConnectionPool on connect and gives it back on disconnect
+
+    Every other operation is forwarded to the leased switch.  A leased switch that raised anything else
+    than a netman error is not given back to the pool since its connection state can't be trusted anymore.
+    """
+    def __init__(self, pool, switch_descriptor, switch_builder):
+        self.pool = pool
+        self.switch_descriptor = switch_descriptor
+        self.switch_builder = switch_builder
+        self.leased_switch = None
+        self._reusable = True
+
+    def __new__(cls, *args, **kwargs):
+        obj = super(PooledSwitch, cls).__new__(cls, *args, **kwargs)
+
+        for member in dir(cls):
+            if not member.startswith("_") and member not in vars(cls):
+                _delegate_to_leased_switch(cls, obj, member)
+
+        return obj
+
+    @property
+    def connected(self):
+        return self.leased_switch is not None
+
+    @property
+    def in_transaction(self):
+        return self.connected and self.leased_switch.in_transaction
+
+    def connect(self):
+        self.leased_switch = self.pool.acquire(self.switch_descriptor, self.switch_builder)
+        self._reusable = True
+
+    def disconnect(self):
+        if self.leased_switch is None:
+            return
+
+        leased_switch, self.leased_switch = self.leased_switch, None
+        self.pool.release(leased_switch, reusable=self._reusable)
+
+
+def _delegate_to_leased_switch(cls, obj, method_name):
+    original = getattr(cls, method_name)
+    if not callable(original) or isinstance(original, property):
+        return
+
+    @wraps(original)
+    def delegated(self, *args, **kwargs):
+        try:
+            return getattr(self.leased_switch, method_name)(*args, **kwargs)
+        except (NetmanException, NotImplementedError):
+            raise
+        except Exception:
+            self._reusable = False
+            raise
+
+    setattr(obj, method_name, types.MethodType(delegated, obj))
+
+
+def _pool_key(switch_descriptor):
+    return (switch_descriptor.model, switch_descriptor.hostname, switch_descriptor.port,
+            switch_descriptor.username, switch_descriptor.password)
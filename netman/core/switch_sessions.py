@@ -13,7 +13,9 @@
 # limitations under the License.
 
 from logging import getLogger
+import heapq
 import threading
+import time
 
 from netman.adapters.memory_session_storage import MemorySessionStorage
 from netman.core.objects.exceptions import UnknownSession, SessionAlreadyExists, \
@@ -21,16 +23,44 @@ from netman.core.objects.exceptions import UnknownSession, SessionAlreadyExists,
 
 
 class SwitchSessionManager(object):
+    """
+    Keeps the switches of the opened sessions, a session left inactive for session_inactivity_timeout seconds is closed
+
+    The inactivity deadlines are watched by a single reaper thread, started with the first session: keep_alive only
+    moves the deadline of the session, the reaper finds out it was moved when it reaches the former one.
+
+    The sessions and their deadlines are registered and unregistered together under the same lock, so a session
+    can't be opened twice nor closed twice by concurrent requests.
+    """
     def __init__(self, session_inactivity_timeout=60, session_storage=None):
         self.session_storage = session_storage or MemorySessionStorage()
         self.sessions = {}
         self.session_inactivity_timeout = session_inactivity_timeout
-        self.timers = {}
+        self.deadlines = {}
+        self.expired_sessions = 0
+        self._deadlines_heap = []
+        self._reaper = None
+        self._stopped = False
+        self._condition = threading.Condition()
 
     @property
     def logger(self):
         return getLogger(__name__)
 
+    def metrics(self):
+        return {
+            "active": len(self.sessions),
+            "expired": self.expired_sessions
+        }
+
+    def get_session_owner(self, session_id):
+        """
+        Url of the process holding the session when it is held by another process sharing the session storage
+        """
+        if session_id in self.sessions:
+            return None
+        return self.session_storage.get_owner(session_id)
+
     def get_switch_for_session(self, session_id):
         try:
             return self.sessions[session_id]
@@ -60,26 +90,40 @@ class SwitchSessionManager(object):
     def open_session(self, switch, session_id):
         self.logger.info("Creating session {}".format(session_id))
 
-        if session_id in self.sessions:
-            raise SessionAlreadyExists(session_id)
-
         self._add_session(session_id, switch)
-        switch.connect()
+        try:
+            switch.connect()
+        except Exception:
+            self._remove_session(session_id)
+            self.forget_session(session_id)
+            raise
         self.logger.info("Switch for session {} connected and session stored: ".format(session_id))
         self._start_timer(session_id)
 
         return session_id
 
     def _add_session(self, session_id, switch):
-        self.sessions[session_id] = switch
+        with self._condition:
+            if session_id in self.sessions:
+                raise SessionAlreadyExists(session_id)
+            self.sessions[session_id] = switch
         try:
             self.session_storage.add(session_id, switch.switch_descriptor)
+        except SessionAlreadyExists:
+            self._remove_session(session_id)
+            raise
         except NetmanException as e:
             self.logger.error('Switch for session {} could not be added in '
                               'SessionStorage: {}'.format(session_id, e))
 
     def _remove_session(self, session_id):
-        del self.sessions[session_id]
+        with self._condition:
+            if session_id not in self.sessions:
+                raise UnknownSession(session_id)
+            self.deadlines.pop(session_id, None)
+            return self.sessions.pop(session_id)
+
+    def forget_session(self, session_id):
         try:
             self.session_storage.remove(session_id)
         except NetmanException as e:
@@ -88,8 +132,10 @@ class SwitchSessionManager(object):
 
     def keep_alive(self, session_id):
         self.logger.info("Keeping-alive session {}".format(session_id))
-        self._stop_timer(session_id)
-        self._start_timer(session_id)
+        with self._condition:
+            if session_id not in self.deadlines:
+                raise UnknownSession(session_id)
+            self.deadlines[session_id] = time.time() + self.session_inactivity_timeout
 
     def commit_session(self, session_id):
         self.logger.info("Committing session {}".format(session_id))
@@ -105,23 +151,67 @@ class SwitchSessionManager(object):
 
     def close_session(self, session_id):
         self.logger.info("Closing session {}".format(session_id))
-        switch = self.get_switch_for_session(session_id)
+        switch = self._remove_session(session_id)
+        self.forget_session(session_id)
         switch.disconnect()
-        self._remove_session(session_id)
-        self._stop_timer(session_id)
 
-    def _cancel_session(self, session_id):
+    def _cancel_session(self, session_id, switch):
         self.logger.info("Inactivity timeout reached for session {}".format(session_id))
-        self.close_session(session_id)
+        self.expired_sessions += 1
+        self.forget_session(session_id)
+        switch.disconnect()
 
     def _start_timer(self, session_id):
         self.logger.info("Starting inactivity timer for session {}".format(session_id))
-        self.timers[session_id] = threading.Timer(
-            self.session_inactivity_timeout, self._cancel_session,
-            kwargs=dict(session_id=session_id))
-        self.timers[session_id].start()
-
-    def _stop_timer(self, session_id):
-        self.logger.info("Stopping inactivity timer for session {}".format(session_id))
-        self.timers[session_id].cancel()
-        del self.timers[session_id]
+        deadline = time.time() + self.session_inactivity_timeout
+        with self._condition:
+            if session_id not in self.sessions:
+                return
+            self.deadlines[session_id] = deadline
+            heapq.heappush(self._deadlines_heap, (deadline, session_id))
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap_inactive_sessions, name="netman-session-reaper")
+                self._reaper.daemon = True
+                self._reaper.start()
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def _reap_inactive_sessions(self):
+        while True:
+            inactive_session = self._next_inactive_session()
+            if inactive_session is None:
+                return
+
+            session_id, switch = inactive_session
+            try:
+                self._cancel_session(session_id, switch)
+            except Exception:
+                self.logger.exception("Session {} could not be closed after its inactivity timeout".format(session_id))
+
+    def _next_inactive_session(self):
+        with self._condition:
+            while not self._stopped:
+                if not self._deadlines_heap:
+                    self._condition.wait()
+                    continue
+
+                deadline, session_id = self._deadlines_heap[0]
+                now = time.time()
+                if deadline > now:
+                    self._condition.wait(deadline - now)
+                    continue
+
+                heapq.heappop(self._deadlines_heap)
+                current_deadline = self.deadlines.get(session_id)
+                if current_deadline is None:
+                    continue
+                if current_deadline > now:
+                    heapq.heappush(self._deadlines_heap, (current_deadline, session_id))
+                    continue
+
+                self.deadlines.pop(session_id)
+                return session_id, self.sessions.pop(session_id)
@@ -13,18 +13,29 @@
 # limitations under the License.
 
 import argparse
+import atexit
+import os
+import threading
 from logging import DEBUG, getLogger
 
 from flask import request
 from flask.app import Flask
+from werkzeug.serving import make_server
 
 from adapters.threading_lock_factory import ThreadingLockFactory
+from netman.adapters import shell
+from netman.adapters.file_lock_factory import FileLockFactory
 from netman.adapters.memory_storage import MemoryStorage
+from netman.adapters.sqlite_session_storage import SqliteSessionStorage
+from netman.adapters.switches import remote
+from netman.adapters.switches.cached import SwitchCache
 from netman.api.api_utils import RegexConverter
 from netman.api.netman_api import NetmanApi
 from netman.api.switch_api import SwitchApi
 from netman.api.switch_session_api import SwitchSessionApi
+from netman.core.read_coalescer import ReadCoalescer
 from netman.core.switch_factory import FlowControlSwitchFactory, RealSwitchFactory
+from netman.core.switch_pool import SwitchConnectionPool
 from netman.core.switch_sessions import SwitchSessionManager
 
 app = Flask('netman')
@@ -44,28 +55,121 @@ lock_factory = ThreadingLockFactory()
 switch_factory = FlowControlSwitchFactory(MemoryStorage(), lock_factory)
 real_switch_factory = RealSwitchFactory()
 switch_session_manager = SwitchSessionManager()
+atexit.register(switch_session_manager.stop)
 
-NetmanApi(switch_factory).hook_to(app)
+NetmanApi(switch_factory, sessions_manager=switch_session_manager).hook_to(app)
 SwitchApi(switch_factory, switch_session_manager).hook_to(app)
 SwitchSessionApi(real_switch_factory, switch_session_manager).hook_to(app)
 
 
-def load_app(session_inactivity_timeout=None):
+def load_app(session_inactivity_timeout=None, connection_pool_size=None, connection_pool_idle_timeout=30, transcript=None,
+             remote_pool_size=None, remote_keep_alive=True, shared_sessions=None, lock_directory=None,
+             lock_timeout=None, read_write_locks=False, coalesced_reads=None, cache_ttls=None):
+    if transcript:
+        shell.default_transcript = transcript
+    if remote_pool_size:
+        remote.default_pool_size = remote_pool_size
+    remote.default_keep_alive = remote_keep_alive
+    if lock_directory:
+        switch_factory.lock_factory = FileLockFactory(lock_directory, timeout=lock_timeout)
+    elif read_write_locks:
+        switch_factory.lock_factory = ThreadingLockFactory(read_write=True)
+    if coalesced_reads == "all":
+        switch_factory.read_coalescer = ReadCoalescer()
+    elif coalesced_reads:
+        switch_factory.read_coalescer = ReadCoalescer(operations=coalesced_reads.split(","))
+    if cache_ttls:
+        switch_factory.switch_cache = real_switch_factory.switch_cache = SwitchCache(ttls=cache_ttls)
     if session_inactivity_timeout:
         switch_session_manager.session_inactivity_timeout = session_inactivity_timeout
+    if shared_sessions:
+        switch_session_manager.session_storage = SqliteSessionStorage(shared_sessions, owner=_session_calls_url)
+    if connection_pool_size:
+        switch_factory.connection_pool = SwitchConnectionPool(max_connections_per_host=connection_pool_size,
+                                                              idle_timeout=connection_pool_idle_timeout)
+        atexit.register(switch_factory.connection_pool.close)
     return app
 
 
+_session_calls_urls = {}
+_session_calls_lock = threading.Lock()
+
+
+def _session_calls_url():
+    """
+    Url the other processes relay the calls of the sessions of this one to, served from the first session opened
+    in each process so the master of a preloading server never serves them in place of its workers
+    """
+    with _session_calls_lock:
+        pid = os.getpid()
+        if pid not in _session_calls_urls:
+            _session_calls_urls[pid] = _serve_session_calls(app)
+        return _session_calls_urls[pid]
+
+
+def _serve_session_calls(app):
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name="netman-session-calls")
+    thread.daemon = True
+    thread.start()
+    return "http://127.0.0.1:{}".format(server.server_port)
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Netman Server')
     parser.add_argument('--host', nargs='?', default="127.0.0.1")
     parser.add_argument('--port', type=int, nargs='?', default=5000)
     parser.add_argument('--session-inactivity-timeout', type=int, nargs='?')
+    parser.add_argument('--connection-pool-size', type=int, nargs='?',
+                        help='Idle switch connections kept per switch between requests, disabled when not set')
+    parser.add_argument('--connection-pool-idle-timeout', type=int, nargs='?',
+                        help='Seconds an idle switch connection is kept in the pool')
+    parser.add_argument('--transcript', nargs='?',
+                        help='What is kept of the ssh/telnet sessions for the logs: full (default), off, ring:<KB> or file:<directory>')
+    parser.add_argument('--remote-pool-size', type=int, nargs='?',
+                        help='Connections kept alive per proxy netman server, 10 when not set')
+    parser.add_argument('--no-remote-keep-alive', action='store_true',
+                        help='Open a new connection to the proxy netman server for every call')
+    parser.add_argument('--shared-sessions', nargs='?',
+                        help='SQLite file sharing the sessions between the netman processes of this box')
+    parser.add_argument('--lock-directory', nargs='?',
+                        help='Directory of the switch lock files shared by the netman processes of this box')
+    parser.add_argument('--lock-timeout', type=float, nargs='?',
+                        help='Seconds to wait for a switch lock held by another request, forever when not set')
+    parser.add_argument('--read-write-locks', action='store_true',
+                        help='Let the reads of a switch run together')
+    parser.add_argument('--coalesced-reads', nargs='?',
+                        help='Send identical parallel reads of a switch once: all or a list of operations like get_vlans,get_interfaces')
+    parser.add_argument('--cache-ttls', nargs='?',
+                        help='Seconds the reads of a switch are cached per resource, like vlans=30,interfaces=30,bonds=30,versions=300')
 
     args = parser.parse_args()
 
     params = {}
     if args.session_inactivity_timeout:
         params["session_inactivity_timeout"] = args.session_inactivity_timeout
+    if args.connection_pool_size:
+        params["connection_pool_size"] = args.connection_pool_size
+    if args.connection_pool_idle_timeout:
+        params["connection_pool_idle_timeout"] = args.connection_pool_idle_timeout
+    if args.transcript:
+        params["transcript"] = args.transcript
+    if args.remote_pool_size:
+        params["remote_pool_size"] = args.remote_pool_size
+    if args.no_remote_keep_alive:
+        params["remote_keep_alive"] = False
+    if args.shared_sessions:
+        params["shared_sessions"] = args.shared_sessions
+    if args.lock_directory:
+        params["lock_directory"] = args.lock_directory
+    if args.lock_timeout:
+        params["lock_timeout"] = args.lock_timeout
+    if args.read_write_locks:
+        params["read_write_locks"] = True
+    if args.coalesced_reads:
+        params["coalesced_reads"] = args.coalesced_reads
+    if args.cache_ttls:
+        params["cache_ttls"] = {resource: int(ttl) for resource, ttl in
+                                (entry.split("=") for entry in args.cache_ttls.split(","))}
 
     load_app(**params).run(host=args.host, port=args.port, threaded=True)
@@ -0,0 +1,113 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from hamcrest import assert_that, is_, has_entries
+
+from netman.adapters.file_lock_factory import FileLockFactory
+from netman.core.objects.exceptions import UnableToAcquireLock
+
+
+class FileLockFactoryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.factory = FileLockFactory(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_one_lock_file_per_switch(self):
+        lock = self.factory.new_lock("my.switch/1")
+
+        lock.acquire()
+        lock.release()
+
+        assert_that(os.listdir(self.directory), is_(["my.switch_1.lock"]))
+
+    def test_a_lock_held_by_another_process_times_out(self):
+        other_process_lock = FileLockFactory(self.directory).new_lock("my.switch")
+        lock = self.factory.new_lock("my.switch", timeout=0.05)
+
+        other_process_lock.acquire()
+        with self.assertRaises(UnableToAcquireLock):
+            lock.acquire()
+
+        other_process_lock.release()
+        lock.acquire()
+        lock.release()
+
+        assert_that(self.factory.metrics(), has_entries(acquired=1, contended=0, timed_out=1))
+
+    def test_waiting_on_a_lock_held_by_another_process(self):
+        other_process_lock = FileLockFactory(self.directory).new_lock("my.switch")
+        lock = self.factory.new_lock("my.switch", timeout=1)
+
+        other_process_lock.acquire()
+        threading.Timer(0.05, other_process_lock.release).start()
+        lock.acquire()
+        lock.release()
+
+        assert_that(self.factory.metrics(), has_entries(acquired=1, contended=1, timed_out=0))
+        assert_that(self.factory.metrics()["waited_seconds"] >= 0.05, is_(True))
+
+    def test_waiters_are_served_in_their_arrival_order(self):
+        lock = self.factory.new_lock("my.switch")
+        served = []
+
+        def wait_for_lock(waiter):
+            lock.acquire()
+            served.append(waiter)
+            lock.release()
+
+        lock.acquire()
+        threads = []
+        for waiter in range(5):
+            threads.append(threading.Thread(target=wait_for_lock, args=(waiter,)))
+            threads[-1].start()
+            time.sleep(0.01)
+        lock.release()
+        for thread in threads:
+            thread.join()
+
+        assert_that(served, is_([0, 1, 2, 3, 4]))
+        assert_that(self.factory.metrics(), has_entries(acquired=6, contended=5, timed_out=0))
+
+    def test_a_waiter_timing_out_keeps_the_others_in_line(self):
+        lock = self.factory.new_lock("my.switch")
+        served = []
+
+        def wait_for_lock():
+            lock.acquire()
+            served.append("patient")
+            lock.release()
+
+        lock.acquire()
+        patient = threading.Thread(target=wait_for_lock)
+        patient.start()
+        time.sleep(0.01)
+
+        lock.timeout = 0.02
+        with self.assertRaises(UnableToAcquireLock):
+            lock.acquire()
+
+        lock.release()
+        patient.join()
+
+        assert_that(served, is_(["patient"]))
@@ -0,0 +1,79 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from _socket import timeout
+
+
+class FakeChannel(object):
+    """
+    Stands for a paramiko channel, every chunk handed to answer() becomes readable
+    `delay` seconds after the previous one, starting from the first read
+    """
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.sent = []
+        self.recv_calls = 0
+        self.closed = False
+        self.eof_received = False
+        self._pending = []
+        self._timeout = None
+        self._started_at = None
+        self._delivered = 0
+
+    def answer(self, *chunks):
+        if not self._pending:
+            self._started_at = None
+            self._delivered = 0
+        self._pending.extend(chunks)
+
+    def send(self, data):
+        self.sent.append(data)
+        return len(data)
+
+    def settimeout(self, value):
+        self._timeout = value
+
+    def recv_ready(self):
+        return bool(self._pending) and self._head_available_at() <= time.time()
+
+    def recv(self, size):
+        self.recv_calls += 1
+        if not self._pending:
+            if self.closed:
+                return ''
+            if self._timeout is not None:
+                time.sleep(self._timeout)
+            raise timeout()
+
+        wait = self._head_available_at() - time.time()
+        if wait > 0:
+            if self._timeout is not None and wait > self._timeout:
+                time.sleep(self._timeout)
+                raise timeout()
+            time.sleep(wait)
+
+        chunk = self._pending[0]
+        if len(chunk) > size:
+            self._pending[0] = chunk[size:]
+            return chunk[:size]
+
+        self._pending.pop(0)
+        self._delivered += 1
+        return chunk
+
+    def _head_available_at(self):
+        if self._started_at is None:
+            self._started_at = time.time()
+        return self._started_at + (self._delivered + 1) * self.delay
@@ -0,0 +1,116 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from socket import gaierror
+import unittest
+import warnings
+
+from hamcrest import assert_that, equal_to, is_
+from mock import patch, Mock
+
+from netman.adapters.shell.ssh import SshClient
+from netman.adapters.shell.transcript import Transcript
+from netman.core.objects.exceptions import CommandTimeout, CouldNotConnect
+from tests.adapters.shell.fake_channel import FakeChannel
+
+
+class SshClientReadingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.channel = FakeChannel()
+
+        with patch('netman.adapters.shell.ssh.paramiko.SSHClient'):
+            with patch.object(SshClient, '_wait_for', lambda *_: None):
+                self.client = SshClient("host.com", "user", "pass", command_timeout=0.2)
+
+        self.client.channel = self.channel
+
+    def test_the_prompt_can_be_split_across_chunks(self):
+        self.channel.answer("hello\nBonjour\nhostname", "#")
+
+        assert_that(self.client.do("hello", wait_for="hostname#"), equal_to(["Bonjour"]))
+
+    def test_a_prompt_in_the_middle_of_the_output_is_not_the_end_of_it(self):
+        self.channel.answer("show\nline > 1\n", "line 2\nhostname>")
+
+        assert_that(self.client.do("show"), equal_to(["line > 1", "line 2"]))
+        assert_that(self.channel.recv_calls, is_(2))
+
+    def test_any_of_the_prompts_ends_the_reading(self):
+        self.channel.answer("hello\nBonjour\nhostname#")
+
+        assert_that(self.client.do("hello", wait_for=("?", "#")), equal_to(["Bonjour"]))
+
+    def test_large_outputs_are_read_chunk_by_chunk(self):
+        self.client.reading_chunk_size = 10
+        lines = ["interface Ethernet{}".format(i) for i in range(1000)]
+        self.channel.answer("show run\n" + "\n".join(lines) + "\nhostname#")
+
+        assert_that(self.client.do("show run"), equal_to(lines))
+        assert_that(self.client.get_current_prompt(), equal_to("hostname#"))
+
+    def test_no_prompt_in_time_raises_a_command_timeout(self):
+        self.channel.answer("hang\nstill working...")
+
+        with self.assertRaises(CommandTimeout):
+            self.client.do("hang")
+
+        assert_that(self.client.current_buffer, equal_to("hang\nstill working..."))
+
+    def test_a_closed_channel_raises_a_command_timeout(self):
+        self.channel.closed = True
+
+        with self.assertRaises(CommandTimeout):
+            self.client.do("exit")
+
+    def test_a_client_with_an_open_channel_on_an_active_transport_is_alive(self):
+        self.client.client.get_transport.return_value.is_active.return_value = True
+
+        assert_that(self.client.is_alive(), is_(True))
+
+    def test_a_client_whose_channel_was_closed_by_the_switch_is_not_alive(self):
+        self.client.client.get_transport.return_value.is_active.return_value = True
+        self.channel.eof_received = True
+
+        assert_that(self.client.is_alive(), is_(False))
+
+    def test_a_client_whose_transport_died_is_not_alive(self):
+        self.client.client.get_transport.return_value.is_active.return_value = False
+
+        assert_that(self.client.is_alive(), is_(False))
+
+    def test_everything_received_is_kept_in_the_full_log(self):
+        self.channel.answer("hello\nBonjour\nhostname>")
+        self.client.do("hello")
+
+        assert_that(self.client.full_log, equal_to("hello\nBonjour\nhostname>"))
+
+    def test_reading_interval_is_deprecated(self):
+        with patch('netman.adapters.shell.ssh.paramiko.SSHClient'):
+            with patch.object(SshClient, '_wait_for', lambda *_: None):
+                with warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter("always")
+                    SshClient("host.com", "user", "pass", reading_interval=0.01)
+
+        assert_that([w.category for w in caught], equal_to([DeprecationWarning]))
+
+    def test_the_transcript_is_closed_when_the_connection_fails(self):
+        transcript = Mock(spec=Transcript)
+
+        with patch('netman.adapters.shell.ssh.paramiko.SSHClient') as ssh_client:
+            ssh_client.return_value.connect.side_effect = gaierror()
+            with self.assertRaises(CouldNotConnect):
+                SshClient("host.com", "user", "pass", transcript=transcript)
+
+        transcript.close.assert_called_once_with()
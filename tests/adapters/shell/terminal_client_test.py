@@ -25,6 +25,7 @@ from twisted.internet.protocol import Factory
 from netman.adapters import shell
 from netman.adapters.shell.ssh import SshClient
 from netman.adapters.shell.telnet import TelnetClient
+from netman.adapters.shell.transcript import RingBufferTranscript
 from netman.core.objects.exceptions import CouldNotConnect, CommandTimeout, ConnectTimeout
 from tests.adapters.shell.mock_telnet import MockTelnet
 from tests.adapters.shell.mock_terminal_commands import passwd_change_protocol_prompt, passwd_write_password_to_transport, \
@@ -179,6 +180,35 @@ class TerminalClientTest(unittest.TestCase):
             K pressed
             hostname>""")))
 
+    def test_the_prompt_is_still_known_without_a_transcript(self):
+        client = self.client("127.0.0.1", "admin", "1234", self.port, transcript="off")
+        client.do('passwd', wait_for="Password:")
+        client.do('1234')
+
+        assert_that(client.get_current_prompt(), equal_to("hostname#"))
+        assert_that(client.full_log, equal_to(""))
+        assert_that(client.transcript.dropped_bytes > 0, is_(True))
+
+        client.quit('exit')
+
+    def test_a_ring_transcript_keeps_the_end_of_the_conversation(self):
+        client = self.client("127.0.0.1", "admin", "1234", self.port, transcript=RingBufferTranscript(max_size=9))
+        client.do('hello')
+        client.quit('exit')
+
+        assert_that(client.full_log, equal_to("hostname>"))
+
+    def test_changing_default_transcript(self):
+        shell.default_transcript = "off"
+        try:
+            client = self.client("127.0.0.1", "admin", "1234", self.port)
+            client.do('hello')
+            client.quit('exit')
+        finally:
+            shell.default_transcript = "full"
+
+        assert_that(client.full_log, equal_to(""))
+
     def test_support_regex(self):
         client = self.client("127.0.0.1", "admin", "1234", port=self.port)
         res = client.do('ambiguous', wait_for=('>', '#'))
@@ -0,0 +1,106 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from hamcrest import assert_that, equal_to, is_, instance_of, starts_with, is_not
+
+from netman.adapters.shell.transcript import from_spec, FullTranscript, NoTranscript, RingBufferTranscript, \
+    FileTranscript
+from netman.core.objects.exceptions import InvalidValue
+
+
+class TranscriptTest(unittest.TestCase):
+
+    def test_full_transcript_keeps_everything(self):
+        transcript = FullTranscript()
+        transcript.write("hello\n")
+        transcript.write("hostname#")
+
+        assert_that(transcript.read(), equal_to("hello\nhostname#"))
+        assert_that(transcript.captured_bytes, is_(15))
+        assert_that(transcript.dropped_bytes, is_(0))
+
+    def test_no_transcript_keeps_nothing(self):
+        transcript = NoTranscript()
+        transcript.write("hello\n")
+
+        assert_that(transcript.read(), equal_to(""))
+        assert_that(transcript.captured_bytes, is_(0))
+        assert_that(transcript.dropped_bytes, is_(6))
+
+    def test_ring_transcript_keeps_the_last_bytes(self):
+        transcript = RingBufferTranscript(max_size=10)
+        transcript.write("12345")
+        transcript.write("67890")
+        transcript.write("abc")
+
+        assert_that(transcript.read(), equal_to("4567890abc"))
+        assert_that(transcript.captured_bytes, is_(13))
+        assert_that(transcript.dropped_bytes, is_(3))
+
+    def test_ring_transcript_trims_chunks_bigger_than_itself(self):
+        transcript = RingBufferTranscript(max_size=3)
+        transcript.write("12")
+        transcript.write("34567")
+
+        assert_that(transcript.read(), equal_to("567"))
+        assert_that(transcript.dropped_bytes, is_(4))
+
+    def test_file_transcript_spools_to_the_file(self):
+        directory = tempfile.mkdtemp()
+        try:
+            transcript = from_spec("file:{}".format(directory), "my.switch-22")
+            transcript.write("hello\n")
+            transcript.write("hostname#")
+            transcript.close()
+
+            assert_that(transcript, instance_of(FileTranscript))
+            assert_that(os.path.basename(transcript.path), starts_with("my.switch-22-"))
+            assert_that(open(transcript.path).read(), equal_to("hello\nhostname#"))
+            assert_that(transcript.read(), equal_to("Transcript spooled to {}".format(transcript.path)))
+            assert_that(transcript.captured_bytes, is_(15))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_file_transcripts_of_a_same_switch_get_their_own_file(self):
+        directory = tempfile.mkdtemp()
+        try:
+            first = from_spec("file:{}".format(directory), "my.switch-22")
+            second = from_spec("file:{}".format(directory), "my.switch-22")
+            first.close()
+            second.close()
+
+            assert_that(first.path, is_not(equal_to(second.path)))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_from_spec(self):
+        assert_that(from_spec("full", "name"), instance_of(FullTranscript))
+        assert_that(from_spec("off", "name"), instance_of(NoTranscript))
+
+        ring = from_spec("ring:64", "name")
+        assert_that(ring, instance_of(RingBufferTranscript))
+        assert_that(ring.max_size, is_(64 * 1024))
+
+        transcript = NoTranscript()
+        assert_that(from_spec(transcript, "name"), is_(transcript))
+
+    def test_from_spec_rejects_unknown_transcripts(self):
+        for spec in ["everything", "ring:big", "file:"]:
+            with self.assertRaises(InvalidValue):
+                from_spec(spec, "name")
@@ -409,6 +409,21 @@ class AristaTest(unittest.TestCase):
     def test_transactions_rollback_does_nothing(self):
         self.switch.rollback_transaction()
 
+    def test_a_failing_config_command_in_a_transaction_raises_from_its_operation(self):
+        self.switch.node.should_receive("config") \
+            .with_args(["interface Invalid_Ethernet",
+                        "switchport mode trunk",
+                        "switchport trunk allowed vlan none"]) \
+            .once() \
+            .and_raise(CommandError(1002, "CLI command 3 of 6 'interface Invalid_Ethernet' failed: invalid command",
+                                    command_error="Invalid input (at token 1: 'Invalid_Ethernet')"))
+
+        self.switch.start_transaction()
+        with self.assertRaises(UnknownInterface) as expect:
+            self.switch.set_trunk_mode("Invalid_Ethernet")
+
+        assert_that(str(expect.exception), is_("Unknown interface Invalid_Ethernet"))
+
     def test_get_interface(self):
         interface_payload = result_payload(result={
             'interfaces': {
@@ -946,6 +946,65 @@ class BrocadeTest(unittest.TestCase):
 
         self.switch.add_ip_to_vlan(1234, IPNetwork("1.2.3.4/25"))
 
+    def test_add_ips_within_a_transaction_reads_the_interfaces_running_config_once(self):
+        self.shell_mock.should_receive("do").with_args("show vlan 1234").once().and_return(
+            vlan_with_vif_display(1234, 1234)
+        )
+        self.shell_mock.should_receive("do").with_args("show vlan 1235").once().and_return(
+            vlan_with_vif_display(1235, 1235)
+        )
+
+        self.shell_mock.should_receive("do").with_args("show running-config interface").once().and_return([
+            "interface ve 1234",
+            " ip address 1.2.3.1/24",
+            "!",
+            "interface ve 1235",
+            "!",
+        ])
+
+        self.shell_mock.should_receive("do").with_args("configure terminal").twice().and_return([])
+        self.shell_mock.should_receive("do").with_args("interface ve 1234").once().and_return([])
+        self.shell_mock.should_receive("do").with_args("interface ve 1235").once().and_return([])
+        self.shell_mock.should_receive("do").with_args("enable").twice().and_return([])
+        self.shell_mock.should_receive("do").with_args("ip address 1.2.3.4/25 secondary").once().and_return([])
+        self.shell_mock.should_receive("do").with_args("ip address 2.2.3.4/25").once().and_return([])
+        self.shell_mock.should_receive("do").with_args("exit").times(4).and_return([])
+
+        self.switch.start_transaction()
+        self.switch.add_ip_to_vlan(1234, IPNetwork("1.2.3.4/25"))
+        self.switch.add_ip_to_vlan(1235, IPNetwork("2.2.3.4/25"))
+        self.switch.end_transaction()
+
+    def test_a_vlan_edited_within_a_transaction_has_its_ve_read_again(self):
+        self.shell_mock.should_receive("do").with_args("show vlan 1234").twice().and_return(
+            vlan_with_vif_display(1234, 1234)
+        )
+
+        self.shell_mock.should_receive("do").with_args("show running-config interface").once().and_return([
+            "interface ve 1234",
+            "!",
+        ])
+
+        self.shell_mock.should_receive("do").with_args("configure terminal").once().and_return([])
+        self.shell_mock.should_receive("do").with_args("interface ve 1234").once().and_return([])
+        self.shell_mock.should_receive("do").with_args("enable").once().and_return([])
+        self.shell_mock.should_receive("do").with_args("ip address 1.2.3.4/25").once().and_return([])
+        self.shell_mock.should_receive("do").with_args("exit").twice().and_return([])
+
+        self.shell_mock.should_receive("do").with_args("show running-config interface ve 1234").once().and_return([
+            "interface ve 1234",
+            " ip address 1.2.3.4/25",
+            "!",
+        ])
+
+        self.switch.start_transaction()
+        self.switch.add_ip_to_vlan(1234, IPNetwork("1.2.3.4/25"))
+        vlan = self.switch.get_vlan(1234)
+        self.switch.end_transaction()
+
+        assert_that(vlan.ips, has_length(1))
+        assert_that(str(vlan.ips[0]), equal_to("1.2.3.4/25"))
+
     def test_add_ip_contained_in_a_subnet_already_present_requires_the_keyword_secondary(self):
         self.shell_mock.should_receive("do").with_args("show vlan 1234").once().ordered().and_return(
             vlan_with_vif_display(1234, 1234)
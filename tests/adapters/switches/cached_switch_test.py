@@ -12,13 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
 import unittest
 
-from hamcrest import assert_that, is_
+from hamcrest import assert_that, is_, same_instance
 from flexmock import flexmock, flexmock_teardown
 from netaddr import IPAddress, IPNetwork
 
-from netman.adapters.switches.cached import CachedSwitch
+from netman.adapters.switches.cached import CachedSwitch, SharedCachedSwitch, SwitchCache
 from netman.core.objects.access_groups import IN, OUT
 from netman.core.objects.bond import Bond
 from netman.core.objects.interface import Interface
@@ -1026,3 +1027,130 @@ class CacheSwitchTest(unittest.TestCase):
         assert_that(
             self.switch.get_vlans(),
             is_([Vlan(123, mpls_ip=True)]))
+
+    def test_reads_share_the_cached_objects(self):
+        self.real_switch_mock.should_receive("get_vlans").once().and_return([Vlan(123), Vlan(456)])
+
+        first_read = self.switch.get_vlans()
+
+        assert_that(self.switch.get_vlans()[0], is_(same_instance(first_read[0])))
+        assert_that(self.switch.get_vlan(456), is_(same_instance(first_read[1])))
+
+    def test_a_write_replaces_the_objects_it_changes(self):
+        self.real_switch_mock.should_receive("get_vlans").once().and_return([
+            Vlan(123, ips=[IPNetwork("1.1.1.1/24")]), Vlan(456)])
+        self.real_switch_mock.should_receive("add_ip_to_vlan").once()
+        read_before = self.switch.get_vlans()
+
+        self.switch.add_ip_to_vlan(123, IPNetwork("2.2.2.2/24"))
+
+        assert_that(read_before[0].ips, is_([IPNetwork("1.1.1.1/24")]))
+        assert_that(self.switch.get_vlan(123).ips, is_([IPNetwork("1.1.1.1/24"), IPNetwork("2.2.2.2/24")]))
+        assert_that(self.switch.get_vlan(456), is_(same_instance(read_before[1])))
+
+
+class SharedCachedSwitchTest(unittest.TestCase):
+    def setUp(self):
+        self.real_switch_mock = flexmock()
+        self.real_switch_mock.switch_descriptor = SwitchDescriptor('model', 'hostname')
+        self.cache = SwitchCache(ttls={"vlans": 30, "interfaces": 30})
+        self.switch = SharedCachedSwitch(self.real_switch_mock, self.cache, max_age=10)
+
+    def tearDown(self):
+        flexmock_teardown()
+
+    def test_reads_are_shared_by_the_switches_of_a_cache(self):
+        self.real_switch_mock.should_receive("connect").once()
+        self.real_switch_mock.should_receive("get_vlans").once().and_return([Vlan(123)])
+        self.real_switch_mock.should_receive("disconnect").once()
+
+        for _ in range(3):
+            switch = SharedCachedSwitch(self.real_switch_mock, self.cache, max_age=10)
+            switch.connect()
+            assert_that(switch.get_vlans(), is_([Vlan(123)]))
+            switch.disconnect()
+
+        assert_that(self.cache.metrics(), is_({"hits": 2, "misses": 1, "switches": 1}))
+
+    def test_the_cached_results_are_returned_without_copying_them(self):
+        vlans = [Vlan(123)]
+        self.real_switch_mock.should_receive("get_vlans").once().and_return(vlans)
+
+        assert_that(self.switch.get_vlans(), is_(same_instance(vlans)))
+        assert_that(self.switch.get_vlans(), is_(same_instance(vlans)))
+
+    def test_reads_without_max_age_go_to_the_switch_and_refresh_the_cache(self):
+        self.real_switch_mock.should_receive("get_vlans").and_return([Vlan(123)]).and_return([Vlan(456)]).twice()
+        self.switch.get_vlans()
+
+        self.switch.max_age = None
+        assert_that(self.switch.get_vlans(), is_([Vlan(456)]))
+
+        self.switch.max_age = 10
+        assert_that(self.switch.get_vlans(), is_([Vlan(456)]))
+
+    def test_results_older_than_the_ttl_are_read_again(self):
+        self.cache.ttls["vlans"] = 0.01
+        self.real_switch_mock.should_receive("get_vlans").twice().and_return([Vlan(123)])
+
+        self.switch.get_vlans()
+        time.sleep(0.02)
+        self.switch.get_vlans()
+
+    def test_resources_without_ttl_are_not_cached(self):
+        self.real_switch_mock.should_receive("get_bonds").twice().and_return([])
+
+        self.switch.get_bonds()
+        self.switch.get_bonds()
+
+        assert_that(self.cache.metrics(), is_({"hits": 0, "misses": 0, "switches": 0}))
+
+    def test_the_arguments_and_credentials_are_part_of_the_key(self):
+        self.real_switch_mock.should_receive("get_interface").with_args("ge-0/0/1").once() \
+            .and_return(Interface("ge-0/0/1"))
+        self.real_switch_mock.should_receive("get_interface").with_args("ge-0/0/2").once() \
+            .and_return(Interface("ge-0/0/2"))
+        self.switch.get_interface("ge-0/0/1")
+        self.switch.get_interface("ge-0/0/2")
+
+        other_user_switch = flexmock(switch_descriptor=SwitchDescriptor('model', 'hostname', username='other'))
+        other_user_switch.should_receive("get_interface").with_args("ge-0/0/1").once() \
+            .and_return(Interface("ge-0/0/1"))
+        SharedCachedSwitch(other_user_switch, self.cache, max_age=10).get_interface("ge-0/0/1")
+
+    def test_a_write_drops_what_is_cached_for_the_switch(self):
+        self.real_switch_mock.should_receive("get_vlans").twice().and_return([Vlan(123)])
+        self.real_switch_mock.should_receive("remove_vlan").with_args(123).once()
+
+        self.switch.get_vlans()
+        self.switch.remove_vlan(123)
+        self.switch.get_vlans()
+
+    def test_a_read_started_before_a_write_is_not_kept(self):
+        def read_during_a_write():
+            self.cache.invalidate("hostname")
+            return [Vlan(123)]
+
+        self.real_switch_mock.should_receive("get_vlans").replace_with(read_during_a_write).twice()
+
+        self.switch.get_vlans()
+        self.switch.get_vlans()
+
+    def test_reads_within_a_transaction_go_to_the_switch(self):
+        self.real_switch_mock.should_receive("get_vlans").times(3).and_return([Vlan(123)])
+        self.real_switch_mock.should_receive("start_transaction").once()
+        self.real_switch_mock.should_receive("end_transaction").once()
+
+        self.switch.get_vlans()
+        self.switch.start_transaction()
+        self.switch.get_vlans()
+        self.switch.end_transaction()
+        self.switch.get_vlans()
+
+    def test_connect_is_immediate_without_max_age(self):
+        self.real_switch_mock.should_receive("connect").once()
+        self.real_switch_mock.should_receive("disconnect").once()
+
+        switch = SharedCachedSwitch(self.real_switch_mock, self.cache)
+        switch.connect()
+        switch.disconnect()
@@ -0,0 +1,70 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from hamcrest import assert_that, equal_to, has_length
+from netaddr import IPNetwork
+
+from netman.adapters.switches.cisco import Cisco
+from tests import available_models
+
+
+class CiscoGetVlansRoundTripsTest(unittest.TestCase):
+
+    def setUp(self):
+        specs = next(s for s in available_models if s["switch_descriptor"].model == "cisco")
+
+        self.switch = Cisco(specs["switch_descriptor"])
+        self.switch.connect()
+        self.vlans = []
+
+    def tearDown(self):
+        for number in self.vlans:
+            self.switch.remove_vlan(number)
+        self.switch.disconnect()
+
+    def test_get_vlans_sends_the_same_commands_whatever_the_number_of_vlans(self):
+        self._add_vlans_with_an_ip(2)
+        few_commands = self._get_vlans_commands()
+
+        self._add_vlans_with_an_ip(20)
+        many_commands = self._get_vlans_commands()
+
+        assert_that(many_commands, equal_to(few_commands))
+        assert_that(few_commands, has_length(2))
+
+    def _add_vlans_with_an_ip(self, count):
+        for _ in range(count):
+            number = 2000 + len(self.vlans)
+            self.switch.add_vlan(number)
+            self.vlans.append(number)
+            self.switch.add_ip_to_vlan(number, IPNetwork("10.{}.{}.1/24".format(number // 256, number % 256)))
+
+    def _get_vlans_commands(self):
+        commands = []
+        real_do = self.switch.ssh.do
+
+        def recording_do(command, *args, **kwargs):
+            commands.append(command)
+            return real_do(command, *args, **kwargs)
+
+        self.switch.ssh.do = recording_do
+        try:
+            vlans = self.switch.get_vlans()
+        finally:
+            self.switch.ssh.do = real_do
+
+        assert_that(sorted(v.number for v in vlans if v.number in self.vlans and v.ips), equal_to(self.vlans))
+        return commands
@@ -77,42 +77,20 @@ class CiscoTest(unittest.TestCase):
             "3333 some-name                        active",
         ])
 
-        self.mocked_ssh_client.should_receive("do").with_args("show ip interface").once().ordered().and_return([
-            "Vlan2222 is down, line protocol is down",
-            "  Internet protocol processing disabled",
-            "Vlan2500 is down, line protocol is down",
-            "  Internet protocol processing disabled",
-            "Vlan2723 is down, line protocol is down",
-            "  Internet protocol processing disabled",
-            "Vlan2998 is down, line protocol is down",
-            "  Internet protocol processing disabled",
-            "GigabitEthernet1/0/1 is up, line protocol is up",
-            "  Inbound  access list is not set"
-        ])
-
-        self.mocked_ssh_client.should_receive("do").with_args("show running-config interface vlan 2222").once().ordered().and_return([
-            "Building configuration...",
-            "Current configuration : 41 bytes",
+        self.mocked_ssh_client.should_receive("do").with_args("show running-config | begin interface").once().ordered().and_return([
+            "interface GigabitEthernet1/0/1",
+            " switchport access vlan 2998",
             "!",
             "interface Vlan2222",
             " no ip address",
-            "end"
-        ])
-
-        self.mocked_ssh_client.should_receive("do").with_args("show running-config interface vlan 2500").once().ordered().and_return([
-            "Building configuration...",
-            "Current configuration : 41 bytes",
             "!",
             "interface Vlan2500",
             " ip access-group SHIZZLE in",
             " ip access-group WHIZZLE out",
             " ip vrf forwarding BLAH",
-            "end"
-        ])
-
-        self.mocked_ssh_client.should_receive("do").with_args("show running-config interface vlan 2998").once().ordered().and_return([
-            "Building configuration...",
-            "Current configuration : 41 bytes",
+            "!",
+            "interface Vlan2723",
+            " ip address 4.1.1.1 255.255.255.0",
             "!",
             "interface Vlan2998",
             " ip vrf forwarding patate",
@@ -133,6 +111,9 @@ class CiscoTest(unittest.TestCase):
             " ip helper-address 10.10.10.1",
             " ip helper-address 10.10.10.2",
             " ntp disable",
+            "!",
+            "ip route 0.0.0.0 0.0.0.0 1.1.1.254",
+            "!",
             "end"
         ])
 
@@ -1957,6 +1938,26 @@ class CiscoTest(unittest.TestCase):
             password="the_password"
         )
 
+    @mock.patch("netman.adapters.switches.cisco.SshClient")
+    def test_connect_with_a_transcript(self, ssh_client_class_mock):
+        self.switch = Cisco(SwitchDescriptor(hostname="my.hostname", username="the_user", password="the_password", model="cisco",
+                                             transcript="ring:64"))
+
+        self.mocked_ssh_client = flexmock()
+        ssh_client_class_mock.return_value = self.mocked_ssh_client
+        self.mocked_ssh_client.should_receive("get_current_prompt").and_return("hostname#").once().ordered()
+        self.mocked_ssh_client.should_receive("do").with_args("terminal length 0").and_return([]).once().ordered()
+        self.mocked_ssh_client.should_receive("do").with_args("terminal width 0").and_return([]).once().ordered()
+
+        self.switch.connect()
+
+        ssh_client_class_mock.assert_called_with(
+            host="my.hostname",
+            username="the_user",
+            password="the_password",
+            transcript="ring:64"
+        )
+
     @mock.patch("netman.adapters.switches.cisco.SshClient")
     def test_auto_enabled_switch_doesnt_require_enable(self, ssh_client_class_mock):
         self.switch = Cisco(SwitchDescriptor(hostname="my.hostname", username="the_user", password="the_password", model="cisco", port=8000))
@@ -354,21 +354,38 @@ class Dell10GTest(unittest.TestCase):
             "Po43                                   trnk  Up",
         ])
 
-        self.mocked_ssh_client.should_receive("do").with_args("show running-config interface tengigabitethernet 0/0/1").and_return([])
-        self.mocked_ssh_client.should_receive("do").with_args("show running-config interface tengigabitethernet 0/0/12").and_return([
-            "switchport access vlan 1234"
-        ])
-        self.mocked_ssh_client.should_receive("do").with_args("show running-config interface tengigabitethernet 1/0/1").and_return([
+        self.mocked_ssh_client.should_receive("do").with_args("show running-config").once().and_return([
+            "!Current Configuration:",
+            "!System Description \"PowerConnect 8164, 5.1.8.2, VxWorks 6.6\"",
+            "!",
+            "configure",
+            "vlan 900,1000-1001,1003-1005,1234,1500",
+            "exit",
+            "interface vlan 1",
+            "shutdown",
+            "exit",
+            "!",
+            "interface Te0/0/12",
+            "switchport access vlan 1234",
+            "exit",
+            "!",
+            "interface Te1/0/1",
             "shutdown",
             "switchport mode trunk",
             "switchport trunk allowed vlan 900,1000-1001,1003-1005",
-        ])
-        self.mocked_ssh_client.should_receive("do").with_args("show running-config interface tengigabitethernet 1/0/2").and_return([
+            "exit",
+            "!",
+            "interface Te1/0/2",
             "switchport mode general",
             "switchport general allowed vlan add 900,1000-1001,1003-1005",
             "switchport general pvid 1500",
+            "exit",
+            "!",
+            "interface port-channel 43",
+            "description \"uplink\"",
+            "exit",
+            "exit",
         ])
-        self.mocked_ssh_client.should_receive("do").with_args("show running-config interface port-channel 43").and_return([])
 
         i1_1, i1_12, i2_x1, i2_x2, po43 = self.switch.get_interfaces()
 
@@ -400,6 +417,37 @@ class Dell10GTest(unittest.TestCase):
 
         assert_that(po43.name, is_("port-channel 43"))
 
+    def test_get_interfaces_applies_a_range_block_to_every_interface_of_the_range(self):
+        self.mocked_ssh_client.should_receive("do").with_args("show interfaces status").and_return([
+            "Port      Description               Vlan  Duplex Speed   Neg  Link   Flow Ctrl",
+            "                                                              State  Status",
+            "--------- ------------------------- ----- ------ ------- ---- ------ ---------",
+            "Te1/0/1                                   Full   10000   Auto Up     Active",
+            "Te1/0/2                                   Full   10000   Auto Up     Active",
+            "Te1/0/3                                   Full   10000   Auto Up     Active",
+        ])
+
+        self.mocked_ssh_client.should_receive("do").with_args("show running-config").once().and_return([
+            "!Current Configuration:",
+            "configure",
+            "interface Te1/0/1-2",
+            "switchport access vlan 1234",
+            "exit",
+            "!",
+            "interface Te1/0/2",
+            "shutdown",
+            "exit",
+            "exit",
+        ])
+
+        i1, i2, i3 = self.switch.get_interfaces()
+
+        assert_that(i1.access_vlan, is_(1234))
+        assert_that(i1.shutdown, is_(False))
+        assert_that(i2.access_vlan, is_(1234))
+        assert_that(i2.shutdown, is_(True))
+        assert_that(i3.access_vlan, is_(none()))
+
     def test_add_vlan(self):
         self.mocked_ssh_client.should_receive("do").with_args("show vlan id 1000").and_return([
             "ERROR: This VLAN does not exist."
@@ -26,7 +26,7 @@ from ncclient.operations import RPCError, TimeoutExpiredError
 from ncclient.xml_ import NCElement, to_ele, to_xml
 
 from netman.adapters.switches import juniper
-from netman.adapters.switches.juniper.base import Juniper
+from netman.adapters.switches.juniper.base import Juniper, all_interfaces
 from netman.adapters.switches.juniper.standard import JuniperCustomStrategies
 from netman.core.objects.access_groups import OUT, IN
 from netman.core.objects.exceptions import LockedSwitch, VlanAlreadyExist, BadVlanNumber, BadVlanName, UnknownVlan, \
@@ -6576,6 +6576,155 @@ class JuniperTest(unittest.TestCase):
 
         self.switch.end_transaction()
 
+    def test_query_results_are_indexed_once_by_interface_unit_vlan_and_bundle(self):
+        self.netconf_mock.should_receive("get_config").with_args(source="candidate", filter=is_xml("""
+            <filter>
+              <configuration>
+                <interfaces/>
+                <vlans/>
+              </configuration>
+            </filter>
+        """)).once().and_return(a_configuration("""
+            <interfaces>
+              <interface>
+                <name>ge-0/0/1</name>
+                <ether-options>
+                  <ieee-802.3ad>
+                    <bundle>ae1</bundle>
+                  </ieee-802.3ad>
+                </ether-options>
+              </interface>
+              <interface>
+                <name>ge-0/0/2</name>
+                <ether-options>
+                  <ieee-802.3ad>
+                    <bundle>ae1</bundle>
+                  </ieee-802.3ad>
+                </ether-options>
+              </interface>
+              <interface>
+                <name>vlan</name>
+                <unit>
+                  <name>20</name>
+                </unit>
+              </interface>
+            </interfaces>
+            <vlans>
+              <vlan>
+                <name>PATATE</name>
+                <vlan-id>1000</vlan-id>
+              </vlan>
+              <vlan>
+                <name>NO-VLAN-ID</name>
+              </vlan>
+            </vlans>
+        """))
+
+        config = self.switch.query(all_interfaces, self.switch.custom_strategies.all_vlans)
+
+        assert_that(config.index, is_(config.index))
+        assert_that(sorted(config.index.interfaces.keys()), equal_to(["ge-0/0/1", "ge-0/0/2", "vlan"]))
+        assert_that(config.index.units[("vlan", "20")].xpath("name")[0].text, equal_to("20"))
+        assert_that([n.xpath("name")[0].text for n in config.index.bundle_members["ae1"]], equal_to(["ge-0/0/1", "ge-0/0/2"]))
+        assert_that(config.index.vlan_ids_by_name, equal_to({"PATATE": 1000}))
+        assert_that(config.index.vlans_by_id["1000"].xpath("name")[0].text, equal_to("PATATE"))
+
+    def test_queries_within_a_transaction_read_each_section_once_and_see_the_pushed_edits(self):
+        self.netconf_mock.should_receive("lock").with_args(target="candidate").once().ordered()
+
+        self.netconf_mock.should_receive("get_config").with_args(source="candidate", filter=is_xml("""
+            <filter>
+              <configuration>
+                <interfaces/>
+                <vlans/>
+              </configuration>
+            </filter>
+        """)).once().ordered().and_return(a_configuration("""
+            <vlans>
+              <vlan>
+                <name>PATATE</name>
+                <vlan-id>1000</vlan-id>
+              </vlan>
+            </vlans>
+            <interfaces>
+              <interface>
+                <name>ge-0/0/6</name>
+                <unit>
+                  <name>0</name>
+                  <family>
+                    <ethernet-switching>
+                      <port-mode>access</port-mode>
+                    </ethernet-switching>
+                  </family>
+                </unit>
+              </interface>
+            </interfaces>
+        """))
+
+        self.netconf_mock.should_receive("edit_config").once().ordered().and_return(an_ok_response())
+
+        self.switch.start_transaction()
+        self.switch.set_access_vlan("ge-0/0/6", 1000)
+        interface = self.switch.get_interface("ge-0/0/6")
+
+        assert_that(interface.port_mode, equal_to(ACCESS))
+        assert_that(interface.access_vlan, equal_to(1000))
+
+    def test_rollback_within_a_transaction_reads_the_configuration_again(self):
+        self.netconf_mock.should_receive("lock").with_args(target="candidate").once()
+        self.netconf_mock.should_receive("discard_changes").with_args().once().and_return(an_ok_response())
+
+        self.netconf_mock.should_receive("get_config").with_args(source="candidate", filter=is_xml("""
+            <filter>
+              <configuration>
+                <vlans/>
+                <interfaces/>
+              </configuration>
+            </filter>
+        """)).twice().and_return(a_configuration("""
+            <vlans>
+              <vlan>
+                <name>PATATE</name>
+                <vlan-id>1000</vlan-id>
+              </vlan>
+            </vlans>
+        """))
+
+        self.switch.start_transaction()
+        self.switch.get_vlans()
+        self.switch.get_vlans()
+        self.switch.rollback_transaction()
+        vlans = self.switch.get_vlans()
+
+        assert_that(vlans, has_length(1))
+
+    def test_a_failed_edit_within_a_transaction_reads_the_configuration_again(self):
+        self.netconf_mock.should_receive("lock").with_args(target="candidate").once()
+
+        self.netconf_mock.should_receive("get_config").with_args(source="candidate", filter=is_xml("""
+            <filter>
+              <configuration>
+                <vlans/>
+                <interfaces/>
+              </configuration>
+            </filter>
+        """)).twice().and_return(a_configuration())
+
+        self.netconf_mock.should_receive("edit_config").once().and_raise(RPCError(to_ele(textwrap.dedent("""
+            <rpc-error xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" xmlns:junos="http://xml.juniper.net/junos/11.4R1/junos" xmlns:nc="urn:ietf:params:xml:ns:netconf:base:1.0">
+            <error-severity>error</error-severity>
+            <error-message>
+            port value outside range 1..63 for '99' in 'ge-0/0/99'
+            </error-message>
+            </rpc-error>
+            """))))
+
+        self.switch.start_transaction()
+        self.switch.get_vlans()
+        with self.assertRaises(UnknownInterface):
+            self.switch.set_interface_description("ge-0/0/99", "Resistance is futile")
+        self.switch.get_vlans()
+
     def test_commit_succeeds(self):
         self.netconf_mock.should_receive("commit").with_args().once().ordered()
 
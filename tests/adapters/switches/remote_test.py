@@ -15,8 +15,9 @@
 import json
 import unittest
 
-from hamcrest import assert_that, equal_to, is_, instance_of
+from hamcrest import assert_that, equal_to, is_, instance_of, is_not
 import mock
+import requests
 from ncclient.operations import RPCError
 from netaddr import IPAddress, IPNetwork
 from flexmock import flexmock, flexmock_teardown
@@ -24,10 +25,11 @@ from flexmock import flexmock, flexmock_teardown
 from netman.core.objects.interface_states import OFF, ON
 from tests import ExactIpNetwork, ignore_deprecation_warnings
 from tests.api import open_fixture
-from netman.adapters.switches.remote import RemoteSwitch, factory
+from netman.adapters.switches import remote
+from netman.adapters.switches.remote import RemoteSwitch, factory, HttpSessions
 from netman.core.objects.access_groups import IN, OUT
 from netman.core.objects.exceptions import UnknownBond, VlanAlreadyExist, BadBondLinkSpeed, LockedSwitch, \
-    NetmanException, UnknownInterface, UnknownSession, UnknownVlan, BadMplsIpState
+    NetmanException, UnknownInterface, UnknownSession, UnknownVlan, BadMplsIpState, BatchOperationFailed
 from netman.core.objects.port_modes import ACCESS, TRUNK, DYNAMIC
 from netman.core.objects.switch_descriptor import SwitchDescriptor
 
@@ -133,6 +135,245 @@ class RemoteSwitchTest(unittest.TestCase):
         self.setUp()
         self.test_add_bond()
 
+    @mock.patch('uuid.uuid4')
+    def test_changes_within_a_transaction_are_sent_right_away(self, m_uuid):
+        self._start_a_transaction(m_uuid)
+
+        self.requests_mock.should_receive("put").once().with_args(
+            url=self.netman_url+'/switches-sessions/0123456789/interfaces/ge-0/0/99/access-vlan',
+            headers=self.headers,
+            data='2000'
+        ).and_return(
+            Reply(
+                content=json.dumps({"error": "Unknown interface ge-0/0/99",
+                                    "error-module": UnknownInterface.__module__,
+                                    "error-class": UnknownInterface.__name__}),
+                status_code=404))
+
+        with self.assertRaises(UnknownInterface) as expect:
+            self.switch.set_access_vlan("ge-0/0/99", 2000)
+
+        assert_that(str(expect.exception), equal_to("Unknown interface ge-0/0/99"))
+
+    @mock.patch('uuid.uuid4')
+    def test_changes_within_a_batch_are_sent_in_a_single_request_before_the_commit(self, m_uuid):
+        self._start_a_transaction(m_uuid)
+
+        self.requests_mock.should_receive("post").once().with_args(
+            url=self.netman_url+'/switches-sessions/0123456789/batch',
+            headers=self.headers,
+            data=JsonList([
+                {"method": "POST", "resource": "/vlans", "body": '{"number": 2000}'},
+                {"method": "PUT", "resource": "/interfaces/ge-0/0/6/access-vlan", "body": "2000"},
+                {"method": "DELETE", "resource": "/vlans/1000", "body": None}
+            ])
+        ).and_return(
+            Reply(
+                content=json.dumps([
+                    {"method": "POST", "resource": "/vlans", "status_code": 201, "result": None},
+                    {"method": "PUT", "resource": "/interfaces/ge-0/0/6/access-vlan", "status_code": 204,
+                     "result": None},
+                    {"method": "DELETE", "resource": "/vlans/1000", "status_code": 204, "result": None}
+                ]),
+                status_code=200)).ordered()
+        self.requests_mock.should_receive("post").once().with_args(
+            url=self.netman_url+'/switches-sessions/0123456789/actions',
+            data='commit',
+            headers={'Netman-Verbose-Errors': "yes",
+                     'Netman-Max-Version': "2",
+                     'Netman-Session-Id': '0123456789'}
+        ).and_return(
+            Reply(
+                content="",
+                status_code=204)).ordered()
+
+        with self.switch.batched():
+            self.switch.add_vlan(2000)
+            self.switch.set_access_vlan("ge-0/0/6", 2000)
+            self.switch.remove_vlan(1000)
+            self.switch.commit_transaction()
+
+    @mock.patch('uuid.uuid4')
+    def test_a_failing_batched_change_raises_naming_it_and_the_changes_not_applied(self, m_uuid):
+        self._start_a_transaction(m_uuid)
+
+        self.requests_mock.should_receive("post").once().with_args(
+            url=self.netman_url+'/switches-sessions/0123456789/batch',
+            headers=self.headers,
+            data=JsonList([
+                {"method": "POST", "resource": "/vlans", "body": '{"number": 2000}'},
+                {"method": "PUT", "resource": "/interfaces/ge-0/0/6/access-vlan", "body": "2000"},
+                {"method": "DELETE", "resource": "/vlans/1000", "body": None}
+            ])
+        ).and_return(
+            Reply(
+                content=json.dumps([
+                    {"method": "POST", "resource": "/vlans", "status_code": 201, "result": None},
+                    {"method": "PUT", "resource": "/interfaces/ge-0/0/6/access-vlan", "status_code": 404,
+                     "result": {"error": "Unknown interface ge-0/0/6",
+                                "error-module": UnknownInterface.__module__,
+                                "error-class": UnknownInterface.__name__}}
+                ]),
+                status_code=404))
+
+        with self.assertRaises(BatchOperationFailed) as expect:
+            with self.switch.batched():
+                self.switch.add_vlan(2000)
+                self.switch.set_access_vlan("ge-0/0/6", 2000)
+                self.switch.remove_vlan(1000)
+
+        assert_that(expect.exception.operation, equal_to("PUT /interfaces/ge-0/0/6/access-vlan"))
+        assert_that(expect.exception.error, instance_of(UnknownInterface))
+        assert_that(expect.exception.not_applied, equal_to(["DELETE /vlans/1000"]))
+        assert_that(str(expect.exception), equal_to(
+            "Batched operation PUT /interfaces/ge-0/0/6/access-vlan failed: Unknown interface ge-0/0/6, "
+            "not applied: DELETE /vlans/1000"))
+
+    def test_a_failing_change_of_a_batch_without_session_leaves_every_change_not_applied(self):
+        self.requests_mock.should_receive("post").once().with_args(
+            url=self.netman_url+'/switches/toto/batch',
+            headers=self.headers,
+            data=JsonList([
+                {"method": "POST", "resource": "/vlans", "body": '{"number": 2000}'},
+                {"method": "POST", "resource": "/vlans", "body": '{"number": 2001}'}
+            ])
+        ).and_return(
+            Reply(
+                content=json.dumps([
+                    {"method": "POST", "resource": "/vlans", "status_code": 201, "result": None},
+                    {"method": "POST", "resource": "/vlans", "status_code": 409,
+                     "result": {"error": "Vlan 2001 already exists",
+                                "error-module": VlanAlreadyExist.__module__,
+                                "error-class": VlanAlreadyExist.__name__}}
+                ]),
+                status_code=409))
+
+        with self.assertRaises(BatchOperationFailed) as expect:
+            with self.switch.batched():
+                self.switch.add_vlan(2000)
+                self.switch.add_vlan(2001)
+
+        assert_that(expect.exception.error, instance_of(VlanAlreadyExist))
+        assert_that(expect.exception.not_applied, equal_to(["POST /vlans"]))
+
+    @mock.patch('uuid.uuid4')
+    def test_an_error_within_a_batch_drops_its_changes(self, m_uuid):
+        self._start_a_transaction(m_uuid)
+
+        self.requests_mock.should_receive("post").never()
+
+        with self.assertRaises(ValueError):
+            with self.switch.batched():
+                self.switch.add_vlan(2000)
+                raise ValueError()
+
+        assert_that(self.switch.pending_operations, is_(None))
+
+    @mock.patch('uuid.uuid4')
+    def test_changes_are_sent_one_by_one_to_a_proxy_without_batches(self, m_uuid):
+        self._start_a_transaction(m_uuid)
+
+        self.requests_mock.should_receive("post").once().with_args(
+            url=self.netman_url+'/switches-sessions/0123456789/batch',
+            headers=self.headers,
+            data=JsonList([
+                {"method": "PUT", "resource": "/interfaces/ge-0/0/6/access-vlan", "body": "2000"}
+            ])
+        ).and_return(
+            Reply(
+                content="<html>Not Found</html>",
+                status_code=404)).ordered()
+        self.requests_mock.should_receive("put").once().with_args(
+            url=self.netman_url+'/switches-sessions/0123456789/interfaces/ge-0/0/6/access-vlan',
+            headers=self.headers,
+            data='2000'
+        ).and_return(
+            Reply(
+                content='',
+                status_code=204)).ordered()
+        self.requests_mock.should_receive("get").once().with_args(
+            url=self.netman_url+'/switches-sessions/0123456789/vlans',
+            headers=self.headers
+        ).and_return(
+            Reply(
+                content='[]',
+                status_code=200)).ordered()
+
+        with self.switch.batched():
+            self.switch.set_access_vlan("ge-0/0/6", 2000)
+            self.switch.get_vlans()
+
+    @mock.patch('uuid.uuid4')
+    def test_receiving_unknown_session_on_a_batch_will_connect_again(self, m_uuid):
+        self._start_a_transaction(m_uuid)
+
+        self.requests_mock.should_receive("post").once().with_args(
+            url=self.netman_url+'/switches-sessions/0123456789/batch',
+            headers=self.headers.copy(),
+            data=JsonList([
+                {"method": "POST", "resource": "/vlans", "body": '{"number": 2000}'}
+            ])
+        ).and_return(
+            Reply(
+                content=json.dumps({
+                    "error": "",
+                    "error-module": UnknownSession.__module__,
+                    "error-class": UnknownSession.__name__
+                }),
+                status_code=500)).ordered()
+
+        m_uuid.return_value = 'new-session-id'
+        self.headers['Netman-Session-Id'] = 'new-session-id'
+
+        self.requests_mock.should_receive("post").once().with_args(
+            url=self.netman_url+'/switches-sessions/new-session-id',
+            headers=self.headers,
+            data=JsonData(hostname="toto")
+        ).and_return(
+            Reply(
+                content=json.dumps({'session_id': 'new-session-id'}),
+                status_code=201)).ordered()
+        self.requests_mock.should_receive("post").once().with_args(
+            url=self.netman_url+'/switches-sessions/new-session-id/batch',
+            headers=self.headers,
+            data=JsonList([
+                {"method": "POST", "resource": "/vlans", "body": '{"number": 2000}'}
+            ])
+        ).and_return(
+            Reply(
+                content=json.dumps([
+                    {"method": "POST", "resource": "/vlans", "status_code": 201, "result": None}
+                ]),
+                status_code=200)).ordered()
+
+        with self.switch.batched():
+            self.switch.add_vlan(2000)
+
+    def _start_a_transaction(self, m_uuid):
+        m_uuid.return_value = '0123456789'
+        self.headers['Netman-Session-Id'] = '0123456789'
+        self.requests_mock.should_receive("post").once().with_args(
+            url=self.netman_url+'/switches-sessions/0123456789',
+            headers=self.headers,
+            data=JsonData(hostname="toto")
+        ).and_return(
+            Reply(
+                content=json.dumps({'session_id': '0123456789'}),
+                status_code=201))
+        self.requests_mock.should_receive("post").once().with_args(
+            url=self.netman_url+'/switches-sessions/0123456789/actions',
+            data='start_transaction',
+            headers={'Netman-Verbose-Errors': "yes",
+                     'Netman-Max-Version': "2",
+                     'Netman-Session-Id': '0123456789'}
+        ).and_return(
+            Reply(
+                content="",
+                status_code=204))
+
+        self.switch.connect()
+        self.switch.start_transaction()
+
     @mock.patch('uuid.uuid4')
     def test_connect_fails_to_obtain_a_session(self, m_uuid):
         m_uuid.return_value = '0123456789'
@@ -1702,6 +1943,43 @@ class RemoteSwitchTest(unittest.TestCase):
             self.switch.set_vlan_mpls_ip_state(123, 30)
 
 
+class HttpSessionsTest(unittest.TestCase):
+    def setUp(self):
+        self.http_sessions = HttpSessions()
+
+    def tearDown(self):
+        self.http_sessions.close()
+
+    def test_the_same_proxy_gets_the_same_session(self):
+        session = self.http_sessions.get("http://netman.example.org:1234")
+
+        assert_that(session, instance_of(requests.Session))
+        assert_that(self.http_sessions.get("http://netman.example.org:1234"), is_(session))
+        assert_that(self.http_sessions.get("http://other.example.org:1234"), is_not(session))
+
+    def test_sessions_pool_connections_up_to_the_configured_size(self):
+        remote.default_pool_size = 3
+        try:
+            session = self.http_sessions.get("https://netman.example.org:1234")
+        finally:
+            remote.default_pool_size = 10
+
+        assert_that(session.get_adapter("https://netman.example.org:1234")._pool_maxsize, equal_to(3))
+
+    def test_without_keep_alive_every_call_uses_a_new_connection(self):
+        remote.default_keep_alive = False
+        try:
+            assert_that(self.http_sessions.get("http://netman.example.org:1234"), is_(requests))
+        finally:
+            remote.default_keep_alive = True
+
+    def test_remote_switches_share_the_session_of_their_proxy(self):
+        first = RemoteSwitch(SwitchDescriptor(model="juniper", hostname="toto", netman_server="http://netman.example.org:1234"))
+        second = RemoteSwitch(SwitchDescriptor(model="juniper", hostname="tata", netman_server="http://netman.example.org:1234"))
+
+        assert_that(first.requests, is_(second.requests))
+
+
 class Reply:
     def __init__(self, status_code, content, headers=None):
         self.status_code = status_code
@@ -1712,6 +1990,17 @@ class Reply:
         return json.loads(self.content)
 
 
+class JsonList:
+    def __init__(self, data):
+        self.data = data
+
+    def __eq__(self, other):
+        try:
+            return json.loads(other) == self.data
+        except ValueError:
+            return False
+
+
 class JsonData:
     def __init__(self, **data):
         self.data = data
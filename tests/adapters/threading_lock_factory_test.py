@@ -0,0 +1,80 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+import unittest
+
+from hamcrest import assert_that, is_, instance_of
+
+from netman.adapters.threading_lock_factory import ThreadingLockFactory, ReadWriteLock
+
+
+class ThreadingLockFactoryTest(unittest.TestCase):
+    def test_read_write_mode(self):
+        assert_that(ThreadingLockFactory(read_write=True).new_lock("my.switch"), is_(instance_of(ReadWriteLock)))
+
+
+class ReadWriteLockTest(unittest.TestCase):
+    def setUp(self):
+        self.lock = ReadWriteLock()
+        self.events = []
+
+    def test_readers_share_the_lock(self):
+        self.lock.acquire_read()
+
+        reader = self._in_thread(self._read, "second reader")
+        reader.join(1)
+
+        assert_that(self.events, is_(["second reader"]))
+        self.lock.release_read()
+
+    def test_a_writer_waits_for_the_readers(self):
+        self.lock.acquire_read()
+
+        writer = self._in_thread(self._write, "writer")
+        time.sleep(0.02)
+        self.events.append("reader done")
+        self.lock.release_read()
+        writer.join(1)
+
+        assert_that(self.events, is_(["reader done", "writer"]))
+
+    def test_a_waiting_writer_goes_before_the_readers_arriving_after_it(self):
+        self.lock.acquire_read()
+
+        writer = self._in_thread(self._write, "writer")
+        time.sleep(0.02)
+        late_reader = self._in_thread(self._read, "late reader")
+        time.sleep(0.02)
+        self.lock.release_read()
+        writer.join(1)
+        late_reader.join(1)
+
+        assert_that(self.events, is_(["writer", "late reader"]))
+
+    def _read(self, event):
+        self.lock.acquire_read()
+        self.events.append(event)
+        self.lock.release_read()
+
+    def _write(self, event):
+        self.lock.acquire()
+        self.events.append(event)
+        self.lock.release()
+
+    def _in_thread(self, target, *args):
+        thread = threading.Thread(target=target, args=args)
+        thread.start()
+        return thread
@@ -12,11 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from hamcrest import assert_that
+import shutil
+import tempfile
+
+from hamcrest import assert_that, is_
 from mock import Mock
 
+from netman.adapters.file_lock_factory import FileLockFactory
 from netman.adapters.threading_lock_factory import ThreadingLockFactory
 from netman.core.switch_factory import SwitchFactory
+from netman.core.switch_sessions import SwitchSessionManager
 from pkg_resources import Distribution
 
 from netman.api.netman_api import NetmanApi
@@ -30,8 +35,23 @@ class NetmanApiTest(BaseApiTest):
         get_distribution_mock.return_value = Distribution(version="1.1.111.dev111111111")
 
         NetmanApi(SwitchFactory(None, ThreadingLockFactory()),
-                  get_distribution_callback=get_distribution_mock).hook_to(self.app)
+                  get_distribution_callback=get_distribution_mock,
+                  sessions_manager=SwitchSessionManager()).hook_to(self.app)
 
         data, code = self.get("/netman/info")
 
         assert_that(data, matches_fixture("get_info.json"))
+
+    def test_get_info_with_a_lock_provider_shared_by_the_processes(self):
+        lock_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_directory)
+        get_distribution_mock = Mock()
+        get_distribution_mock.return_value = Distribution(version="1.1.111.dev111111111")
+
+        NetmanApi(SwitchFactory(None, FileLockFactory(lock_directory)),
+                  get_distribution_callback=get_distribution_mock).hook_to(self.app)
+
+        data, code = self.get("/netman/info")
+
+        assert_that(data["lock_provider"], is_("netman.adapters.file_lock_factory.FileLockFactory"))
+        assert_that(data["locks"], is_({"acquired": 0, "contended": 0, "timed_out": 0, "waited_seconds": 0}))
@@ -12,9 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import json
+import uuid
+
+import requests
 
 from flexmock import flexmock, flexmock_teardown
-from hamcrest import assert_that, equal_to, is_
+from hamcrest import assert_that, equal_to, is_, has_length, has_entries, contains
 from netaddr import IPNetwork
 from netaddr.ip import IPAddress
 
@@ -25,6 +28,7 @@ from netman.core.objects.vrrp_group import VrrpGroup
 from tests import ExactIpNetwork
 from tests.api import matches_fixture, open_fixture
 from tests.api.base_api_test import BaseApiTest
+from netman.api import api_utils
 from netman.api.api_utils import RegexConverter
 from netman.api.switch_api import SwitchApi
 from netman.api.switch_session_api import SwitchSessionApi
@@ -47,6 +51,7 @@ class SwitchApiTest(BaseApiTest):
         self.session_manager = flexmock()
 
         self.session_manager.should_receive("get_switch_for_session").and_raise(UnknownSession("patate"))
+        self.session_manager.should_receive("get_session_owner").and_return(None)
 
         SwitchApi(self.switch_factory, self.session_manager).hook_to(self.app)
         SwitchSessionApi(self.switch_factory, self.session_manager).hook_to(self.app)
@@ -88,6 +93,75 @@ class SwitchApiTest(BaseApiTest):
         assert_that(code, equal_to(200))
         assert_that(result, matches_fixture("get_switch_hostname_vlans.json"))
 
+    def test_long_lists_are_streamed(self):
+        flexmock(api_utils, streamed_list_size=1)
+        self.switch_factory.should_receive('get_switch').with_args('my.switch').and_return(self.switch_mock).once().ordered()
+        self.switch_mock.should_receive('connect').once().ordered()
+        self.switch_mock.should_receive('get_interfaces').and_return([
+            Interface(name="ethernet 1/4", shutdown=False, port_mode=TRUNK, trunk_vlans=[2999, 3001, 3000],
+                      trunk_native_vlan=2),
+            Interface(name="ethernet 1/2", shutdown=True, port_mode=ACCESS, access_vlan=1999),
+            Interface(name="ethernet 1/3", shutdown=False, port_mode=BOND_MEMBER, bond_master=12),
+        ]).once().ordered()
+        self.switch_mock.should_receive('disconnect').once().ordered()
+
+        with self.app.test_client() as http_client:
+            response = http_client.get("/switches/my.switch/interfaces")
+
+        assert_that(response.is_streamed, is_(True))
+        assert_that([i["name"] for i in json.loads(response.data)],
+                    is_(["ethernet 1/2", "ethernet 1/3", "ethernet 1/4"]))
+
+    def test_interfaces_are_sent_one_per_line_to_ndjson_clients(self):
+        self.switch_factory.should_receive('get_switch').with_args('my.switch').and_return(self.switch_mock).once().ordered()
+        self.switch_mock.should_receive('connect').once().ordered()
+        self.switch_mock.should_receive('get_interfaces').and_return([
+            Interface(name="ethernet 1/4", shutdown=False, port_mode=TRUNK, trunk_vlans=[2999, 3001, 3000],
+                      trunk_native_vlan=2),
+            Interface(name="ethernet 1/2", shutdown=True, port_mode=ACCESS, access_vlan=1999),
+        ]).once().ordered()
+        self.switch_mock.should_receive('disconnect').once().ordered()
+
+        with self.app.test_client() as http_client:
+            response = http_client.get("/switches/my.switch/interfaces",
+                                       headers={"Accept": "application/x-ndjson"})
+
+        assert_that(response.status_code, equal_to(200))
+        assert_that(response.mimetype, equal_to("application/x-ndjson"))
+        lines = response.data.splitlines()
+        assert_that(lines, has_length(2))
+        assert_that(json.loads(lines[0]), has_entries(name="ethernet 1/2", access_vlan=1999))
+        assert_that(json.loads(lines[1]), has_entries(name="ethernet 1/4", trunk_vlans=[2999, 3000, 3001]))
+
+    def test_vlans_are_sent_one_per_line_when_streaming_is_asked(self):
+        self.switch_factory.should_receive('get_switch').with_args('my.switch').and_return(self.switch_mock).once().ordered()
+        self.switch_mock.should_receive('connect').once().ordered()
+        self.switch_mock.should_receive('get_vlans').and_return([
+            Vlan(2, "Two", [IPNetwork('2.2.2.2/24')]),
+            Vlan(1, "One")
+        ]).once().ordered()
+        self.switch_mock.should_receive('disconnect').once().ordered()
+
+        with self.app.test_client() as http_client:
+            response = http_client.get("/switches/my.switch/vlans?stream=1")
+
+        assert_that([json.loads(line) for line in response.data.splitlines()], contains(
+            has_entries(number=1, name="One"),
+            has_entries(number=2, name="Two", ips=[{"address": "2.2.2.2", "mask": 24}])))
+
+    def test_json_clients_get_a_single_json_list(self):
+        self.switch_factory.should_receive('get_switch').with_args('my.switch').and_return(self.switch_mock).once().ordered()
+        self.switch_mock.should_receive('connect').once().ordered()
+        self.switch_mock.should_receive('get_vlans').and_return([Vlan(1, "One")]).once().ordered()
+        self.switch_mock.should_receive('disconnect').once().ordered()
+
+        with self.app.test_client() as http_client:
+            response = http_client.get("/switches/my.switch/vlans",
+                                       headers={"Accept": "application/json, application/x-ndjson"})
+
+        assert_that(response.mimetype, equal_to("application/json"))
+        assert_that(json.loads(response.data), contains(has_entries(number=1)))
+
     def test_single_vlan_serialization(self):
         self.switch_factory.should_receive('get_switch').with_args('my.switch').and_return(self.switch_mock).once().ordered()
         self.switch_mock.should_receive('connect').once().ordered()
@@ -1507,6 +1581,30 @@ class SwitchApiTest(BaseApiTest):
         assert_that(code, equal_to(200))
         assert_that(result, matches_fixture("get_switch_hostname_versions.json"))
 
+    def test_a_get_accepting_cached_results_gives_its_max_age_to_the_switch(self):
+        self.switch_mock.max_age = None
+        self.switch_factory.should_receive('get_switch').with_args('my.switch').and_return(self.switch_mock).once().ordered()
+        self.switch_mock.should_receive('connect').once().ordered()
+        self.switch_mock.should_receive('get_versions').once().ordered().and_return({})
+        self.switch_mock.should_receive('disconnect').once().ordered()
+
+        result, code = self.get("/switches/my.switch/versions", headers={"Cache-Control": "max-age=10"})
+
+        assert_that(code, equal_to(200))
+        assert_that(self.switch_mock.max_age, is_(10))
+
+    def test_a_write_never_accepts_cached_results(self):
+        self.switch_mock.max_age = None
+        self.switch_factory.should_receive('get_switch').with_args('my.switch').and_return(self.switch_mock).once().ordered()
+        self.switch_mock.should_receive('connect').once().ordered()
+        self.switch_mock.should_receive('remove_vlan').with_args(2500).once().ordered()
+        self.switch_mock.should_receive('disconnect').once().ordered()
+
+        result, code = self.delete("/switches/my.switch/vlans/2500", headers={"Cache-Control": "max-age=10"})
+
+        assert_that(code, equal_to(204))
+        assert_that(self.switch_mock.max_age, is_(None))
+
     def test_uncaught_exceptions_are_formatted_correctly(self):
         self.switch_factory.should_receive('get_switch').with_args('my.switch').and_return(self.switch_mock).once().ordered()
         self.switch_mock.should_receive('connect').once().ordered()
@@ -1572,6 +1670,104 @@ class SwitchApiTest(BaseApiTest):
             "error-class": "NotImplementedError",
         }))
 
+    def test_batch_runs_every_operation_in_a_single_transaction(self):
+        flexmock(uuid).should_receive("uuid4").and_return("1234")
+        session_id = "batch-1234"
+
+        self.switch_factory.should_receive('get_switch').with_args('my.switch').and_return(self.switch_mock).once().ordered()
+        self.session_manager.should_receive('open_session').with_args(self.switch_mock, session_id).once().ordered()
+        self.session_manager.should_receive('start_transaction').with_args(session_id).once().ordered()
+        self.session_manager.should_receive("get_switch_for_session").with_args(session_id).and_return(self.switch_mock)
+        self.switch_mock.should_receive('connect').never()
+        self.switch_mock.should_receive('add_vlan').with_args(2000, "two_thousands").once().ordered()
+        self.switch_mock.should_receive('set_access_vlan').with_args('ge-0/0/1', 2000).once().ordered()
+        self.switch_mock.should_receive('set_access_vlan').with_args('ge-0/0/2', 2000).once().ordered()
+        self.session_manager.should_receive('commit_session').with_args(session_id).once().ordered()
+        self.session_manager.should_receive('end_transaction').with_args(session_id).once().ordered()
+        self.session_manager.should_receive('close_session').with_args(session_id).once().ordered()
+
+        result, code = self.post("/switches/my.switch/batch", fixture="post_switch_hostname_batch.json")
+
+        assert_that(code, equal_to(200), str(result))
+        assert_that(result, matches_fixture("post_switch_hostname_batch_result.json"))
+
+    def test_batch_stops_and_rolls_back_on_the_first_failing_operation(self):
+        flexmock(uuid).should_receive("uuid4").and_return("1234")
+        session_id = "batch-1234"
+
+        self.switch_factory.should_receive('get_switch').with_args('my.switch').and_return(self.switch_mock).once().ordered()
+        self.session_manager.should_receive('open_session').with_args(self.switch_mock, session_id).once().ordered()
+        self.session_manager.should_receive('start_transaction').with_args(session_id).once().ordered()
+        self.session_manager.should_receive("get_switch_for_session").with_args(session_id).and_return(self.switch_mock)
+        self.switch_mock.should_receive('add_vlan').with_args(2000, "two_thousands").once().ordered()
+        self.switch_mock.should_receive('set_access_vlan').with_args('ge-0/0/1', 2000).once().ordered() \
+            .and_raise(UnknownInterface('ge-0/0/1'))
+        self.switch_mock.should_receive('set_access_vlan').with_args('ge-0/0/2', 2000).never()
+        self.session_manager.should_receive('commit_session').never()
+        self.session_manager.should_receive('rollback_session').with_args(session_id).once().ordered()
+        self.session_manager.should_receive('end_transaction').with_args(session_id).once().ordered()
+        self.session_manager.should_receive('close_session').with_args(session_id).once().ordered()
+
+        result, code = self.post("/switches/my.switch/batch", fixture="post_switch_hostname_batch.json")
+
+        assert_that(code, equal_to(404))
+        assert_that(result, has_length(2))
+        assert_that(result[1], equal_to({"method": "PUT",
+                                         "resource": "interfaces/ge-0/0/1/access-vlan",
+                                         "status_code": 404,
+                                         "result": {"error": "Unknown interface ge-0/0/1"}}))
+
+    def test_batch_reports_a_failed_commit_with_the_results_of_the_operations(self):
+        flexmock(uuid).should_receive("uuid4").and_return("1234")
+        session_id = "batch-1234"
+
+        self.switch_factory.should_receive('get_switch').with_args('my.switch').and_return(self.switch_mock).once().ordered()
+        self.session_manager.should_receive('open_session').with_args(self.switch_mock, session_id).once().ordered()
+        self.session_manager.should_receive('start_transaction').with_args(session_id).once().ordered()
+        self.session_manager.should_receive("get_switch_for_session").with_args(session_id).and_return(self.switch_mock)
+        self.switch_mock.should_receive('add_vlan').with_args(2000, "two_thousands").once().ordered()
+        self.switch_mock.should_receive('set_access_vlan').with_args('ge-0/0/1', 2000).once().ordered()
+        self.switch_mock.should_receive('set_access_vlan').with_args('ge-0/0/2', 2000).once().ordered()
+        self.session_manager.should_receive('commit_session').with_args(session_id).once().ordered() \
+            .and_raise(UnknownInterface('ge-0/0/2'))
+        self.session_manager.should_receive('rollback_session').with_args(session_id).once().ordered()
+        self.session_manager.should_receive('end_transaction').with_args(session_id).once().ordered()
+        self.session_manager.should_receive('close_session').with_args(session_id).once().ordered()
+
+        result, code = self.post("/switches/my.switch/batch", fixture="post_switch_hostname_batch.json")
+
+        assert_that(code, equal_to(404))
+        assert_that(result, has_length(4))
+        assert_that(result[2]["status_code"], equal_to(204))
+        assert_that(result[3], equal_to({"action": "commit",
+                                         "status_code": 404,
+                                         "result": {"error": "Unknown interface ge-0/0/2"}}))
+
+    def test_batch_operations_do_not_get_the_headers_changing_the_format_of_the_response(self):
+        flexmock(uuid).should_receive("uuid4").and_return("1234")
+        session_id = "batch-1234"
+
+        self.switch_factory.should_receive('get_switch').with_args('my.switch').and_return(self.switch_mock).once().ordered()
+        self.session_manager.should_receive('open_session').with_args(self.switch_mock, session_id).once().ordered()
+        self.session_manager.should_receive('start_transaction').with_args(session_id).once().ordered()
+        self.session_manager.should_receive("get_switch_for_session").with_args(session_id).and_return(self.switch_mock)
+        self.switch_mock.should_receive('get_vlans').and_return([Vlan(1, "One"), Vlan(2, "Two")]).once().ordered()
+        self.session_manager.should_receive('commit_session').with_args(session_id).once().ordered()
+        self.session_manager.should_receive('end_transaction').with_args(session_id).once().ordered()
+        self.session_manager.should_receive('close_session').with_args(session_id).once().ordered()
+
+        result, code = self.post("/switches/my.switch/batch", data=[{"method": "GET", "resource": "vlans", "body": ""}],
+                                 headers={"Accept": "application/x-ndjson"})
+
+        assert_that(code, equal_to(200), str(result))
+        assert_that([v["number"] for v in result[0]["result"]], equal_to([1, 2]))
+
+    def test_batch_with_malformed_operations(self):
+        result, code = self.post("/switches/my.switch/batch", data=[{"method": "PATCH", "resource": "vlans"}])
+
+        assert_that(code, equal_to(400))
+        assert_that(result['error'], is_('Malformed operation, should be {"method": "PUT", "resource": "...", "body": ...}'))
+
     def test_open_session(self):
         session_id = 'patate'
 
@@ -1643,6 +1839,90 @@ class SwitchApiTest(BaseApiTest):
         assert_that(code, equal_to(404))
         assert_that(result['error'], is_("Session \"%s\" not found." % session_uuid))
 
+    def test_a_session_call_runs_the_switch_view_with_the_session_switch(self):
+        session_uuid = 'patate'
+
+        self.session_manager.should_receive("get_switch_for_session").with_args(session_uuid).and_return(self.switch_mock)
+        self.session_manager.should_receive("keep_alive").with_args(session_uuid).once().ordered()
+        self.switch_mock.should_receive('connect').never()
+        self.switch_mock.should_receive('add_vlan').with_args(2000, None).once().ordered()
+
+        result, code = self.post("/switches-sessions/{}/vlans".format(session_uuid), data={"number": 2000})
+
+        assert_that(code, equal_to(201), str(result))
+
+    def test_an_unknown_resource_inside_a_session(self):
+        session_uuid = 'patate'
+
+        self.session_manager.should_receive("get_switch_for_session").with_args(session_uuid).and_return(self.switch_mock)
+        self.session_manager.should_receive("keep_alive").with_args(session_uuid).once()
+
+        result, code = self.post("/switches-sessions/{}/potatoes".format(session_uuid), data={"number": 2000})
+
+        assert_that(code, equal_to(404))
+
+    def test_a_session_held_by_another_process_is_relayed_to_it(self):
+        session_uuid = 'patate'
+
+        self.session_manager.should_receive("get_session_owner").with_args(session_uuid) \
+            .and_return("http://127.0.0.1:5001")
+        self.session_manager.should_receive("keep_alive").never()
+        flexmock(requests).should_receive("request").with_args(
+            "POST", "http://127.0.0.1:5001/switches-sessions/patate/vlans", params="", data='{"number": 2000}',
+            headers=dict
+        ).and_return(flexmock(content='{"error": "Vlan 2000 already exists"}', status_code=409,
+                              headers={'Content-Type': 'application/json'})).once()
+
+        result, code = self.post("/switches-sessions/{}/vlans".format(session_uuid), data={"number": 2000})
+
+        assert_that(code, equal_to(409))
+        assert_that(result, equal_to({"error": "Vlan 2000 already exists"}))
+
+    def test_the_query_string_is_relayed_with_the_session_call(self):
+        session_uuid = 'patate'
+
+        self.session_manager.should_receive("get_session_owner").with_args(session_uuid) \
+            .and_return("http://127.0.0.1:5001")
+        flexmock(requests).should_receive("request").with_args(
+            "GET", "http://127.0.0.1:5001/switches-sessions/patate/vlans", params="stream=1", data="", headers=dict
+        ).and_return(flexmock(content='{"number": 1}\n', status_code=200,
+                              headers={'Content-Type': 'application/x-ndjson'})).once()
+
+        with self.app.test_client() as http_client:
+            response = http_client.get("/switches-sessions/{}/vlans?stream=1".format(session_uuid))
+
+        assert_that(response.status_code, equal_to(200))
+        assert_that(response.data, equal_to('{"number": 1}\n'))
+
+    def test_a_session_held_by_a_process_that_is_gone_is_forgotten(self):
+        session_uuid = 'patate'
+
+        self.session_manager.should_receive("get_session_owner").with_args(session_uuid) \
+            .and_return("http://127.0.0.1:5001")
+        flexmock(requests).should_receive("request").and_raise(requests.ConnectionError)
+        self.session_manager.should_receive("forget_session").with_args(session_uuid).once()
+
+        result, code = self.post("/switches-sessions/{}/actions".format(session_uuid), raw_data="commit")
+
+        assert_that(code, equal_to(404))
+        assert_that(result['error'], is_("Session \"%s\" not found." % session_uuid))
+
+    def test_a_batch_sent_to_a_session_held_by_another_process_is_relayed_to_it(self):
+        session_uuid = 'patate'
+
+        self.session_manager.should_receive("get_session_owner").with_args(session_uuid) \
+            .and_return("http://127.0.0.1:5001")
+        self.session_manager.should_receive("open_session").never()
+        flexmock(requests).should_receive("request").with_args(
+            "POST", "http://127.0.0.1:5001/switches/patate/batch", params="", data=str, headers=dict
+        ).and_return(flexmock(content='[{"status_code": 201}]', status_code=200,
+                              headers={'Content-Type': 'application/json'})).once()
+
+        result, code = self.post("/switches/{}/batch".format(session_uuid), fixture="post_switch_hostname_batch.json")
+
+        assert_that(code, equal_to(200))
+        assert_that(result, equal_to([{"status_code": 201}]))
+
     def test_open_session_with_malformed_post_data(self):
         result, code = self.post("/switches-sessions/session_me_timbers", data={"bad_data": 666})
 
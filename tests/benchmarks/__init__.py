@@ -0,0 +1,60 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Micro-benchmarks, they are not collected by the test runner, run them one by one:
+
+    python -m tests.benchmarks.ssh_read_benchmark
+"""
+
+import os
+import time
+
+
+def measure(fn, repeat=5, setup=None):
+    """
+    Runs fn `repeat` times and returns the best (wall, cpu) seconds of a single run
+
+    When given, setup is called before each run, out of the measure, and returns the fn to run
+    """
+    best_wall = best_cpu = None
+    for _ in range(repeat):
+        if setup is not None:
+            fn = setup()
+        cpu_started_at = _cpu_time()
+        started_at = time.time()
+        fn()
+        wall = time.time() - started_at
+        cpu = _cpu_time() - cpu_started_at
+
+        best_wall = wall if best_wall is None else min(best_wall, wall)
+        best_cpu = cpu if best_cpu is None else min(best_cpu, cpu)
+    return best_wall, best_cpu
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(v)) for v in column) for column in zip(headers, *rows)]
+    line = "  ".join("{{:>{}}}".format(w) for w in widths)
+    print(line.format(*headers))
+    for row in rows:
+        print(line.format(*row))
+
+
+def ms(seconds):
+    return "{:.2f}ms".format(seconds * 1000)
+
+
+def _cpu_time():
+    user, system = os.times()[:2]
+    return user + system
@@ -0,0 +1,132 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares the CachedSwitch and SwitchCache reads sharing the cached objects with the former deep copy of them on
+every read, on a core switch of 4000 vlans
+
+    python -m tests.benchmarks.cached_switch_benchmark
+"""
+
+import copy
+
+from netaddr import IPAddress, IPNetwork
+
+from netman.adapters.switches.cached import CachedSwitch, SharedCachedSwitch, SwitchCache
+from netman.core.objects.switch_base import SwitchBase
+from netman.core.objects.switch_descriptor import SwitchDescriptor
+from netman.core.objects.vlan import Vlan
+from netman.core.objects.vrrp_group import VrrpGroup
+from tests.benchmarks import measure, print_table, ms
+
+VLANS = 4000
+CALLS = 20
+
+
+class CopyingCachedSwitch(CachedSwitch):
+    """
+    The reads as they were before sharing the cached objects
+    """
+
+    def get_vlan(self, number):
+        return copy.deepcopy(super(CopyingCachedSwitch, self).get_vlan(number))
+
+    def get_vlans(self):
+        return copy.deepcopy(super(CopyingCachedSwitch, self).get_vlans())
+
+
+class CopyingSwitchCache(SwitchCache):
+    """
+    The shared cache as it was before sharing the cached objects, copying them when kept and when read
+    """
+
+    def read(self, switch_descriptor, method_name, args, kwargs, max_age, read):
+        return copy.deepcopy(super(CopyingSwitchCache, self).read(
+            switch_descriptor, method_name, args, kwargs, max_age, lambda: copy.deepcopy(read())))
+
+
+class CoreSwitch(SwitchBase):
+    def __init__(self):
+        super(CoreSwitch, self).__init__(SwitchDescriptor(model="core", hostname="my.switch"))
+        self.vlans = [Vlan(number, "vlan{}".format(number),
+                           ips=[IPNetwork("10.{}.{}.1/24".format(number // 256, number % 256))],
+                           vrrp_groups=[VrrpGroup(id=1, ips=[IPAddress("10.{}.{}.2".format(number // 256, number % 256))],
+                                                  priority=100)],
+                           dhcp_relay_servers=[IPAddress("10.0.0.10")])
+                      for number in range(1, VLANS + 1)]
+
+    def get_vlans(self):
+        return self.vlans
+
+    def set_vlan_vrf(self, vlan_number, vrf_name):
+        pass
+
+
+def cached_switch(switch_class):
+    def build():
+        switch = switch_class(CoreSwitch())
+        switch.get_vlans()
+        return switch
+    return build
+
+
+def shared_cached_switch(cache_class):
+    def build():
+        switch = SharedCachedSwitch(CoreSwitch(), cache_class(ttls={"vlans": 300}), max_age=300)
+        switch.get_vlans()
+        return switch
+    return build
+
+
+def read_vlans(build):
+    def setup():
+        switch = build()
+
+        def run():
+            for _ in range(CALLS):
+                switch.get_vlans()
+        return run
+    return setup
+
+
+def write_and_read_a_vlan(build):
+    def setup():
+        switch = build()
+
+        def run():
+            for number in range(1, CALLS + 1):
+                switch.set_vlan_vrf(number, "MY_VRF")
+                switch.get_vlan(number)
+        return run
+    return setup
+
+
+def main():
+    rows = []
+    for name, scenario, copying, shared in [
+            ("CachedSwitch get_vlans", read_vlans, cached_switch(CopyingCachedSwitch), cached_switch(CachedSwitch)),
+            ("CachedSwitch set_vlan_vrf + get_vlan", write_and_read_a_vlan, cached_switch(CopyingCachedSwitch),
+             cached_switch(CachedSwitch)),
+            ("SwitchCache get_vlans", read_vlans, shared_cached_switch(CopyingSwitchCache),
+             shared_cached_switch(SwitchCache))]:
+        copy_wall, copy_cpu = measure(None, setup=scenario(copying))
+        shared_wall, shared_cpu = measure(None, setup=scenario(shared))
+        rows.append((name, ms(copy_wall / CALLS), ms(copy_cpu / CALLS), ms(shared_wall / CALLS),
+                     ms(shared_cpu / CALLS)))
+
+    print_table(("{} vlans".format(VLANS), "deep copy wall", "deep copy cpu", "shared wall", "shared cpu"), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares the footprint and the equality of 10k interfaces and vlans as slot models with the former models keeping
+their fields in a __dict__, the lists they hold being the same for both
+
+    python -m tests.benchmarks.model_memory_benchmark
+"""
+
+import sys
+
+from netman.core.objects.interface import Interface
+from netman.core.objects.vlan import Vlan
+from tests.benchmarks import measure, print_table, ms
+
+COUNT = 10000
+
+
+class DictModel(object):
+    """
+    The models as they were before declaring their fields in __slots__
+    """
+
+    def __init__(self, model):
+        self.__dict__.update(model.attributes())
+
+    def __eq__(self, other):
+        return isinstance(other, type(self)) and vars(self) == vars(other)
+
+
+def interfaces():
+    return [Interface("ge-0/0/{}".format(i), port_mode="trunk", trunk_vlans=[1000, 1001], trunk_native_vlan=999)
+            for i in range(COUNT)]
+
+
+def vlans():
+    return [Vlan(i, "vlan{}".format(i), vrf_forwarding="MY_VRF") for i in range(COUNT)]
+
+
+def footprint(models):
+    return sum(sys.getsizeof(model) + (sys.getsizeof(vars(model)) if hasattr(model, "__dict__") else 0)
+               for model in models)
+
+
+def compare(models, equal_models):
+    def run():
+        for model, other in zip(models, equal_models):
+            model == other
+    return run
+
+
+def kb(size):
+    return "{}KB".format(size // 1024)
+
+
+def main():
+    rows = []
+    for name, build in [("interfaces", interfaces), ("vlans", vlans)]:
+        slot_models, equal_slot_models = build(), build()
+        dict_models = [DictModel(model) for model in slot_models]
+        equal_dict_models = [DictModel(model) for model in equal_slot_models]
+        dict_wall, _ = measure(compare(dict_models, equal_dict_models))
+        slot_wall, _ = measure(compare(slot_models, equal_slot_models))
+        rows.append(("{}k {}".format(COUNT // 1000, name), kb(footprint(dict_models)), kb(footprint(slot_models)),
+                     ms(dict_wall), ms(slot_wall)))
+
+    print_table(("models", "__dict__ size", "__slots__ size", "__dict__ ==", "__slots__ =="), rows)
+
+
+if __name__ == '__main__':
+    main()
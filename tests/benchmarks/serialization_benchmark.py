@@ -0,0 +1,130 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures the serialization of the vlans and interfaces of a big switch, from the core objects to the api dicts
+and from the whole GET to its json body, on a switch answering instantly
+
+    python -m tests.benchmarks.serialization_benchmark
+"""
+
+import logging
+
+from flask import Flask
+from netaddr import IPAddress, IPNetwork
+
+from netman.api import api_utils
+from netman.api.objects import interface, vlan
+from netman.api.switch_api import SwitchApi
+from netman.core.objects.exceptions import UnknownSession
+from netman.core.objects.interface import Interface
+from netman.core.objects.port_modes import TRUNK
+from netman.core.objects.switch_base import SwitchBase
+from netman.core.objects.switch_descriptor import SwitchDescriptor
+from netman.core.objects.vlan import Vlan
+from netman.core.objects.vrrp_group import VrrpGroup
+from tests.benchmarks import measure, print_table, ms
+
+VLANS = 4000
+INTERFACES = 10000
+
+
+def core_vlans():
+    return [Vlan(number, "vlan{}".format(number),
+                 ips=[IPNetwork("10.{}.{}.1/24".format(number // 256, number % 256)),
+                      IPNetwork("172.16.{}.{}/30".format(number // 256, number % 256))],
+                 vrrp_groups=[VrrpGroup(id=1, ips=[IPAddress("10.{}.{}.2".format(number // 256, number % 256))],
+                                        priority=100)],
+                 dhcp_relay_servers=[IPAddress("10.0.0.10")])
+            for number in range(1, VLANS + 1)]
+
+
+def core_interfaces():
+    return [Interface("ge-{}/0/{}".format(i // 48, i % 48), port_mode=TRUNK, trunk_vlans=[1000, 1001, 1002],
+                      trunk_native_vlan=999)
+            for i in range(INTERFACES)]
+
+
+class BigSwitch(SwitchBase):
+    def __init__(self):
+        super(BigSwitch, self).__init__(SwitchDescriptor(model="big", hostname="my.switch"))
+        self.vlans = core_vlans()
+        self.interfaces = core_interfaces()
+
+    def _connect(self):
+        pass
+
+    def _disconnect(self):
+        pass
+
+    def get_vlans(self):
+        return self.vlans
+
+    def get_interfaces(self):
+        return self.interfaces
+
+
+class BigSwitchFactory(object):
+    def __init__(self):
+        self.switch = BigSwitch()
+
+    def get_switch(self, hostname):
+        return self.switch
+
+
+class NoSessionManager(object):
+    def get_switch_for_session(self, session_id):
+        raise UnknownSession(session_id)
+
+
+def to_api(serializer, core_objects):
+    def run():
+        [serializer(o) for o in core_objects]
+    return run
+
+
+def dumps(data):
+    def run():
+        api_utils.json_dumps(data)
+    return run
+
+
+def get(resource):
+    app = Flask(__name__)
+    SwitchApi(BigSwitchFactory(), NoSessionManager()).hook_to(app)
+
+    def run():
+        with app.test_client() as http_client:
+            http_client.get("/switches/my.switch/{}".format(resource)).data
+    return run
+
+
+def main():
+    logging.getLogger("netman").setLevel(logging.WARNING)
+
+    vlans, interfaces = core_vlans(), core_interfaces()
+    rows = []
+    for name, fn in [("{} vlan.to_api".format(VLANS), to_api(vlan.to_api, vlans)),
+                     ("{} interface.to_api".format(INTERFACES), to_api(interface.to_api, interfaces)),
+                     ("{} vlans json".format(VLANS), dumps([vlan.to_api(v) for v in vlans])),
+                     ("GET /vlans", get("vlans")),
+                     ("GET /interfaces", get("interfaces"))]:
+        wall, cpu = measure(fn)
+        rows.append((name, ms(wall), ms(cpu)))
+
+    print_table(("serialization", "wall", "cpu"), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares the session calls dispatched straight to the SwitchApi views with the former second request sent
+through the test client, on a switch answering instantly
+
+    python -m tests.benchmarks.session_dispatch_benchmark
+"""
+
+import logging
+
+from flask import Flask, request
+
+from netman.api.api_utils import to_response
+from netman.api.switch_api import SwitchApi
+from netman.api.switch_session_api import SwitchSessionApi
+from netman.api.validators import resource, Session, Resource
+from netman.core.objects.exceptions import UnknownSession
+from netman.core.objects.switch_base import SwitchBase
+from netman.core.objects.switch_descriptor import SwitchDescriptor
+from tests.benchmarks import measure, print_table, ms
+
+SESSION_ID = "benchmark"
+CALLS = 500
+
+
+class RelayingSwitchSessionApi(SwitchSessionApi):
+    """
+    The session calls as they were before being dispatched within the same request
+    """
+
+    @to_response
+    @resource(Session, Resource)
+    def on_session(self, session_id, resource_name):
+        self.sessions_manager.keep_alive(session_id)
+        with self.server.test_client() as http_client:
+            return http_client.open(
+                '/switches/{}/{}'.format(session_id, resource_name),
+                method=request.method,
+                headers={k: v for k, v in request.headers.items()},
+                data=request.data)
+
+
+class InstantSwitch(SwitchBase):
+    def get_vlans(self):
+        return []
+
+    def set_access_vlan(self, interface_id, vlan):
+        pass
+
+
+class SingleSessionManager(object):
+    def __init__(self, switch):
+        self.switch = switch
+
+    def get_switch_for_session(self, session_id):
+        if session_id != SESSION_ID:
+            raise UnknownSession(session_id)
+        return self.switch
+
+    def keep_alive(self, session_id):
+        pass
+
+    def get_session_owner(self, session_id):
+        return None
+
+
+def build_app(session_api_class):
+    app = Flask(__name__)
+    sessions_manager = SingleSessionManager(InstantSwitch(SwitchDescriptor(model="instant", hostname="my.switch")))
+    SwitchApi(None, sessions_manager).hook_to(app)
+    session_api_class(None, sessions_manager).hook_to(app)
+    return app
+
+
+def call_session(app, method, path, data=None):
+    def run():
+        with app.test_client() as http_client:
+            for _ in range(CALLS):
+                http_client.open("/switches-sessions/{}/{}".format(SESSION_ID, path), method=method, data=data,
+                                 headers={"Netman-Verbose-Errors": "yes", "Netman-Max-Version": "2"})
+    return run
+
+
+def main():
+    logging.getLogger("netman").setLevel(logging.WARNING)
+
+    rows = []
+    for method, path, data in [("GET", "vlans", None),
+                               ("PUT", "interfaces/ge-0/0/1/access-vlan", "1000")]:
+        relay_wall, relay_cpu = measure(call_session(build_app(RelayingSwitchSessionApi), method, path, data))
+        direct_wall, direct_cpu = measure(call_session(build_app(SwitchSessionApi), method, path, data))
+        rows.append(("{} {}".format(method, path),
+                     ms(relay_wall / CALLS), ms(relay_cpu / CALLS), ms(direct_wall / CALLS), ms(direct_cpu / CALLS)))
+
+    print_table(("session call", "relayed wall", "relayed cpu", "direct wall", "direct cpu"), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares the SshClient read loop with the former sleep polling one, on outputs of growing size
+trickling from a fake paramiko channel
+
+    python -m tests.benchmarks.ssh_read_benchmark
+"""
+
+import logging
+import time
+
+from mock import patch
+
+from netman.adapters.shell.ssh import SshClient
+from tests.adapters.shell.fake_channel import FakeChannel
+from tests.benchmarks import measure, print_table, ms
+
+PROMPT = "hostname#"
+CHUNK_SIZE = 9999
+CHUNK_DELAY = 0.0005
+
+
+class PollingSshClient(SshClient):
+    """
+    The read loop as it was before the SshClient blocked on the channel
+    """
+    reading_interval = 0.01
+    polling_full_log = ""
+
+    def _wait_for(self, wait_for):
+        self.current_buffer = ''
+
+        while not self.current_buffer.endswith(wait_for):
+            while not self.channel.recv_ready():
+                time.sleep(self.reading_interval)
+
+            read = self.channel.recv(self.reading_chunk_size)
+            self.logger.debug("[SSH][{}@{}:{}] Recv << {}".format(self.username, self.host, self.port, repr(read)))
+            self.polling_full_log += read
+            self.current_buffer += read
+
+
+def build_client(client_class):
+    with patch('netman.adapters.shell.ssh.paramiko.SSHClient'):
+        with patch.object(client_class, '_wait_for', lambda *_: None):
+            client = client_class("host.com", "user", "pass", reading_chunk_size=CHUNK_SIZE)
+    return client
+
+
+def read_output(client_class, size, delay):
+    client = build_client(client_class)
+    line = "interface Ethernet1/1\n switchport mode trunk\n!\n"
+    output = line * (size // len(line)) + PROMPT
+    client.channel = FakeChannel(delay=delay)
+    client.channel.answer(*[output[i:i + CHUNK_SIZE] for i in range(0, len(output), CHUNK_SIZE)])
+
+    return lambda: client._wait_for(PROMPT)
+
+
+def main():
+    logging.getLogger("netman").setLevel(logging.INFO)
+
+    rows = []
+    for size in [1 << 10, 100 << 10, 1 << 20, 5 << 20]:
+        for delay in [0, CHUNK_DELAY]:
+            polling_wall, polling_cpu = measure(None, repeat=3, setup=lambda: read_output(PollingSshClient, size, delay))
+            blocking_wall, blocking_cpu = measure(None, repeat=3, setup=lambda: read_output(SshClient, size, delay))
+            rows.append(("{}KB".format(size >> 10), ms(delay),
+                         ms(polling_wall), ms(polling_cpu), ms(blocking_wall), ms(blocking_cpu)))
+
+    print_table(("output", "chunk delay", "polling wall", "polling cpu", "blocking wall", "blocking cpu"), rows)
+
+
+if __name__ == '__main__':
+    main()
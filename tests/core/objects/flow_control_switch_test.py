@@ -11,15 +11,19 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import threading
+import time
 from unittest import TestCase
 
 from flexmock import flexmock, flexmock_teardown
 from hamcrest import assert_that, is_
 
+from netman.adapters.threading_lock_factory import ReadWriteLock
 from netman.core.objects.exceptions import NetmanException
 from netman.core.objects.flow_control_switch import FlowControlSwitch
 from netman.core.objects.switch_base import SwitchBase
 from netman.core.objects.switch_descriptor import SwitchDescriptor
+from netman.core.read_coalescer import ReadCoalescer
 
 
 class FlowControlSwitchTest(TestCase):
@@ -371,3 +375,130 @@ class FlowControlSwitchTest(TestCase):
 
     def test_switch_contract_compliance_switch_descriptor(self):
         assert_that(self.switch.switch_descriptor, is_(self.wrapped_switch.switch_descriptor))
+
+
+class FlowControlSwitchWithReadWriteLockTest(TestCase):
+
+    def setUp(self):
+        self.lock = ReadWriteLock()
+        self.logins = []
+
+    def test_parallel_identical_reads_log_in_once(self):
+        read_coalescer = ReadCoalescer()
+        read = ReadGate()
+
+        results = self._poll_interfaces_in_parallel(read_coalescer, read)
+
+        assert_that(results, is_([["ge-0/0/1"]] * 5))
+        assert_that(len(self.logins), is_(1))
+        assert_that(read_coalescer.coalesced, is_(4))
+
+    def test_reads_of_operations_not_coalesced_are_all_sent(self):
+        results = self._poll_interfaces_in_parallel(ReadCoalescer(operations=["get_vlans"]))
+
+        assert_that(results, is_([["ge-0/0/1"]] * 5))
+        assert_that(len(self.logins), is_(5))
+
+    def test_a_read_does_not_see_a_write_in_progress(self):
+        events = []
+        writer_switch = FlowControlSwitch(CountingSwitch(self.logins, events), self.lock)
+        reader_switch = FlowControlSwitch(CountingSwitch(self.logins, events), self.lock)
+
+        writer = threading.Thread(target=writer_switch.add_vlan, args=(1000,))
+        writer.start()
+        time.sleep(0.01)
+        reader_switch.get_interfaces()
+        writer.join(1)
+
+        assert_that(events, is_(["add_vlan started", "add_vlan done", "get_interfaces"]))
+
+    def test_reads_within_a_transaction_do_not_wait_for_the_lock(self):
+        switch = FlowControlSwitch(CountingSwitch(self.logins), self.lock)
+
+        with switch.transaction():
+            assert_that(switch.get_interfaces(), is_(["ge-0/0/1"]))
+
+        assert_that(len(self.logins), is_(1))
+
+    def _poll_interfaces_in_parallel(self, read_coalescer, read=None):
+        results = []
+
+        def poll_interfaces():
+            switch = FlowControlSwitch(CountingSwitch(self.logins, read=read), self.lock,
+                                       read_coalescer=read_coalescer)
+            switch.connect()
+            try:
+                results.append(switch.get_interfaces())
+            finally:
+                switch.disconnect()
+
+        threads = [threading.Thread(target=poll_interfaces) for _ in range(5)]
+        if read is None:
+            for thread in threads:
+                thread.start()
+        else:
+            threads[0].start()
+            assert_that(read.started.wait(1), is_(True))
+            for thread in threads[1:]:
+                thread.start()
+            _wait_until(lambda: read_coalescer.coalesced == len(threads) - 1)
+            read.release.set()
+
+        for thread in threads:
+            thread.join(1)
+
+        return results
+
+
+def _wait_until(condition, timeout=1):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("Condition not met within {}s".format(timeout))
+        time.sleep(0.001)
+
+
+class ReadGate(object):
+    """
+    Holds the reads of a switch until released, started tells one of them is running
+    """
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+
+class CountingSwitch(SwitchBase):
+    def __init__(self, logins, events=None, read=None):
+        super(CountingSwitch, self).__init__(SwitchDescriptor("cisco", "name"))
+        self.logins = logins
+        self.events = events if events is not None else []
+        self.read = read
+
+    def _connect(self):
+        self.logins.append(1)
+
+    def _disconnect(self):
+        pass
+
+    def _start_transaction(self):
+        pass
+
+    def _end_transaction(self):
+        pass
+
+    def commit_transaction(self):
+        pass
+
+    def get_interfaces(self):
+        if self.read is None:
+            time.sleep(0.02)
+        else:
+            self.read.started.set()
+            self.read.release.wait(1)
+        self.events.append("get_interfaces")
+        return ["ge-0/0/1"]
+
+    def add_vlan(self, number, name=None):
+        self.events.append("add_vlan started")
+        time.sleep(0.05)
+        self.events.append("add_vlan done")
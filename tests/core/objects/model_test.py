@@ -0,0 +1,57 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import unittest
+
+from hamcrest import assert_that, is_, is_not, has_entries
+from netaddr import IPNetwork
+
+from netman.core.objects.access_groups import IN
+from netman.core.objects.bond import Bond
+from netman.core.objects.interface import Interface
+from netman.core.objects.switch_descriptor import SwitchDescriptor
+from netman.core.objects.vlan import Vlan
+
+
+class ModelTest(unittest.TestCase):
+    def test_models_have_no_instance_dict(self):
+        for model in [Vlan(1000), Interface("ge-0/0/1"), Bond(1)]:
+            assert_that(hasattr(model, "__dict__"), is_(False))
+
+    def test_models_are_compared_field_by_field(self):
+        assert_that(Vlan(1000, ips=[IPNetwork("1.1.1.1/24")]), is_(Vlan(1000, ips=[IPNetwork("1.1.1.1/24")])))
+        assert_that(Vlan(1000, access_group_in="ACL"), is_not(Vlan(1000)))
+        assert_that(Interface("ge-0/0/1") != Interface("ge-0/0/1"), is_(False))
+        assert_that(Interface("ge-0/0/1"), is_not(Bond()))
+
+    def test_equal_models_have_the_same_hash(self):
+        assert_that(hash(Bond(1, members=["ge-0/0/1"])), is_(hash(Bond(1, members=["ge-0/0/1"]))))
+        assert_that(len({Vlan(1000, access_group_in="ACL"), Vlan(1000, access_group_in="ACL"), Vlan(2000)}), is_(2))
+
+    def test_attributes(self):
+        assert_that(Interface("ge-0/0/1", trunk_vlans=[1000]).attributes(),
+                    has_entries(name="ge-0/0/1", trunk_vlans=[1000], bond_master=None))
+
+    def test_copies_keep_every_field(self):
+        vlan = Vlan(1000, access_group_in="ACL")
+
+        copied = copy.copy(vlan)
+
+        assert_that(copied, is_(vlan))
+        assert_that(copied.access_groups[IN], is_("ACL"))
+
+    def test_the_attributes_of_models_without_slots_are_compared(self):
+        assert_that(SwitchDescriptor("cisco", "my.switch"), is_(SwitchDescriptor("cisco", "my.switch")))
+        assert_that(SwitchDescriptor("cisco", "my.switch"), is_not(SwitchDescriptor("cisco", "other.switch")))
@@ -0,0 +1,97 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+import unittest
+
+from hamcrest import assert_that, is_
+
+from netman.core.objects.exceptions import NetmanException
+from netman.core.read_coalescer import ReadCoalescer
+
+
+class ReadCoalescerTest(unittest.TestCase):
+    def setUp(self):
+        self.coalescer = ReadCoalescer()
+
+    def test_identical_reads_at_the_same_time_are_run_once(self):
+        reads = []
+
+        def slow_read():
+            reads.append(1)
+            time.sleep(0.05)
+            return "vlans"
+
+        results = []
+        self._in_parallel(lambda: results.append(self.coalescer.read("get_vlans", slow_read)), 5)
+
+        assert_that(len(reads), is_(1))
+        assert_that(results, is_(["vlans"] * 5))
+        assert_that(self.coalescer.coalesced, is_(4))
+
+        self.coalescer.read("get_vlans", slow_read)
+        assert_that(len(reads), is_(2))
+
+    def test_different_reads_are_not_coalesced(self):
+        reads = []
+
+        def slow_read(key):
+            reads.append(key)
+            time.sleep(0.05)
+
+        def read(key):
+            self.coalescer.read(key, lambda: slow_read(key))
+
+        threads = [threading.Thread(target=read, args=(key,)) for key in ["get_vlans", "get_interfaces"]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(1)
+
+        assert_that(sorted(reads), is_(["get_interfaces", "get_vlans"]))
+        assert_that(self.coalescer.coalesced, is_(0))
+
+    def test_the_error_of_a_read_is_raised_to_every_caller(self):
+        def failing_read():
+            time.sleep(0.05)
+            raise NetmanException("boom")
+
+        errors = []
+
+        def read():
+            try:
+                self.coalescer.read("get_vlans", failing_read)
+            except NetmanException as e:
+                errors.append(str(e))
+
+        self._in_parallel(read, 3)
+
+        assert_that(errors, is_(["boom"] * 3))
+
+    def test_every_operation_is_coalesced_by_default(self):
+        assert_that(self.coalescer.coalesces("get_vlans"), is_(True))
+
+    def test_only_the_given_operations_are_coalesced(self):
+        coalescer = ReadCoalescer(operations=["get_vlans"])
+
+        assert_that(coalescer.coalesces("get_vlans"), is_(True))
+        assert_that(coalescer.coalesces("get_interfaces"), is_(False))
+
+    def _in_parallel(self, target, count):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(1)
@@ -12,10 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import shutil
+import stat
+import subprocess
+import tempfile
 from unittest import TestCase
-from hamcrest import assert_that, is_, none
+from hamcrest import assert_that, is_, none, is_not, contains_string
 from netman.adapters.memory_session_storage import MemorySessionStorage
+from netman.adapters.sqlite_session_storage import SqliteSessionStorage
 from netman.core.objects.exceptions import SessionAlreadyExists, UnknownSession
+from netman.core.objects.switch_descriptor import SwitchDescriptor
 import mock
 
 
@@ -50,3 +57,98 @@ class SessionStorageTest(TestCase):
         self.session_source.add('other_session', self.switch_descriptor)
         with self.assertRaises(UnknownSession):
             self.session_source.remove('some_session')
+
+
+class SqliteSessionStorageTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "sessions.db")
+        self.session_source = SqliteSessionStorage(self.path, owner="http://127.0.0.1:5001")
+        self.switch_descriptor = SwitchDescriptor(model="cisco", hostname="my.switch", username="user",
+                                                  password="pass", port=22)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_add_session(self):
+        self.session_source.add('some_session', self.switch_descriptor)
+        assert_that(self.session_source.get('some_session'),
+                    is_(SwitchDescriptor(model="cisco", hostname="my.switch", port=22)))
+        assert_that(self.session_source.get_owner('some_session'), is_("http://127.0.0.1:5001"))
+
+    def test_the_credentials_are_not_stored(self):
+        self.session_source.add('some_session', self.switch_descriptor)
+
+        with open(self.path, "rb") as f:
+            content = f.read()
+
+        assert_that(content, contains_string('"hostname": "my.switch"'))
+        assert_that(content, is_not(contains_string('"username"')))
+        assert_that(content, is_not(contains_string('"password"')))
+
+    def test_sessions_are_shared_with_the_other_processes_using_the_same_file(self):
+        other_process_source = SqliteSessionStorage(self.path, owner="http://127.0.0.1:5002")
+
+        self.session_source.add('some_session', self.switch_descriptor)
+
+        assert_that(other_process_source.get('some_session'),
+                    is_(SwitchDescriptor(model="cisco", hostname="my.switch", port=22)))
+        assert_that(other_process_source.get_owner('some_session'), is_("http://127.0.0.1:5001"))
+        with self.assertRaises(SessionAlreadyExists):
+            other_process_source.add('some_session', self.switch_descriptor)
+
+        other_process_source.remove('some_session')
+
+        assert_that(self.session_source.get('some_session'), is_(none()))
+
+    def test_get_nonexistent_session_is_none(self):
+        assert_that(self.session_source.get('nonexistent_session'), is_(none()))
+        assert_that(self.session_source.get_owner('nonexistent_session'), is_(none()))
+
+    def test_remove_nonexistent_session_fails(self):
+        self.session_source.add('other_session', self.switch_descriptor)
+        with self.assertRaises(UnknownSession):
+            self.session_source.remove('some_session')
+
+    def test_the_owner_can_be_given_when_the_first_session_is_added(self):
+        owner = mock.Mock(return_value="http://127.0.0.1:5003")
+        lazy_source = SqliteSessionStorage(self.path, owner=owner)
+
+        assert_that(owner.called, is_(False))
+
+        lazy_source.add('some_session', self.switch_descriptor)
+
+        assert_that(lazy_source.get_owner('some_session'), is_("http://127.0.0.1:5003"))
+
+    def test_the_sessions_of_a_process_that_is_gone_are_not_found(self):
+        with mock.patch("netman.adapters.sqlite_session_storage.os.getpid", return_value=_gone_pid()):
+            self.session_source.add('some_session', self.switch_descriptor)
+
+        assert_that(self.session_source.get_owner('some_session'), is_(none()))
+        assert_that(self.session_source.get('some_session'), is_(none()))
+
+    def test_the_sessions_of_a_process_that_is_gone_are_removed_when_the_storage_is_created(self):
+        with mock.patch("netman.adapters.sqlite_session_storage.os.getpid", return_value=_gone_pid()):
+            self.session_source.add('some_session', self.switch_descriptor)
+
+        SqliteSessionStorage(self.path, owner="http://127.0.0.1:5002")
+
+        with mock.patch("netman.adapters.sqlite_session_storage._is_running", return_value=True):
+            assert_that(self.session_source.get('some_session'), is_(none()))
+
+    def test_the_session_id_of_a_process_that_is_gone_can_be_reused(self):
+        with mock.patch("netman.adapters.sqlite_session_storage.os.getpid", return_value=_gone_pid()):
+            self.session_source.add('some_session', self.switch_descriptor)
+
+        self.session_source.add('some_session', self.switch_descriptor)
+
+        assert_that(self.session_source.get_owner('some_session'), is_("http://127.0.0.1:5001"))
+
+    def test_the_file_is_only_readable_by_its_owner(self):
+        assert_that(stat.S_IMODE(os.stat(self.path).st_mode), is_(0o600))
+
+
+def _gone_pid():
+    process = subprocess.Popen(["true"])
+    process.wait()
+    return process.pid
@@ -12,18 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
+import time
 import unittest
 
-from hamcrest import assert_that, instance_of, is_, is_not
+from hamcrest import assert_that, instance_of, is_, is_not, equal_to
 import mock
 from netman.core.objects.flow_control_switch import FlowControlSwitch
 
 from netman.core import switch_factory
 
 from netman.core.objects.switch_base import SwitchBase
+from netman.adapters.switches.cached import SharedCachedSwitch, SwitchCache
 from netman.adapters.switches.remote import RemoteSwitch
 from netman.core.objects.switch_descriptor import SwitchDescriptor
 from netman.core.switch_factory import SwitchFactory
+from netman.core.switch_pool import SwitchConnectionPool, PooledSwitch
+from netman.core.read_coalescer import ReadCoalescer
 
 
 class SwitchFactoryTest(unittest.TestCase):
@@ -95,6 +100,73 @@ class SwitchFactoryTest(unittest.TestCase):
         assert_that(switch.wrapped_switch.switch_descriptor,
                     is_(SwitchDescriptor(model='test_model', hostname='hostname')))
 
+    def test_switches_are_pooled_when_a_connection_pool_is_given(self):
+        pool = SwitchConnectionPool()
+        self.factory.connection_pool = pool
+        self.semaphore_mocks['hostname'] = mock.Mock()
+
+        switch = self.factory.get_switch_by_descriptor(SwitchDescriptor(model='test_model', hostname='hostname'))
+
+        assert_that(switch, is_(instance_of(FlowControlSwitch)))
+        assert_that(switch.wrapped_switch, is_(instance_of(PooledSwitch)))
+        assert_that(switch.wrapped_switch.pool, is_(pool))
+        assert_that(switch.wrapped_switch.switch_builder, equal_to(_FakeSwitch))
+
+    def test_remote_switches_are_never_pooled(self):
+        self.factory.connection_pool = SwitchConnectionPool()
+        self.semaphore_mocks['hostname'] = mock.Mock()
+
+        switch = self.factory.get_switch_by_descriptor(SwitchDescriptor(model='test_model', hostname='hostname',
+                                                                        netman_server='https://netman.url.example.org:4443'))
+
+        assert_that(switch.wrapped_switch, is_(instance_of(RemoteSwitch)))
+
+    def test_switches_share_the_read_coalescer_given(self):
+        coalescer = ReadCoalescer()
+        self.factory.read_coalescer = coalescer
+        self.semaphore_mocks['hostname'] = mock.Mock()
+
+        switch = self.factory.get_switch_by_descriptor(SwitchDescriptor(model='test_model', hostname='hostname'))
+
+        assert_that(switch.read_coalescer, is_(coalescer))
+
+    def test_switches_share_the_switch_cache_given(self):
+        cache = SwitchCache(ttls={"vlans": 30})
+        self.factory.switch_cache = cache
+        self.semaphore_mocks['hostname'] = mock.Mock()
+
+        switch = self.factory.get_switch_by_descriptor(SwitchDescriptor(model='test_model', hostname='hostname'))
+
+        assert_that(switch, is_(instance_of(SharedCachedSwitch)))
+        assert_that(switch.switch_cache, is_(cache))
+        assert_that(switch.wrapped_switch, is_(instance_of(FlowControlSwitch)))
+
+    def test_remote_switches_are_never_cached(self):
+        self.factory.switch_cache = SwitchCache(ttls={"vlans": 30})
+        self.semaphore_mocks['hostname'] = mock.Mock()
+
+        switch = self.factory.get_switch_by_descriptor(SwitchDescriptor(model='test_model', hostname='hostname',
+                                                                        netman_server='https://netman.url.example.org:4443'))
+
+        assert_that(switch, is_(instance_of(FlowControlSwitch)))
+
+    def test_concurrent_get_connections_on_the_same_switch_create_a_single_semaphore(self):
+        self.factory.lock_factory = SlowLockFactory(self.semaphore_mocks)
+        self.semaphore_mocks['hostname'] = mock.Mock()
+        switches = []
+
+        def get_switch():
+            switches.append(self.factory.get_anonymous_switch(hostname='hostname', model='test_model'))
+
+        threads = [threading.Thread(target=get_switch) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert_that(len(switches), is_(20))
+        assert_that(set(switch.lock for switch in switches), is_({self.factory.locks['hostname']}))
+
 
 class MockLockFactory(object):
 
@@ -105,5 +177,12 @@ class MockLockFactory(object):
         return self.mock_dict.pop(name)
 
 
+class SlowLockFactory(MockLockFactory):
+
+    def new_lock(self, name, timeout=0):
+        time.sleep(0.01)
+        return super(SlowLockFactory, self).new_lock(name, timeout)
+
+
 class _FakeSwitch(SwitchBase):
     pass
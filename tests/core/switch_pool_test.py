@@ -0,0 +1,313 @@
+# Copyright 2015 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest
+
+import mock
+from flexmock import flexmock, flexmock_teardown
+from hamcrest import assert_that, is_, is_not, none
+
+from netman.core.objects.exceptions import NetmanException, UnknownVlan
+from netman.core.objects.switch_base import SwitchBase
+from netman.core.objects.switch_descriptor import SwitchDescriptor
+from netman.core.switch_pool import SwitchConnectionPool, PooledSwitch
+
+
+class SwitchConnectionPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = SwitchConnectionPool(max_connections_per_host=2, idle_timeout=30)
+        self.built_switches = []
+
+    def tearDown(self):
+        flexmock_teardown()
+        self.pool.close()
+
+    def test_acquire_builds_and_connects_a_new_switch_when_nothing_is_idle(self):
+        switch = self.pool.acquire(SwitchDescriptor("cisco", "hostname"), self.builder)
+
+        assert_that(switch, is_(self.built_switches[0]))
+        assert_that(switch.connected, is_(True))
+
+    def test_a_released_switch_is_reused_without_reconnecting(self):
+        descriptor = SwitchDescriptor("cisco", "hostname")
+        switch = self.pool.acquire(descriptor, self.builder)
+        self.pool.release(switch)
+
+        switch.should_receive("_connect").never()
+        switch.should_receive("_disconnect").never()
+
+        assert_that(self.pool.acquire(descriptor, self.builder), is_(switch))
+        assert_that(len(self.built_switches), is_(1))
+
+    def test_switches_are_not_shared_between_hosts(self):
+        switch = self.pool.acquire(SwitchDescriptor("cisco", "hostname1"), self.builder)
+        self.pool.release(switch)
+
+        other = self.pool.acquire(SwitchDescriptor("cisco", "hostname2"), self.builder)
+
+        assert_that(other, is_not(switch))
+
+    def test_switches_are_not_shared_between_credentials(self):
+        switch = self.pool.acquire(SwitchDescriptor("cisco", "hostname", username="a"), self.builder)
+        self.pool.release(switch)
+
+        other = self.pool.acquire(SwitchDescriptor("cisco", "hostname", username="b"), self.builder)
+
+        assert_that(other, is_not(switch))
+
+    @mock.patch("netman.core.switch_pool.time")
+    def test_an_expired_idle_switch_is_disconnected_instead_of_reused(self, time_mock):
+        descriptor = SwitchDescriptor("cisco", "hostname")
+        time_mock.time.return_value = 1000
+        switch = self.pool.acquire(descriptor, self.builder)
+        self.pool.release(switch)
+
+        switch.should_receive("_disconnect").once()
+
+        time_mock.time.return_value = 1031
+        other = self.pool.acquire(descriptor, self.builder)
+
+        assert_that(other, is_not(switch))
+        assert_that(switch.connected, is_(False))
+
+    def test_an_idle_switch_failing_the_liveness_probe_is_discarded(self):
+        self.pool.liveness_probe = lambda s: False
+        descriptor = SwitchDescriptor("cisco", "hostname")
+        switch = self.pool.acquire(descriptor, self.builder)
+        self.pool.release(switch)
+
+        switch.should_receive("_disconnect").once()
+
+        assert_that(self.pool.acquire(descriptor, self.builder), is_not(switch))
+
+    def test_an_idle_switch_raising_in_the_liveness_probe_is_discarded(self):
+        self.pool.liveness_probe = _raising_probe
+        descriptor = SwitchDescriptor("cisco", "hostname")
+        switch = self.pool.acquire(descriptor, self.builder)
+        self.pool.release(switch)
+
+        switch.should_receive("_disconnect").once()
+
+        assert_that(self.pool.acquire(descriptor, self.builder), is_not(switch))
+
+    def test_an_idle_switch_whose_session_was_dropped_is_discarded(self):
+        descriptor = SwitchDescriptor("cisco", "hostname")
+        switch = self.pool.acquire(descriptor, self.builder)
+        switch.ssh = flexmock(is_alive=lambda: False)
+        self.pool.release(switch)
+
+        switch.should_receive("_disconnect").once()
+
+        assert_that(self.pool.acquire(descriptor, self.builder), is_not(switch))
+
+    def test_an_idle_switch_whose_netconf_session_was_dropped_is_discarded(self):
+        descriptor = SwitchDescriptor("juniper", "hostname")
+        switch = self.pool.acquire(descriptor, self.builder)
+        switch.netconf = flexmock(connected=False)
+        self.pool.release(switch)
+
+        switch.should_receive("_disconnect").once()
+
+        assert_that(self.pool.acquire(descriptor, self.builder), is_not(switch))
+
+    def test_an_idle_switch_with_a_live_session_is_reused(self):
+        descriptor = SwitchDescriptor("dell", "hostname")
+        switch = self.pool.acquire(descriptor, self.builder)
+        switch.shell = flexmock(is_alive=lambda: True)
+        self.pool.release(switch)
+
+        assert_that(self.pool.acquire(descriptor, self.builder), is_(switch))
+
+    def test_no_more_than_max_connections_per_host_are_kept(self):
+        descriptor = SwitchDescriptor("cisco", "hostname")
+        switches = [self.pool.acquire(descriptor, self.builder) for _ in range(3)]
+
+        switches[0].should_receive("_disconnect").never()
+        switches[1].should_receive("_disconnect").never()
+        switches[2].should_receive("_disconnect").once()
+
+        for switch in switches:
+            self.pool.release(switch)
+
+    def test_a_switch_released_as_not_reusable_is_disconnected(self):
+        switch = self.pool.acquire(SwitchDescriptor("cisco", "hostname"), self.builder)
+
+        switch.should_receive("_disconnect").once()
+
+        self.pool.release(switch, reusable=False)
+
+    def test_a_switch_released_in_transaction_is_disconnected(self):
+        switch = self.pool.acquire(SwitchDescriptor("cisco", "hostname"), self.builder)
+        switch.in_transaction = True
+
+        switch.should_receive("_disconnect").once()
+
+        self.pool.release(switch)
+
+    def test_a_failing_disconnect_does_not_propagate(self):
+        switch = self.pool.acquire(SwitchDescriptor("cisco", "hostname"), self.builder)
+
+        switch.should_receive("_disconnect").once().and_raise(EOFError)
+
+        self.pool.release(switch, reusable=False)
+
+    @mock.patch("netman.core.switch_pool.time")
+    def test_evict_idle_disconnects_only_expired_switches(self, time_mock):
+        time_mock.time.return_value = 1000
+        old = self.pool.acquire(SwitchDescriptor("cisco", "hostname1"), self.builder)
+        self.pool.release(old)
+
+        time_mock.time.return_value = 1020
+        recent = self.pool.acquire(SwitchDescriptor("cisco", "hostname2"), self.builder)
+        self.pool.release(recent)
+
+        old.should_receive("_disconnect").once()
+        recent.should_receive("_disconnect").never()
+
+        time_mock.time.return_value = 1040
+        self.pool.evict_idle()
+
+        assert_that(self.pool.acquire(SwitchDescriptor("cisco", "hostname2"), self.builder), is_(recent))
+
+    def test_idle_switches_are_disconnected_once_expired_without_being_acquired_again(self):
+        self.pool.idle_timeout = 0.05
+        switch1 = self.pool.acquire(SwitchDescriptor("cisco", "hostname1"), self.builder)
+        switch2 = self.pool.acquire(SwitchDescriptor("cisco", "hostname2"), self.builder)
+
+        self.pool.release(switch1)
+        time.sleep(0.03)
+        self.pool.release(switch2)
+
+        _wait_until(lambda: not switch1.connected)
+        assert_that(switch2.connected, is_(True))
+
+        _wait_until(lambda: not switch2.connected)
+
+    def test_the_reaper_stops_with_the_pool(self):
+        self.pool.release(self.pool.acquire(SwitchDescriptor("cisco", "hostname"), self.builder))
+        reaper = self.pool._reaper
+
+        self.pool.close()
+        reaper.join(1)
+
+        assert_that(reaper.is_alive(), is_(False))
+
+    def test_close_disconnects_every_idle_switch(self):
+        switch1 = self.pool.acquire(SwitchDescriptor("cisco", "hostname1"), self.builder)
+        switch2 = self.pool.acquire(SwitchDescriptor("cisco", "hostname2"), self.builder)
+        self.pool.release(switch1)
+        self.pool.release(switch2)
+
+        switch1.should_receive("_disconnect").once()
+        switch2.should_receive("_disconnect").once()
+
+        self.pool.close()
+
+        assert_that(self.pool.idle, is_({}))
+
+    def builder(self, switch_descriptor):
+        switch = flexmock(SwitchBase(switch_descriptor))
+        switch.should_receive("_connect")
+        switch.should_receive("_disconnect")
+        self.built_switches.append(switch)
+        return switch
+
+
+def _raising_probe(switch):
+    raise EOFError()
+
+
+def _wait_until(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("Condition not met within {} seconds".format(timeout))
+        time.sleep(0.005)
+
+
+class PooledSwitchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.descriptor = SwitchDescriptor("cisco", "hostname")
+        self.pool = flexmock(SwitchConnectionPool())
+        self.leased_switch = flexmock(SwitchBase(self.descriptor))
+        self.switch = PooledSwitch(self.pool, self.descriptor, lambda d: self.leased_switch)
+
+    def tearDown(self):
+        flexmock_teardown()
+
+    def test_connect_leases_a_switch_from_the_pool(self):
+        self.pool.should_receive("acquire").with_args(self.descriptor, object).once().and_return(self.leased_switch)
+
+        self.switch.connect()
+
+        assert_that(self.switch.connected, is_(True))
+        assert_that(self.switch.leased_switch, is_(self.leased_switch))
+
+    def test_disconnect_gives_back_the_switch_to_the_pool(self):
+        self.pool.should_receive("acquire").and_return(self.leased_switch)
+        self.pool.should_receive("release").with_args(self.leased_switch, reusable=True).once()
+
+        self.switch.connect()
+        self.switch.disconnect()
+
+        assert_that(self.switch.connected, is_(False))
+        assert_that(self.switch.leased_switch, is_(none()))
+
+    def test_disconnect_without_a_leased_switch_does_nothing(self):
+        self.pool.should_receive("release").never()
+
+        self.switch.disconnect()
+
+        assert_that(self.switch.connected, is_(False))
+
+    def test_operations_are_forwarded_to_the_leased_switch(self):
+        self.pool.should_receive("acquire").and_return(self.leased_switch)
+        self.leased_switch.should_receive("get_vlan").with_args(1000).once().and_return("a vlan")
+
+        self.switch.connect()
+
+        assert_that(self.switch.get_vlan(1000), is_("a vlan"))
+
+    def test_in_transaction_reflects_the_leased_switch(self):
+        self.pool.should_receive("acquire").and_return(self.leased_switch)
+
+        assert_that(self.switch.in_transaction, is_(False))
+
+        self.switch.connect()
+        self.leased_switch.in_transaction = True
+
+        assert_that(self.switch.in_transaction, is_(True))
+
+    def test_a_netman_error_keeps_the_leased_switch_reusable(self):
+        self.pool.should_receive("acquire").and_return(self.leased_switch)
+        self.leased_switch.should_receive("get_vlan").and_raise(UnknownVlan(1000))
+        self.pool.should_receive("release").with_args(self.leased_switch, reusable=True).once()
+
+        self.switch.connect()
+        with self.assertRaises(NetmanException):
+            self.switch.get_vlan(1000)
+        self.switch.disconnect()
+
+    def test_an_unexpected_error_discards_the_leased_switch(self):
+        self.pool.should_receive("acquire").and_return(self.leased_switch)
+        self.leased_switch.should_receive("get_vlan").and_raise(EOFError)
+        self.pool.should_receive("release").with_args(self.leased_switch, reusable=False).once()
+
+        self.switch.connect()
+        with self.assertRaises(EOFError):
+            self.switch.get_vlan(1000)
+        self.switch.disconnect()
@@ -13,13 +13,14 @@
 # limitations under the License.
 
 from unittest import TestCase
+import threading
 import time
 
 from flexmock import flexmock
 from hamcrest import assert_that, is_
 from mock import Mock
 from netman.core.objects.exceptions import UnknownResource, \
-    NetmanException, SessionAlreadyExists
+    NetmanException, SessionAlreadyExists, UnknownSession
 from netman.core.objects.switch_descriptor import SwitchDescriptor
 from netman.core.switch_sessions import SwitchSessionManager
 
@@ -31,8 +32,9 @@ class SwitchSessionManagerTest(TestCase):
         self.session_manager = SwitchSessionManager()
 
     def tearDown(self):
-        for timer in self.session_manager.timers.values():
-            timer.cancel()
+        self.session_manager.stop()
+        if self.session_manager._reaper is not None:
+            self.session_manager._reaper.join(1)
 
     def test_open_session_generates_with_passed_session_id(self):
         self.session_manager.session_storage = flexmock()
@@ -129,6 +131,105 @@ class SwitchSessionManagerTest(TestCase):
         with self.assertRaises(UnknownResource):
             self.session_manager.get_switch_for_session('patate')
 
+    def test_keep_alive_does_not_start_a_thread(self):
+        switch_mock = Mock()
+        self.session_manager.open_session(switch_mock, 'patate')
+        threads = threading.active_count()
+
+        for _ in range(100):
+            self.session_manager.keep_alive('patate')
+
+        assert_that(threading.active_count(), is_(threads))
+
+    def test_a_single_thread_expires_every_session(self):
+        self.session_manager.session_inactivity_timeout = 0.01
+        threads = threading.active_count()
+
+        for session_id in ['patate', 'poisson', 'frite']:
+            self.session_manager.open_session(Mock(), session_id)
+
+        assert_that(threading.active_count(), is_(threads + 1))
+        assert_that(self.session_manager.metrics(), is_({"active": 3, "expired": 0}))
+
+        time.sleep(0.05)
+
+        assert_that(self.session_manager.metrics(), is_({"active": 0, "expired": 3}))
+
+    def test_closed_sessions_are_not_counted_as_expired(self):
+        self.session_manager.session_inactivity_timeout = 0.01
+        switch_mock = Mock()
+
+        self.session_manager.open_session(switch_mock, 'patate')
+        self.session_manager.close_session('patate')
+
+        time.sleep(0.03)
+
+        assert_that(switch_mock.disconnect.call_count, is_(1))
+        assert_that(self.session_manager.metrics(), is_({"active": 0, "expired": 0}))
+
+    def test_keep_alive_of_an_unknown_session(self):
+        with self.assertRaises(UnknownResource):
+            self.session_manager.keep_alive('patate')
+
+    def test_concurrent_open_keep_alive_and_close_keep_the_sessions_consistent(self):
+        switches = {session_id: CountingSwitch() for session_id in ["session-{}".format(i) for i in range(20)]}
+        errors = []
+
+        def hammer(seed):
+            for i in range(200):
+                session_id = "session-{}".format((seed + i) % len(switches))
+                try:
+                    action = (seed * i) % 3
+                    if action == 0:
+                        self.session_manager.open_session(switches[session_id], session_id)
+                    elif action == 1:
+                        self.session_manager.keep_alive(session_id)
+                    else:
+                        self.session_manager.close_session(session_id)
+                except (SessionAlreadyExists, UnknownSession):
+                    pass
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=hammer, args=(seed,)) for seed in range(1, 17)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for session_id in list(self.session_manager.sessions):
+            self.session_manager.close_session(session_id)
+
+        assert_that(errors, is_([]))
+        assert_that(self.session_manager.sessions, is_({}))
+        assert_that(self.session_manager.deadlines, is_({}))
+        for switch in switches.values():
+            assert_that(switch.disconnections, is_(switch.connections))
+
+    def test_open_session_already_held_by_another_process(self):
+        self.session_manager.session_storage = flexmock()
+        self.session_manager.session_storage.should_receive('add').with_args(
+            'patate', self.switch_mock.switch_descriptor
+        ).and_raise(SessionAlreadyExists('patate'))
+        self.switch_mock.should_receive('connect').never()
+
+        with self.assertRaises(SessionAlreadyExists):
+            self.session_manager.open_session(self.switch_mock, 'patate')
+
+        assert_that(self.session_manager.sessions, is_({}))
+
+    def test_session_owner_is_asked_to_the_storage_for_sessions_held_elsewhere(self):
+        self.session_manager.session_storage = flexmock()
+        self.session_manager.session_storage.should_receive('add')
+        self.session_manager.session_storage.should_receive('get_owner').with_args('poisson') \
+            .and_return("http://127.0.0.1:5001")
+        self.switch_mock.should_receive('connect').once()
+
+        self.session_manager.open_session(self.switch_mock, 'patate')
+
+        assert_that(self.session_manager.get_session_owner('patate'), is_(None))
+        assert_that(self.session_manager.get_session_owner('poisson'), is_("http://127.0.0.1:5001"))
+
     def test_commit_transaction(self):
         self.session_manager.keep_alive = Mock()
         self.session_manager.session_storage = flexmock()
@@ -217,3 +318,19 @@ class SwitchSessionManagerTest(TestCase):
         self.session_manager.end_transaction(session_id)
 
         self.session_manager.keep_alive.assert_called_with(session_id)
+
+
+class CountingSwitch(object):
+    def __init__(self):
+        self.switch_descriptor = SwitchDescriptor('dell', "a_host")
+        self.connections = 0
+        self.disconnections = 0
+        self.lock = threading.Lock()
+
+    def connect(self):
+        with self.lock:
+            self.connections += 1
+
+    def disconnect(self):
+        with self.lock:
+            self.disconnections += 1